@@ -1,16 +1,19 @@
 import os
+import threading
 from flask import Flask, jsonify, request, make_response
 from flask_cors import CORS
 
 from config import config
 from extensions import db, migrate, bcrypt, jwt, mail
 
-def create_app(config_name=None):
+def create_app(config_name=None, background_workers=None):
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if background_workers is not None:
+        app.config['BACKGROUND_WORKERS'] = background_workers
     
     db.init_app(app)
     migrate.init_app(app, db)
@@ -81,8 +84,45 @@ def create_app(config_name=None):
     with app.app_context():
         db.create_all()
     
+    # Warm per-worker caches once the schema exists
+    from services.challenge_cache import challenge_cache
+    from services.concept_selector import concept_pool
+    from services.delivery_buffer import delivery_buffer
+    from services.news_jobs import news_jobs
+    from services.vocabulary_cache import vocabulary_cache
+    challenge_cache.init_app(app)
+    concept_pool.init_app(app)
+    delivery_buffer.init_app(app)
+    news_jobs.init_app(app)
+    vocabulary_cache.init_app(app)
+    
+    if app.config.get('BACKGROUND_WORKERS', True):
+        _start_background_workers_on_first_request(app)
+    
     return app
 
+
+def _start_background_workers_on_first_request(app):
+    """
+    Start the delivery flusher and news-job worker threads with the first
+    request, so only processes serving HTTP run them: scripts, scheduler
+    shards and a preloading master that forks never do
+    """
+    from services.delivery_buffer import delivery_buffer
+    from services.news_jobs import news_jobs
+    started = threading.Event()
+    lock = threading.Lock()
+    
+    @app.before_request
+    def start_background_workers():
+        if started.is_set():
+            return
+        with lock:
+            if not started.is_set():
+                delivery_buffer.start()
+                news_jobs.start()
+                started.set()
+
 # Create app instance for Gunicorn
 app = create_app(os.environ.get('FLASK_ENV', 'production'))
 
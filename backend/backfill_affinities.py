@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+"""
+Rebuild per-user category and tag affinity vectors from progress history
+"""
+import logging
+from app import create_app
+from services.affinity import AffinityStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_affinities():
+    app = create_app()
+    with app.app_context():
+        result = AffinityStore().rebuild()
+        logger.info(f"Affinity backfill results: {result}")
+
+
+if __name__ == "__main__":
+    backfill_affinities()
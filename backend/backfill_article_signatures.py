@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+"""
+Compute MinHash signatures for stored news articles and mark near-duplicates
+"""
+import logging
+from app import create_app
+from services.article_dedup import NearDuplicateDetector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_article_signatures():
+    app = create_app()
+    with app.app_context():
+        detector = NearDuplicateDetector(threshold=app.config['NEWS_DUPLICATE_THRESHOLD'])
+        result = detector.backfill()
+        logger.info(f"Article signature backfill results: {result}")
+
+
+if __name__ == "__main__":
+    backfill_article_signatures()
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+"""
+Rebuild per-user learning stats snapshots from progress history
+"""
+import logging
+from app import create_app
+from services.learning_stats import LearningStats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_learning_stats():
+    app = create_app()
+    with app.app_context():
+        result = LearningStats().backfill()
+        logger.info(f"Learning stats backfill results: {result}")
+
+
+if __name__ == "__main__":
+    backfill_learning_stats()
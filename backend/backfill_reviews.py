@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+"""
+Enroll previously completed concepts for spaced-repetition review
+"""
+import logging
+from app import create_app
+from services.review_scheduler import ReviewScheduler
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_reviews():
+    app = create_app()
+    with app.app_context():
+        result = ReviewScheduler().backfill()
+        logger.info(f"Review backfill results: {result}")
+
+
+if __name__ == "__main__":
+    backfill_reviews()
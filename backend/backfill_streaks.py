@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+"""
+Rebuild per-user learning streak counters from completion history
+"""
+import logging
+from app import create_app
+from services.streak_tracker import StreakTracker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_streaks():
+    app = create_app()
+    with app.app_context():
+        result = StreakTracker().backfill()
+        logger.info(f"Streak backfill results: {result}")
+
+
+if __name__ == "__main__":
+    backfill_streaks()
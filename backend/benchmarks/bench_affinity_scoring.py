@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Benchmark affinity scoring: pure Python vs NumPy batch scorer
+
+Usage:
+    python benchmarks/bench_affinity_scoring.py [--users 500] [--candidates 64] [--runs 20]
+
+Runs entirely in memory against a synthetic concept pool.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('FLASK_ENV', 'testing')
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite://')
+
+from services.affinity import AffinityScorer, AffinityVector, np
+from services.concept_selector import ConceptPool
+
+
+def synthetic_pool(size, categories, tags, rng):
+    pool = ConceptPool()
+    pool.category_of = {cid: rng.randrange(categories) for cid in range(size)}
+    pool.tags_of = {cid: tuple(rng.sample(range(tags), rng.randint(0, 4))) for cid in range(size)}
+    return pool
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concepts', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--candidates', type=int, default=64)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pool = synthetic_pool(args.concepts, 12, 200, rng)
+    vectors = [
+        AffinityVector(
+            {c: rng.uniform(-1, 5) for c in rng.sample(range(12), 4)},
+            {t: rng.uniform(-1, 5) for t in rng.sample(range(200), 20)},
+            events=rng.randint(0, 200)
+        )
+        for _ in range(args.users)
+    ]
+    candidates = [rng.sample(range(args.concepts), args.candidates) for _ in range(args.users)]
+
+    python_scorer = AffinityScorer(pool, use_numpy=False)
+    python_ms = timed(lambda: python_scorer.score(vectors, candidates), args.runs)
+    print(f"{args.users} users x {args.candidates} candidates: python {python_ms:8.3f} ms/batch")
+    if np is None:
+        print("NumPy not installed; skipping the vectorized scorer")
+        return
+    numpy_scorer = AffinityScorer(pool, use_numpy=True)
+    numpy_scorer.score(vectors[:1], candidates[:1])  # build the concept table once
+    numpy_ms = timed(lambda: numpy_scorer.score(vectors, candidates), args.runs)
+    print(f"{args.users} users x {args.candidates} candidates: numpy  {numpy_ms:8.3f} ms/batch "
+          f"({python_ms / numpy_ms:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Benchmark concept selection: ORDER BY random() query vs in-memory pool
+
+Usage:
+    python benchmarks/bench_concept_selection.py [--sizes 10000 100000] [--runs 200]
+
+Uses TEST_DATABASE_URL when set, otherwise an in-memory SQLite database.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('FLASK_ENV', 'testing')
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import func, insert
+from app import create_app
+from extensions import db
+from models import Category, Concept, DailyContent, User, UserProgress
+from services.concept_selector import ConceptSelector, concept_pool
+
+
+def seed(size, category_ids):
+    rows = [
+        {
+            'title': f'Concept {i}',
+            'short_description': 'Benchmark concept',
+            'content': 'Body',
+            'category_id': category_ids[i % len(category_ids)],
+            'difficulty': ('beginner', 'intermediate', 'advanced')[i % 3]
+        }
+        for i in range(size)
+    ]
+    for offset in range(0, len(rows), 5000):
+        db.session.execute(insert(Concept), rows[offset:offset + 5000])
+    db.session.commit()
+    concept_pool.mark_dirty()
+
+
+def query_selection(user_id, limit, preferred_category_ids):
+    """The original two ORDER BY random() queries"""
+    completed = db.session.query(UserProgress.concept_id).filter(
+        UserProgress.user_id == user_id,
+        UserProgress.status == 'completed'
+    ).subquery()
+    scheduled = db.session.query(DailyContent.concept_id).filter(
+        DailyContent.user_id == user_id
+    ).subquery()
+    query = Concept.query.filter(
+        Concept.is_active == True,
+        ~Concept.id.in_(completed),
+        ~Concept.id.in_(scheduled)
+    )
+    concepts = query.filter(
+        Concept.category_id.in_(preferred_category_ids)
+    ).order_by(func.random()).limit(int(limit * 0.6)).all()
+    concepts += query.filter(
+        ~Concept.id.in_([c.id for c in concepts])
+    ).order_by(func.random()).limit(limit - len(concepts)).all()
+    return [c.id for c in concepts]
+
+
+def pool_selection(selector, user_id, limit, preferred_category_ids):
+    excluded = {row[0] for row in db.session.query(UserProgress.concept_id).filter(
+        UserProgress.user_id == user_id,
+        UserProgress.status == 'completed'
+    ).union(db.session.query(DailyContent.concept_id).filter(
+        DailyContent.user_id == user_id
+    )).all()}
+    return selector.select(limit, excluded, set(preferred_category_ids))
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        for size in args.sizes:
+            db.drop_all()
+            db.create_all()
+
+            categories = [Category(name=f'Category {i}') for i in range(12)]
+            user = User(username='bench', email='bench@example.com', password='BenchPass123')
+            db.session.add_all(categories + [user])
+            db.session.commit()
+            category_ids = [c.id for c in categories]
+            seed(size, category_ids)
+
+            # A realistic history: a few hundred completed concepts
+            history = random.Random(0).sample(range(1, size + 1), min(300, size))
+            db.session.execute(insert(UserProgress), [
+                {'user_id': user.id, 'concept_id': cid, 'status': 'completed'}
+                for cid in history
+            ])
+            db.session.commit()
+
+            preferred = category_ids[:3]
+            selector = ConceptSelector(seed=42)
+            pool_selection(selector, user.id, 3, preferred)  # build the pool once
+
+            query_ms = timed(lambda: query_selection(user.id, 3, preferred), args.runs)
+            pool_ms = timed(lambda: pool_selection(selector, user.id, 3, preferred), args.runs)
+            print(f"{size:>7} concepts: ORDER BY random() {query_ms:8.3f} ms/call, "
+                  f"pool {pool_ms:8.3f} ms/call ({query_ms / pool_ms:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Benchmark NewsAPI topic fetching: sequential requests.get vs pooled concurrent fetch
+
+Usage:
+    python benchmarks/bench_news_fetch.py [--latency 0.25] [--topics 8]
+
+Runs against the local NewsAPI stub from tests/newsapi_stub.py.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import requests
+from services.news_service import NewsAPIService
+from tests.newsapi_stub import NewsAPIStub
+
+
+def sequential(base_url, topics):
+    """The original loop: one bare requests.get (new connection) per topic"""
+    articles = []
+    for topic in topics:
+        response = requests.get(f'{base_url}/everything', params={'q': topic, 'apiKey': 'bench'}, timeout=10)
+        articles.extend(response.json().get('articles', []))
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.25)
+    parser.add_argument('--topics', type=int, default=8)
+    args = parser.parse_args()
+    topics = [f'topic {i}' for i in range(args.topics)]
+
+    with NewsAPIStub(latency=args.latency) as stub:
+        start = time.perf_counter()
+        sequential(stub.base_url, topics)
+        sequential_s = time.perf_counter() - start
+        sequential_connections = len(stub.connections)
+
+        stub.connections.clear()
+        service = NewsAPIService(api_key='bench', base_url=stub.base_url, cache_seconds=0,
+                                 daily_quota=0, rate_per_second=0)
+        start = time.perf_counter()
+        service.fetch_topics(topics)
+        concurrent_s = time.perf_counter() - start
+
+        print(f"{args.topics} topics at {args.latency * 1000:.0f} ms latency: "
+              f"sequential {sequential_s:6.2f} s ({sequential_connections} connections), "
+              f"concurrent {concurrent_s:6.2f} s ({len(stub.connections)} connections), "
+              f"{sequential_s / concurrent_s:4.1f}x")
+
+
+if __name__ == '__main__':
+    main()
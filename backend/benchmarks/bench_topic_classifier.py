@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Benchmark topic classification throughput over synthetic news articles
+
+Usage:
+    python benchmarks/bench_topic_classifier.py [--articles 5000] [--runs 5]
+
+Runs entirely in memory against the seeded category and tag vocabulary.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('FLASK_ENV', 'testing')
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite://')
+
+from seed_data import SEED_CATEGORIES, SEED_TAGS
+from services.topic_classifier import CATEGORY_KEYWORDS, TopicClassifier
+
+FILLER = ('the company said on tuesday that its new release improves performance for teams '
+          'building products while reducing costs and making it easier to get started').split()
+
+
+def synthetic_articles(count, rng):
+    keywords = [keyword for words in CATEGORY_KEYWORDS.values() for keyword in words] + SEED_TAGS
+    articles = []
+    for _ in range(count):
+        title = ' '.join(rng.sample(FILLER, 5) + rng.sample(keywords, 2))
+        body = ' '.join(rng.choice(FILLER) if rng.random() > 0.08 else rng.choice(keywords) for _ in range(150))
+        articles.append((title, body))
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    classifier = TopicClassifier.from_names(
+        [(category['name'], category['description']) for category in SEED_CATEGORIES], SEED_TAGS
+    )
+    articles = synthetic_articles(args.articles, random.Random(0))
+
+    best = float('inf')
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        results = classifier.classify_batch(articles)
+        best = min(best, time.perf_counter() - start)
+
+    classified = sum(1 for result in results if result.category)
+    print(f"{args.articles} articles: {best * 1000:8.1f} ms/batch, "
+          f"{args.articles / best:9.0f} articles/s, {classified} classified")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,10 +7,19 @@ from .challenge import (
     Challenge, TestCase, ChallengeSubmission,
     TestResult, UserChallengeProgress
 )
+from .job import JobRun, JobCheckpoint
+from .review import ReviewState
+from .stats import UserStats, UserCategoryStats
+from .affinity import UserAffinity
+from .news import NewsTopicWatermark, NewsArticleBand, ApiQuotaUsage, NewsFetchJob
 
 __all__ = [
     'User', 'Concept', 'Category', 'Tag', 
     'DailyContent', 'UserProgress', 'NewsArticle',
     'concept_tags', 'Challenge', 'TestCase',
-    'ChallengeSubmission', 'TestResult', 'UserChallengeProgress'
+    'ChallengeSubmission', 'TestResult', 'UserChallengeProgress',
+    'JobRun', 'JobCheckpoint', 'ReviewState',
+    'UserStats', 'UserCategoryStats', 'UserAffinity',
+    'NewsTopicWatermark', 'NewsArticleBand', 'ApiQuotaUsage',
+    'NewsFetchJob'
 ]
\ No newline at end of file
@@ -0,0 +1,13 @@
+from extensions import db
+from datetime import datetime
+
+
+class UserAffinity(db.Model):
+    __tablename__ = 'user_affinities'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    # Sparse {id: weight} maps; JSON keys are the ids as strings
+    category_weights = db.Column(db.JSON, nullable=False, default=dict)
+    tag_weights = db.Column(db.JSON, nullable=False, default=dict)
+    events = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,6 +1,7 @@
 from extensions import db
 from datetime import datetime
-from sqlalchemy import JSON, Text
+from sqlalchemy import JSON, Text, event
+from sqlalchemy.orm import object_session
 
 class Challenge(db.Model):
     __tablename__ = 'challenges'
@@ -24,6 +25,7 @@ class Challenge(db.Model):
     # Metadata
     points = db.Column(db.Integer, default=10)
     is_active = db.Column(db.Boolean, default=True)
+    version = db.Column(db.Integer, nullable=False, default=1)  # Bumped on challenge/test edits
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -188,4 +190,28 @@ class UserChallengeProgress(db.Model):
             'hints_used': self.hints_used,
             'first_solved_at': self.first_solved_at.isoformat() if self.first_solved_at else None,
             'last_attempted_at': self.last_attempted_at.isoformat() if self.last_attempted_at else None
-        }
\ No newline at end of file
+        }
+
+
+# Version bookkeeping used by the judge's challenge cache
+@event.listens_for(Challenge, 'before_update')
+def _bump_challenge_version(mapper, connection, target):
+    session = object_session(target)
+    if session is None or session.is_modified(target, include_collections=False):
+        # SQL-side increment so concurrent test case bumps are not lost
+        target.version = Challenge.version + 1
+
+
+def _bump_version_for_test_case(mapper, connection, target):
+    if target.challenge_id is None:
+        return
+    challenges = Challenge.__table__
+    connection.execute(
+        challenges.update()
+        .where(challenges.c.id == target.challenge_id)
+        .values(version=challenges.c.version + 1)
+    )
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(TestCase, _event_name, _bump_version_for_test_case)
@@ -26,22 +26,61 @@ class Concept(db.Model):
     tags = db.relationship('Tag', secondary='concept_tags', backref='concepts')
     user_progress = db.relationship('UserProgress', backref='concept')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'short_description': self.short_description,
-            'content': self.content,
-            'difficulty': self.difficulty,
-            'category': self.category.name if self.category else None,
-            'source': self.source,
-            'external_url': self.external_url,
-            'image_url': self.image_url,
-            'author': self.author,
-            'published_at': self.published_at.isoformat() if self.published_at else None,
-            'tags': [tag.name for tag in self.tags],
-            'created_at': self.created_at.isoformat()
-        }
+    # Listing fields clients may select with ?fields=, in response order
+    FIELDS = (
+        'id', 'title', 'short_description', 'content', 'difficulty', 'category', 'source',
+        'external_url', 'image_url', 'author', 'published_at', 'tags', 'created_at'
+    )
+    SUMMARY_FIELDS = ('id', 'title', 'short_description', 'difficulty', 'category', 'tags')
+    
+    @classmethod
+    def columns_for(cls, fields):
+        """Columns needed to serialize the fields; the relationships are loaded separately"""
+        columns = [cls.id]
+        for field in fields:
+            if field == 'category':
+                columns.append(cls.category_id)
+            elif field != 'tags' and field != 'id':
+                columns.append(getattr(cls, field))
+        return columns
+    
+    def to_dict(self, fields=None):
+        """
+        Serialize the concept, or only `fields` for a sparse fieldset; columns
+        outside `fields` are never read, so deferred ones stay unloaded
+        """
+        if fields is None:
+            return {
+                'id': self.id,
+                'title': self.title,
+                'short_description': self.short_description,
+                'content': self.content,
+                'difficulty': self.difficulty,
+                'category': self.category.name if self.category else None,
+                'source': self.source,
+                'external_url': self.external_url,
+                'image_url': self.image_url,
+                'author': self.author,
+                'published_at': self.published_at.isoformat() if self.published_at else None,
+                'tags': [tag.name for tag in self.tags],
+                'created_at': self.created_at.isoformat()
+            }
+        data = {}
+        for field in fields:
+            if field == 'category':
+                data[field] = self.category.name if self.category else None
+            elif field == 'tags':
+                data[field] = [tag.name for tag in self.tags]
+            elif field in ('published_at', 'created_at'):
+                value = getattr(self, field)
+                data[field] = value.isoformat() if value else None
+            else:
+                data[field] = getattr(self, field)
+        return data
+    
+    def to_summary_dict(self):
+        """Listing view without the markdown body"""
+        return self.to_dict(self.SUMMARY_FIELDS)
 
 
 class Category(db.Model):
@@ -98,10 +137,16 @@ class DailyContent(db.Model):
     user = db.relationship('User', backref='daily_content')
     concept = db.relationship('Concept', backref='daily_deliveries')
     
-    def to_dict(self):
+    # A concept is scheduled at most once per user and day, so batched inserts can be replayed
+    __table_args__ = (db.UniqueConstraint('user_id', 'concept_id', 'scheduled_date', name='_user_concept_date_uc'),)
+    
+    def to_dict(self, summary=False):
+        concept = None
+        if self.concept:
+            concept = self.concept.to_summary_dict() if summary else self.concept.to_dict()
         return {
             'id': self.id,
-            'concept': self.concept.to_dict() if self.concept else None,
+            'concept': concept,
             'scheduled_date': self.scheduled_date.isoformat(),
             'is_delivered': self.is_delivered,
             'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None
@@ -114,7 +159,7 @@ class UserProgress(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     concept_id = db.Column(db.Integer, db.ForeignKey('concepts.id'), nullable=False)
-    status = db.Column(db.String(20), default='not_started')  # not_started, in_progress, completed
+    status = db.Column(db.String(20), default='not_started')  # not_started, in_progress, completed, skipped
     started_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     notes = db.Column(db.Text)
@@ -156,6 +201,10 @@ class NewsArticle(db.Model):
     is_processed = db.Column(db.Boolean, default=False)
     concept_id = db.Column(db.Integer, db.ForeignKey('concepts.id'))
     fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # MinHash signature of title + description, and the earliest stored
+    # article it near-duplicates (syndicated copies under other URLs)
+    minhash = db.Column(db.LargeBinary)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('news_articles.id'), index=True)
     
     # Relationship to concept if converted
     related_concept = db.relationship('Concept', backref='news_source')
@@ -171,5 +220,6 @@ class NewsArticle(db.Model):
             'author': self.author,
             'published_at': self.published_at.isoformat() if self.published_at else None,
             'category': self.category,
-            'is_processed': self.is_processed
+            'is_processed': self.is_processed,
+            'duplicate_of_id': self.duplicate_of_id
         }
\ No newline at end of file
@@ -0,0 +1,64 @@
+from extensions import db
+from datetime import datetime
+from sqlalchemy import JSON
+
+
+class JobRun(db.Model):
+    __tablename__ = 'job_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(100), nullable=False)
+    run_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), default='running')  # running, completed, failed
+    params = db.Column(JSON)  # Sharding parameters needed to resume deterministically
+    summary = db.Column(JSON)
+    host = db.Column(db.String(255))
+    attempts = db.Column(db.Integer, default=1)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    # Relationships
+    checkpoints = db.relationship('JobCheckpoint', backref='run', cascade='all, delete-orphan')
+    
+    __table_args__ = (db.UniqueConstraint('job_name', 'run_date', name='_job_run_date_uc'),)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_name': self.job_name,
+            'run_date': self.run_date.isoformat(),
+            'status': self.status,
+            'params': self.params,
+            'summary': self.summary,
+            'host': self.host,
+            'attempts': self.attempts,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'checkpoints': [cp.to_dict() for cp in self.checkpoints]
+        }
+
+
+class JobCheckpoint(db.Model):
+    __tablename__ = 'job_checkpoints'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('job_runs.id'), nullable=False)
+    shard_index = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='running')  # running, completed, failed
+    last_user_id = db.Column(db.Integer, default=0)  # Users up to this id are done
+    users_processed = db.Column(db.Integer, default=0)
+    concepts_scheduled = db.Column(db.Integer, default=0)
+    error_message = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (db.UniqueConstraint('run_id', 'shard_index', name='_run_shard_uc'),)
+    
+    def to_dict(self):
+        return {
+            'shard_index': self.shard_index,
+            'status': self.status,
+            'last_user_id': self.last_user_id,
+            'users_processed': self.users_processed,
+            'concepts_scheduled': self.concepts_scheduled,
+            'error_message': self.error_message
+        }
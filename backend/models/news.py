@@ -0,0 +1,74 @@
+from extensions import db
+from datetime import datetime
+
+
+class NewsTopicWatermark(db.Model):
+    __tablename__ = 'news_topic_watermarks'
+
+    topic = db.Column(db.String(100), primary_key=True)
+    # Newest publishedAt (UTC) stored for the topic; later runs only ask for newer articles
+    latest_published_at = db.Column(db.DateTime, nullable=False)
+    last_fetched_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'topic': self.topic,
+            'latest_published_at': self.latest_published_at.isoformat() if self.latest_published_at else None,
+            'last_fetched_at': self.last_fetched_at.isoformat() if self.last_fetched_at else None
+        }
+
+
+class NewsArticleBand(db.Model):
+    __tablename__ = 'news_article_bands'
+
+    # One row per LSH band of an article's MinHash signature; articles
+    # sharing any (band, bucket) are near-duplicate candidates
+    article_id = db.Column(db.Integer, db.ForeignKey('news_articles.id', ondelete='CASCADE'), primary_key=True)
+    band = db.Column(db.SmallInteger, primary_key=True)
+    bucket = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_news_article_bands_bucket', 'bucket', 'band'),
+    )
+
+
+class ApiQuotaUsage(db.Model):
+    __tablename__ = 'api_quota_usage'
+
+    # Upstream requests charged against an API key's daily quota (UTC days)
+    api = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    used = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {'api': self.api, 'day': self.day.isoformat(), 'used': self.used}
+
+
+class NewsFetchJob(db.Model):
+    __tablename__ = 'news_fetch_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # fetch, daily
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    # Identifies identical requests so they share one queued job
+    dedupe_key = db.Column(db.String(64), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    result = db.Column(db.JSON)
+    error_message = db.Column(db.Text)
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'result': self.result,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,37 @@
+from extensions import db
+from datetime import datetime
+
+
+class ReviewState(db.Model):
+    __tablename__ = 'review_states'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    concept_id = db.Column(db.Integer, db.ForeignKey('concepts.id'), nullable=False)
+    ease_factor = db.Column(db.Float, nullable=False, default=2.5)
+    interval_days = db.Column(db.Integer, nullable=False, default=0)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+    due_at = db.Column(db.DateTime, nullable=False)
+    last_reviewed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    concept = db.relationship('Concept')
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'concept_id', name='_user_concept_review_uc'),
+        # Due queue: a user's due reviews are an index range scan
+        db.Index('ix_review_states_user_due', 'user_id', 'due_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'concept_id': self.concept_id,
+            'ease_factor': round(self.ease_factor, 2),
+            'interval_days': self.interval_days,
+            'repetitions': self.repetitions,
+            'lapses': self.lapses,
+            'due_at': self.due_at.isoformat(),
+            'last_reviewed_at': self.last_reviewed_at.isoformat() if self.last_reviewed_at else None
+        }
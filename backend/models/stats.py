@@ -0,0 +1,29 @@
+from extensions import db
+from datetime import datetime
+
+
+class UserStats(db.Model):
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    in_progress_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'completed_count': self.completed_count,
+            'in_progress_count': self.in_progress_count,
+            'rating_sum': self.rating_sum,
+            'rating_count': self.rating_count
+        }
+
+
+class UserCategoryStats(db.Model):
+    __tablename__ = 'user_category_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), primary_key=True)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
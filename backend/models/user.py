@@ -14,6 +14,12 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     timezone = db.Column(db.String(50), default='UTC')
     skill_level = db.Column(db.String(20), default='beginner')
+    scheduled_through = db.Column(db.Date)  # Last local date with a full daily schedule
+    
+    # Learning streak counters, maintained on completion (local days)
+    current_streak = db.Column(db.Integer, default=0)
+    longest_streak = db.Column(db.Integer, default=0)
+    last_activity_date = db.Column(db.Date)
     
     preferences = db.Column(db.JSON, default=lambda: {
         'daily_reminder_time': '09:00',
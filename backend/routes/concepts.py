@@ -1,17 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Concept, Category, Tag, DailyContent, UserProgress, User
+from models import Concept, Category, Tag, DailyContent, UserProgress, User, NewsFetchJob
 from services.daily_delivery_service import DailyDeliveryService
-from services.news_service import NewsAPIService
+from services.news_jobs import news_jobs
+from services.vocabulary_cache import vocabulary_cache
 from extensions import db
 from datetime import datetime, date
+from sqlalchemy.orm import load_only, selectinload
 import logging
 
 logger = logging.getLogger(__name__)
 
 concepts_bp = Blueprint('concepts', __name__)
 delivery_service = DailyDeliveryService()
-news_service = NewsAPIService()
 
 
 @concepts_bp.route('', methods=['GET'])
@@ -26,8 +27,27 @@ def get_concepts():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         
-        # Build query
-        query = Concept.query.filter_by(is_active=True)
+        # Sparse fieldset: ?fields=id,title,... or ?view=summary; full by default
+        if 'fields' in request.args:
+            fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+            if not fields:
+                return jsonify({'error': 'fields must name at least one field'}), 400
+            unknown = [f for f in fields if f not in Concept.FIELDS]
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        elif request.args.get('view') == 'summary':
+            fields = list(Concept.SUMMARY_FIELDS)
+        else:
+            fields = list(Concept.FIELDS)
+        
+        # Build query; unselected columns stay out of the SELECT and the
+        # relationships load in one query each, whatever the page size
+        options = [load_only(*Concept.columns_for(fields))]
+        if 'category' in fields:
+            options.append(selectinload(Concept.category))
+        if 'tags' in fields:
+            options.append(selectinload(Concept.tags))
+        query = Concept.query.options(*options).filter_by(is_active=True)
         
         if category_id:
             query = query.filter_by(category_id=category_id)
@@ -42,7 +62,7 @@ def get_concepts():
         paginated = query.paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'concepts': [concept.to_dict() for concept in paginated.items],
+            'concepts': [concept.to_dict(fields) for concept in paginated.items],
             'total': paginated.total,
             'pages': paginated.pages,
             'current_page': page
@@ -77,12 +97,26 @@ def get_concept(concept_id):
         return jsonify({'error': 'Concept not found'}), 404
 
 
+def _vocabulary_response(name):
+    """
+    Serve a cached listing; 304 when the client's ETag still matches
+    """
+    listing = vocabulary_cache.get(name)
+    if request.if_none_match.contains(listing.etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(listing.body, mimetype='application/json')
+    response.set_etag(listing.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = vocabulary_cache.max_age
+    return response
+
+
 @concepts_bp.route('/categories', methods=['GET'])
 def get_categories():
     """Get all categories"""
     try:
-        categories = Category.query.all()
-        return jsonify([cat.to_dict() for cat in categories]), 200
+        return _vocabulary_response('categories')
     except Exception as e:
         logger.error(f"Error fetching categories: {str(e)}")
         return jsonify({'error': 'Failed to fetch categories'}), 500
@@ -92,26 +126,28 @@ def get_categories():
 def get_tags():
     """Get all tags"""
     try:
-        tags = Tag.query.all()
-        return jsonify([tag.to_dict() for tag in tags]), 200
+        return _vocabulary_response('tags')
     except Exception as e:
         logger.error(f"Error fetching tags: {str(e)}")
         return jsonify({'error': 'Failed to fetch tags'}), 500
 
 
-# Daily Delivery Routes
 @concepts_bp.route('/daily/today', methods=['GET'])
 @jwt_required()
 def get_today_concepts():
     """Get today's concepts for the current user"""
     try:
         user_id = int(get_jwt_identity())
-        concepts = delivery_service.get_today_concepts(user_id)
+        today = delivery_service.user_today(user_id)
+        concepts = delivery_service.get_today_concepts(user_id, today)
+        reviews = delivery_service.get_due_reviews(user_id, today)
         
         return jsonify({
-            'date': date.today().isoformat(),
+            'date': today.isoformat(),
             'concepts': concepts,
-            'count': len(concepts)
+            'count': len(concepts),
+            'reviews': reviews,
+            'review_count': len(reviews)
         }), 200
         
     except Exception as e:
@@ -126,12 +162,15 @@ def get_upcoming_concepts():
     try:
         user_id = int(get_jwt_identity())
         days = request.args.get('days', 7, type=int)
+        # Summaries by default; ?view=full includes concept bodies
+        summary = request.args.get('view', 'summary') != 'full'
         
-        upcoming = delivery_service.get_upcoming_concepts(user_id, days)
+        upcoming = delivery_service.get_upcoming_concepts(user_id, days, summary=summary)
         
         return jsonify({
             'upcoming': upcoming,
-            'days_ahead': days
+            'days_ahead': days,
+            'view': 'summary' if summary else 'full'
         }), 200
         
     except Exception as e:
@@ -195,6 +234,45 @@ def complete_concept(concept_id):
         return jsonify({'error': 'Failed to complete concept'}), 500
 
 
+@concepts_bp.route('/progress/skip/<int:concept_id>', methods=['POST'])
+@jwt_required()
+def skip_concept(concept_id):
+    """Skip a concept and refill its scheduled slots"""
+    try:
+        user_id = int(get_jwt_identity())
+        progress = delivery_service.skip_concept(user_id, concept_id)
+        
+        return jsonify(progress.to_dict()), 200
+        
+    except Exception as e:
+        logger.error(f"Error skipping concept: {str(e)}")
+        return jsonify({'error': 'Failed to skip concept'}), 500
+
+
+@concepts_bp.route('/review/<int:concept_id>', methods=['POST'])
+@jwt_required()
+def review_concept(concept_id):
+    """Grade a spaced-repetition review of a completed concept"""
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json() or {}
+        quality = data.get('quality')
+        
+        # bool is an int subclass; true/false are not grades
+        if not isinstance(quality, int) or isinstance(quality, bool) or not 0 <= quality <= 5:
+            return jsonify({'error': 'quality must be an integer from 0 to 5'}), 400
+        
+        review = delivery_service.record_review(user_id, concept_id, quality)
+        if review is None:
+            return jsonify({'error': 'Only completed concepts can be reviewed'}), 404
+        
+        return jsonify(review), 200
+        
+    except Exception as e:
+        logger.error(f"Error recording review: {str(e)}")
+        return jsonify({'error': 'Failed to record review'}), 500
+
+
 @concepts_bp.route('/progress/stats', methods=['GET'])
 @jwt_required()
 def get_user_stats():
@@ -245,25 +323,23 @@ def get_completed_concepts():
 @concepts_bp.route('/news/fetch', methods=['POST'])
 @jwt_required()
 def fetch_news():
-    """Fetch latest tech news (admin only)"""
+    """Queue a fetch of the latest tech news (admin only)"""
     try:
         # Check if user is admin (you might want to add role checking)
         user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
         
         # For now, any authenticated user can trigger this
         # In production, restrict to admin users
         
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         query = data.get('query')
         
-        articles = news_service.fetch_tech_news(query=query)
-        saved = news_service.save_articles(articles)
+        # Runs on the background worker; identical pending requests share one job
+        job = news_jobs.submit('fetch', {'query': query}, user_id=user_id)
+        if job is None:
+            return jsonify({'error': 'Too many pending news jobs'}), 503
         
-        return jsonify({
-            'fetched': len(articles),
-            'saved': saved
-        }), 200
+        return jsonify({'job': job.to_dict()}), 202
         
     except Exception as e:
         logger.error(f"Error fetching news: {str(e)}")
@@ -273,15 +349,34 @@ def fetch_news():
 @concepts_bp.route('/news/process-daily', methods=['POST'])
 @jwt_required()
 def process_daily_news():
-    """Process daily news fetch and conversion"""
+    """Queue the daily news fetch and conversion"""
     try:
         user_id = int(get_jwt_identity())
         # Add admin check here
         
-        results = news_service.fetch_and_process_daily()
+        job = news_jobs.submit('daily', user_id=user_id)
+        if job is None:
+            return jsonify({'error': 'Too many pending news jobs'}), 503
         
-        return jsonify(results), 200
+        return jsonify({'job': job.to_dict()}), 202
         
     except Exception as e:
         logger.error(f"Error processing daily news: {str(e)}")
-        return jsonify({'error': 'Failed to process daily news'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to process daily news'}), 500
+
+
+@concepts_bp.route('/news/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_news_job(job_id):
+    """Status and result of a queued news job"""
+    try:
+        user_id = int(get_jwt_identity())
+        job = NewsFetchJob.query.filter_by(id=job_id, requested_by=user_id).first()
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({'job': job.to_dict()}), 200
+        
+    except Exception as e:
+        logger.error(f"Error fetching news job: {str(e)}")
+        return jsonify({'error': 'Failed to fetch news job'}), 500
\ No newline at end of file
@@ -3,28 +3,32 @@
 Scheduler for daily concept delivery and news fetching
 Can be run as a cron job or scheduled task
 """
+import argparse
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from app import create_app
-from services.daily_delivery_service import DailyDeliveryService
 from services.news_service import NewsAPIService
+from services.sharded_scheduler import ShardedScheduler
+from services.scheduler_jobs import ScheduleJob
+from services.rolling_scheduler import RollingScheduler
+from services.learning_stats import LearningStats
+from utils.locks import JobLock
 
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
 
-def run_daily_tasks():
+def run_daily_tasks(workers=None, shards=None, force=False):
     """Run all daily scheduled tasks"""
-    app = create_app()
+    app = create_app(background_workers=False)
     
     with app.app_context():
         logger.info(f"Starting daily tasks at {datetime.utcnow()}")
         
         # Initialize services
-        delivery_service = DailyDeliveryService()
         news_service = NewsAPIService()
         
         # Task 1: Fetch and process news articles
@@ -35,16 +39,63 @@ def run_daily_tasks():
         except Exception as e:
             logger.error(f"Error processing news: {str(e)}")
         
-        # Task 2: Schedule concepts for all users
+        # Task 2: Schedule concepts for all users, sharded across worker processes.
+        # Runs are locked to one host at a time and resume from checkpoints.
         try:
             logger.info("Scheduling daily concepts for all users...")
-            schedule_results = delivery_service.schedule_all_users()
+            scheduler = ShardedScheduler.from_config(
+                app.config,
+                workers=workers,
+                shard_count=shards
+            )
+            lock = JobLock(ScheduleJob.job_name, lock_dir=app.config.get('SCHEDULER_LOCK_DIR'))
+            schedule_results = ScheduleJob(scheduler, lock).run(force=force)
             logger.info(f"Scheduling results: {schedule_results}")
         except Exception as e:
             logger.error(f"Error scheduling concepts: {str(e)}")
         
+        # Task 3: Spot-check materialized learning stats against raw progress
+        try:
+            logger.info("Checking learning stats consistency...")
+            stats_results = LearningStats().check_consistency(
+                sample_size=app.config.get('STATS_CHECK_SAMPLE_SIZE', 200)
+            )
+            logger.info(f"Stats check results: {stats_results}")
+        except Exception as e:
+            logger.error(f"Error checking learning stats: {str(e)}")
+        
         logger.info(f"Daily tasks completed at {datetime.utcnow()}")
 
 
+def run_rolling_scheduler():
+    """Schedule users continuously, shortly before their local delivery time"""
+    app = create_app(background_workers=False)
+    
+    with app.app_context():
+        lock = JobLock('rolling_scheduler', lock_dir=app.config.get('SCHEDULER_LOCK_DIR'))
+        with lock as acquired:
+            if not acquired:
+                logger.warning("Rolling scheduler already running elsewhere; exiting")
+                return
+            
+            logger.info("Starting rolling delivery scheduler...")
+            # Buckets take the nightly job's lock, so the two never schedule at once
+            RollingScheduler(
+                lead_time=timedelta(minutes=app.config.get('ROLLING_SCHEDULER_LEAD_MINUTES', 30)),
+                lock_factory=lambda: JobLock(ScheduleJob.job_name, lock_dir=app.config.get('SCHEDULER_LOCK_DIR'))
+            ).run_forever()
+
+
 if __name__ == "__main__":
-    run_daily_tasks()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Run daily DevDose tasks')
+    parser.add_argument('--workers', type=int, help='Scheduler worker processes')
+    parser.add_argument('--shards', type=int, help='Number of user shards')
+    parser.add_argument('--force', action='store_true', help='Re-run even if today\'s run completed')
+    parser.add_argument('--rolling', action='store_true',
+                        help='Run continuously, scheduling each timezone bucket before its delivery time')
+    args = parser.parse_args()
+    
+    if args.rolling:
+        run_rolling_scheduler()
+    else:
+        run_daily_tasks(workers=args.workers, shards=args.shards, force=args.force)
@@ -8,50 +8,63 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+SEED_CATEGORIES = [
+    {
+        'name': 'Web Development',
+        'description': 'Frontend and backend web technologies',
+        'icon': '🌐'
+    },
+    {
+        'name': 'Machine Learning',
+        'description': 'AI, ML, and data science concepts',
+        'icon': '🤖'
+    },
+    {
+        'name': 'Cloud Computing',
+        'description': 'Cloud platforms and services',
+        'icon': '☁️'
+    },
+    {
+        'name': 'DevOps',
+        'description': 'Development operations and CI/CD',
+        'icon': '🔧'
+    },
+    {
+        'name': 'Cybersecurity',
+        'description': 'Security concepts and best practices',
+        'icon': '🔒'
+    },
+    {
+        'name': 'Mobile Development',
+        'description': 'iOS, Android, and cross-platform development',
+        'icon': '📱'
+    },
+    {
+        'name': 'Data Engineering',
+        'description': 'Big data and data pipeline concepts',
+        'icon': '📊'
+    },
+    {
+        'name': 'Programming Languages',
+        'description': 'Language-specific concepts and features',
+        'icon': '💻'
+    }
+]
+
+SEED_TAGS = [
+    'javascript', 'python', 'react', 'nodejs', 'typescript',
+    'docker', 'kubernetes', 'aws', 'azure', 'gcp',
+    'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
+    'git', 'ci/cd', 'testing', 'security', 'api',
+    'database', 'sql', 'nosql', 'mongodb', 'postgresql',
+    'html', 'css', 'vue', 'angular', 'svelte',
+    'golang', 'rust', 'java', 'csharp', 'swift'
+]
+
+
 def seed_categories():
     """Seed initial categories"""
-    categories = [
-        {
-            'name': 'Web Development',
-            'description': 'Frontend and backend web technologies',
-            'icon': '🌐'
-        },
-        {
-            'name': 'Machine Learning',
-            'description': 'AI, ML, and data science concepts',
-            'icon': '🤖'
-        },
-        {
-            'name': 'Cloud Computing',
-            'description': 'Cloud platforms and services',
-            'icon': '☁️'
-        },
-        {
-            'name': 'DevOps',
-            'description': 'Development operations and CI/CD',
-            'icon': '🔧'
-        },
-        {
-            'name': 'Cybersecurity',
-            'description': 'Security concepts and best practices',
-            'icon': '🔒'
-        },
-        {
-            'name': 'Mobile Development',
-            'description': 'iOS, Android, and cross-platform development',
-            'icon': '📱'
-        },
-        {
-            'name': 'Data Engineering',
-            'description': 'Big data and data pipeline concepts',
-            'icon': '📊'
-        },
-        {
-            'name': 'Programming Languages',
-            'description': 'Language-specific concepts and features',
-            'icon': '💻'
-        }
-    ]
+    categories = SEED_CATEGORIES
     
     for cat_data in categories:
         existing = Category.query.filter_by(name=cat_data['name']).first()
@@ -65,15 +78,7 @@ def seed_categories():
 
 def seed_tags():
     """Seed initial tags"""
-    tags = [
-        'javascript', 'python', 'react', 'nodejs', 'typescript',
-        'docker', 'kubernetes', 'aws', 'azure', 'gcp',
-        'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-        'git', 'ci/cd', 'testing', 'security', 'api',
-        'database', 'sql', 'nosql', 'mongodb', 'postgresql',
-        'html', 'css', 'vue', 'angular', 'svelte',
-        'golang', 'rust', 'java', 'csharp', 'swift'
-    ]
+    tags = SEED_TAGS
     
     for tag_name in tags:
         existing = Tag.query.filter_by(name=tag_name).first()
@@ -1,4 +1,5 @@
 from .news_service import NewsAPIService
 from .daily_delivery_service import DailyDeliveryService
+from .challenge_cache import ChallengeCache, challenge_cache
 
-__all__ = ['NewsAPIService', 'DailyDeliveryService']
\ No newline at end of file
+__all__ = ['NewsAPIService', 'DailyDeliveryService', 'ChallengeCache', 'challenge_cache']
\ No newline at end of file
@@ -0,0 +1,318 @@
+import math
+import random
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+from extensions import db
+from models import Concept, UserAffinity, UserProgress, concept_tags
+from .concept_selector import ConceptPool, ConceptSelector, concept_pool
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Affinity contributed by a concept in each progress state
+STATUS_WEIGHTS = {'in_progress': 1.0, 'completed': 2.0, 'skipped': -1.0}
+
+
+class AffinityVector:
+    """A user's sparse category and tag weights"""
+
+    __slots__ = ('category_weights', 'tag_weights', 'events')
+
+    def __init__(self,
+                 category_weights: Optional[Dict[int, float]] = None,
+                 tag_weights: Optional[Dict[int, float]] = None,
+                 events: int = 0):
+        self.category_weights = category_weights or {}
+        self.tag_weights = tag_weights or {}
+        self.events = events
+
+    @classmethod
+    def from_row(cls, row: UserAffinity) -> 'AffinityVector':
+        return cls(
+            {int(k): v for k, v in (row.category_weights or {}).items()},
+            {int(k): v for k, v in (row.tag_weights or {}).items()},
+            row.events or 0
+        )
+
+    def add(self, category_id: Optional[int], tag_ids: Iterable[int], delta: float):
+        if category_id is not None:
+            self.category_weights[category_id] = self.category_weights.get(category_id, 0.0) + delta
+        for tag_id in tag_ids:
+            self.tag_weights[tag_id] = self.tag_weights.get(tag_id, 0.0) + delta
+        self.events += 1
+
+    def top_categories(self, limit: int = 3) -> Set[int]:
+        positive = [(w, c) for c, w in self.category_weights.items() if w > 0]
+        return {c for _, c in sorted(positive, reverse=True)[:limit]}
+
+
+class AffinityStore:
+    """
+    Per-user affinity vectors in `user_affinities`.
+
+    `record` folds one progress transition into the user's vector. It runs
+    inside ProgressWriter's transition, which already holds the user's
+    stats row lock, so the read-modify-write of the JSON maps cannot race.
+    """
+
+    def record(self,
+               user_id: int,
+               concept_id: int,
+               category_id: Optional[int],
+               before_status: Optional[str],
+               after_status: Optional[str]):
+        delta = STATUS_WEIGHTS.get(after_status, 0.0) - STATUS_WEIGHTS.get(before_status, 0.0)
+        if not delta:
+            return
+
+        tag_ids = [row.tag_id for row in db.session.query(concept_tags.c.tag_id).filter(
+            concept_tags.c.concept_id == concept_id
+        ).all()]
+
+        row = db.session.get(UserAffinity, user_id, populate_existing=True)
+        if row is None:
+            row = UserAffinity(user_id=user_id)
+            db.session.add(row)
+            vector = AffinityVector()
+        else:
+            vector = AffinityVector.from_row(row)
+
+        vector.add(category_id, tag_ids, delta)
+        self._store(row, vector)
+        db.session.flush()
+
+    def load(self, user_ids: Iterable[int]) -> Dict[int, AffinityVector]:
+        rows = UserAffinity.query.filter(UserAffinity.user_id.in_(list(user_ids))).all()
+        return {row.user_id: AffinityVector.from_row(row) for row in rows}
+
+    def rebuild(self, user_ids: Optional[Iterable[int]] = None, chunk_size: int = 500) -> Dict[str, int]:
+        """
+        Recompute vectors from UserProgress (backfill)
+        """
+        if user_ids is None:
+            user_ids = [row.user_id for row in db.session.query(UserProgress.user_id).distinct().order_by(
+                UserProgress.user_id
+            ).all()]
+        else:
+            user_ids = list(user_ids)
+
+        for offset in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[offset:offset + chunk_size]
+            rows = db.session.query(
+                UserProgress.user_id, UserProgress.concept_id, UserProgress.status, Concept.category_id
+            ).join(Concept, Concept.id == UserProgress.concept_id).filter(
+                UserProgress.user_id.in_(chunk)
+            ).all()
+            concept_ids = {row.concept_id for row in rows}
+            tags_of = defaultdict(list)
+            if concept_ids:
+                for concept_id, tag_id in db.session.query(
+                    concept_tags.c.concept_id, concept_tags.c.tag_id
+                ).filter(concept_tags.c.concept_id.in_(concept_ids)).all():
+                    tags_of[concept_id].append(tag_id)
+
+            vectors = {user_id: AffinityVector() for user_id in chunk}
+            for user_id, concept_id, status, category_id in rows:
+                weight = STATUS_WEIGHTS.get(status, 0.0)
+                if weight:
+                    vectors[user_id].add(category_id, tags_of[concept_id], weight)
+
+            existing = {row.user_id: row for row in UserAffinity.query.filter(
+                UserAffinity.user_id.in_(chunk)
+            ).all()}
+            for user_id, vector in vectors.items():
+                row = existing.get(user_id)
+                if row is None:
+                    row = UserAffinity(user_id=user_id)
+                    db.session.add(row)
+                self._store(row, vector)
+            db.session.commit()
+
+        logger.info(f"Rebuilt affinity vectors for {len(user_ids)} users")
+        return {'users_processed': len(user_ids)}
+
+    @staticmethod
+    def _store(row: UserAffinity, vector: AffinityVector):
+        # Drop exhausted weights so the maps stay compact
+        row.category_weights = {str(k): round(v, 4) for k, v in vector.category_weights.items() if v}
+        row.tag_weights = {str(k): round(v, 4) for k, v in vector.tag_weights.items() if v}
+        row.events = vector.events
+
+
+class AffinityScorer:
+    """
+    Scores candidate concepts against affinity vectors: category weight
+    plus `tag_weight` times the summed weights of the concept's tags.
+
+    By default the whole batch of users is scored with NumPy array
+    gathers; `use_numpy=False` computes the same scores in plain Python.
+    """
+
+    def __init__(self, pool: Optional[ConceptPool] = None, tag_weight: float = 0.5, use_numpy: bool = True):
+        self.pool = pool or concept_pool
+        self.tag_weight = tag_weight
+        self.use_numpy = use_numpy
+        self._table = None
+
+    def score(self, vectors: List[AffinityVector], candidates: List[List[int]]) -> List[List[float]]:
+        if not vectors:
+            return []
+        if self.use_numpy:
+            return self._score_numpy(vectors, candidates)
+        return self._score_python(vectors, candidates)
+
+    def _score_python(self, vectors, candidates):
+        category_of = self.pool.category_of
+        tags_of = self.pool.tags_of
+        scores = []
+        for vector, user_candidates in zip(vectors, candidates):
+            categories, tags = vector.category_weights, vector.tag_weights
+            scores.append([
+                categories.get(category_of.get(cid), 0.0)
+                + self.tag_weight * sum(tags.get(t, 0.0) for t in tags_of.get(cid, ()))
+                for cid in user_candidates
+            ])
+        return scores
+
+    def _concept_table(self):
+        """
+        Dense per-concept category and tag columns, rebuilt when the pool is
+        """
+        category_of = self.pool.category_of
+        if self._table is not None and self._table[0] is category_of:
+            return self._table[1:]
+
+        tags_of = self.pool.tags_of
+        ids = np.array(sorted(category_of), dtype=np.int64)
+        category_ids = sorted(set(category_of.values()))
+        tag_ids = sorted({t for tags in tags_of.values() for t in tags})
+        category_cols = {c: i for i, c in enumerate(category_ids)}
+        tag_cols = {t: i for i, t in enumerate(tag_ids)}
+
+        # The extra last column of each user matrix is all zeros and absorbs padding
+        max_tags = max((len(tags) for tags in tags_of.values()), default=0) or 1
+        concept_categories = np.array([category_cols[category_of[cid]] for cid in ids.tolist()], dtype=np.intp)
+        concept_tags_matrix = np.full((len(ids), max_tags), len(tag_ids), dtype=np.intp)
+        for row, cid in enumerate(ids.tolist()):
+            for k, t in enumerate(tags_of.get(cid, ())):
+                concept_tags_matrix[row, k] = tag_cols[t]
+
+        self._table = (category_of, ids, category_cols, tag_cols, concept_categories, concept_tags_matrix)
+        return self._table[1:]
+
+    def _score_numpy(self, vectors, candidates):
+        ids, category_cols, tag_cols, concept_categories, concept_tags_matrix = self._concept_table()
+        width = max((len(c) for c in candidates), default=0)
+        if width == 0 or len(ids) == 0:
+            return [[0.0] * len(c) for c in candidates]
+
+        n_users = len(vectors)
+        category_matrix = np.zeros((n_users, len(category_cols) + 1))
+        tag_matrix = np.zeros((n_users, len(tag_cols) + 1))
+        for row, vector in enumerate(vectors):
+            for c, w in vector.category_weights.items():
+                if c in category_cols:
+                    category_matrix[row, category_cols[c]] = w
+            for t, w in vector.tag_weights.items():
+                if t in tag_cols:
+                    tag_matrix[row, tag_cols[t]] = w
+
+        # Candidate ids -> concept table rows; padding and unknown ids score 0
+        padded = np.full((n_users, width), -1, dtype=np.int64)
+        for row, user_candidates in enumerate(candidates):
+            padded[row, :len(user_candidates)] = user_candidates
+        positions = np.clip(np.searchsorted(ids, padded), 0, len(ids) - 1)
+        known = ids[positions] == padded
+
+        rows = np.arange(n_users)[:, None]
+        category_index = np.where(known, concept_categories[positions], len(category_cols))
+        scores = category_matrix[rows, category_index]
+        tag_index = concept_tags_matrix[positions]
+        tag_index[~known] = len(tag_cols)
+        scores += self.tag_weight * tag_matrix[rows[:, :, None], tag_index].sum(axis=2)
+        return [scores[row, :len(c)].tolist() for row, c in enumerate(candidates)]
+
+
+class AffinityRecommender:
+    """
+    Picks concepts as a per-user mix of exploitation and exploration.
+
+    Each user's exploration rate starts at 1 (no history, pure discovery)
+    and decays with the number of progress events towards
+    `min_exploration`. Exploration slots are sampled uniformly from the
+    catalog; exploitation slots take the best-scoring concepts from a random
+    candidate set drawn half from the user's top categories and half from
+    the whole catalog. Candidates for all users are scored in one batch.
+    """
+
+    def __init__(self,
+                 pool: Optional[ConceptPool] = None,
+                 rng: Optional[random.Random] = None,
+                 scorer: Optional[AffinityScorer] = None,
+                 min_exploration: float = 0.2,
+                 exploration_halflife: float = 10.0,
+                 candidate_factor: int = 8):
+        self.pool = pool or concept_pool
+        self.rng = rng or random.Random()
+        self.selector = ConceptSelector(pool=self.pool, rng=self.rng)
+        self.scorer = scorer or AffinityScorer(self.pool)
+        self.min_exploration = min_exploration
+        self.exploration_halflife = exploration_halflife
+        self.candidate_factor = candidate_factor
+
+    def exploration_rate(self, vector: Optional[AffinityVector]) -> float:
+        if vector is None or not vector.top_categories():
+            return 1.0
+        return max(self.min_exploration, 1.0 / (1.0 + vector.events / self.exploration_halflife))
+
+    def recommend(self,
+                  needs: Dict[int, int],
+                  excluded: Dict[int, Set[int]],
+                  vectors: Dict[int, AffinityVector]) -> Dict[int, List[int]]:
+        """
+        Up to `needs[user_id]` new concept ids per user, best first
+        """
+        picks: Dict[int, List[int]] = {}
+        exploit_users, exploit_vectors, exploit_candidates, exploit_counts = [], [], [], []
+
+        for user_id, needed in needs.items():
+            if needed <= 0:
+                picks[user_id] = []
+                continue
+            vector = vectors.get(user_id)
+            user_excluded = excluded.get(user_id, set())
+
+            rate = self.exploration_rate(vector)
+            # Randomized rounding keeps the expected share equal to the rate
+            explore = math.floor(needed * rate + self.rng.random())
+            exploit = needed - explore
+            if exploit <= 0:
+                picks[user_id] = self.selector.sample(self.pool.candidates(), needed, user_excluded)
+                continue
+
+            explored = self.selector.sample(self.pool.candidates(), explore, user_excluded) if explore else []
+            picks[user_id] = explored
+            blocked = user_excluded | set(explored)
+
+            draws = exploit * self.candidate_factor
+            focused = self.selector.sample(
+                self.pool.candidates(category_ids=vector.top_categories()), draws // 2, blocked
+            )
+            wide = self.selector.sample(self.pool.candidates(), draws - len(focused), blocked | set(focused))
+
+            exploit_users.append(user_id)
+            exploit_vectors.append(vector)
+            exploit_candidates.append(focused + wide)
+            exploit_counts.append(exploit)
+
+        scores = self.scorer.score(exploit_vectors, exploit_candidates)
+        for user_id, user_candidates, user_scores, count in zip(
+            exploit_users, exploit_candidates, scores, exploit_counts
+        ):
+            ranked = sorted(zip(user_scores, user_candidates), key=lambda item: -item[0])
+            best = [cid for _, cid in ranked[:count]]
+            # Exploited picks lead; exploration fills the rest of the slots
+            picks[user_id] = best + picks[user_id]
+
+        return picks
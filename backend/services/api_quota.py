@@ -0,0 +1,104 @@
+import threading
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import update
+from extensions import db
+from models import ApiQuotaUsage
+from utils.db_utils import upsert_insert
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Allowance:
+    """
+    Requests leased from the daily quota for one operation; shared by the
+    operation's worker threads, which never touch the database themselves
+    """
+
+    def __init__(self, granted: Optional[int], day: Optional[date] = None):
+        self.granted = granted  # None: unlimited
+        self.day = day
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.granted is None:
+            return None
+        with self._lock:
+            return self.granted - self.used
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.granted is not None and self.used >= self.granted:
+                return False
+            self.used += 1
+            return True
+
+    def give_back(self):
+        with self._lock:
+            self.used = max(0, self.used - 1)
+
+
+class QuotaTracker:
+    """
+    Persisted per-day request counter for an upstream API key.
+
+    Callers lease requests up front (`lease`) in a thread holding the app
+    context, spend them from any thread and return what is left
+    (`release`). The counter row is locked while a lease is granted, so
+    concurrent processes never hand out more than `daily_limit` requests
+    per UTC day. A limit of 0 disables tracking.
+    """
+
+    def __init__(self, api: str, daily_limit: int = 0):
+        self.api = api
+        self.daily_limit = daily_limit
+
+    def lease(self, requests: int) -> Allowance:
+        if not self.daily_limit:
+            return Allowance(None)
+
+        day = datetime.utcnow().date()
+        db.session.execute(
+            upsert_insert(ApiQuotaUsage).values(api=self.api, day=day, used=0).on_conflict_do_nothing(
+                index_elements=['api', 'day']
+            )
+        )
+        used = db.session.query(ApiQuotaUsage.used).filter(
+            ApiQuotaUsage.api == self.api, ApiQuotaUsage.day == day
+        ).with_for_update().scalar()
+        granted = max(0, min(requests, self.daily_limit - used))
+        if granted:
+            self._add(day, granted)
+        db.session.commit()
+
+        if granted < requests:
+            logger.warning(f"{self.api} quota: granted {granted} of {requests} requests "
+                           f"({used}/{self.daily_limit} used today)")
+        return Allowance(granted, day)
+
+    def release(self, allowance: Allowance):
+        """
+        Return the unused part of a lease
+        """
+        unused = allowance.remaining
+        if not unused:
+            return
+        self._add(allowance.day, -unused)
+        db.session.commit()
+        allowance.granted = allowance.used
+
+    def used_today(self) -> int:
+        return db.session.query(ApiQuotaUsage.used).filter(
+            ApiQuotaUsage.api == self.api, ApiQuotaUsage.day == datetime.utcnow().date()
+        ).scalar() or 0
+
+    def _add(self, day: date, requests: int):
+        db.session.execute(
+            update(ApiQuotaUsage).where(
+                ApiQuotaUsage.api == self.api, ApiQuotaUsage.day == day
+            ).values(used=ApiQuotaUsage.used + requests),
+            execution_options={'synchronize_session': False}
+        )
@@ -0,0 +1,230 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from flask import current_app, has_app_context
+from sqlalchemy import func, insert, update
+from extensions import db
+from models import Category, Concept, NewsArticle, Tag, concept_tags
+from utils.db_utils import upsert_insert
+from .topic_classifier import TopicClassifier
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleQualityFilter:
+    """
+    Which stored articles are worth turning into concepts. Every criterion
+    is a SQL condition, so selection happens in one query.
+    """
+
+    def __init__(self,
+                 min_content_length: int = 500,
+                 min_description_length: int = 0,
+                 require_image: bool = False,
+                 max_age_days: Optional[int] = None,
+                 blocked_sources: Iterable[str] = ()):
+        self.min_content_length = min_content_length
+        self.min_description_length = min_description_length
+        self.require_image = require_image
+        self.max_age_days = max_age_days
+        self.blocked_sources = [s.strip() for s in blocked_sources if s and s.strip()]
+
+    @classmethod
+    def from_config(cls, config) -> 'ArticleQualityFilter':
+        max_age = config.get('NEWS_CONVERT_MAX_AGE_DAYS')
+        return cls(
+            min_content_length=config.get('NEWS_CONVERT_MIN_CONTENT_LENGTH', 500),
+            min_description_length=config.get('NEWS_CONVERT_MIN_DESCRIPTION_LENGTH', 0),
+            require_image=config.get('NEWS_CONVERT_REQUIRE_IMAGE', False),
+            max_age_days=int(max_age) if max_age else None,
+            blocked_sources=(config.get('NEWS_CONVERT_BLOCKED_SOURCES') or '').split(',')
+        )
+
+    def clauses(self, now: Optional[datetime] = None) -> List:
+        clauses = []
+        if self.min_content_length:
+            clauses.append(func.length(NewsArticle.content) > self.min_content_length)
+        if self.min_description_length:
+            clauses.append(func.length(NewsArticle.description) >= self.min_description_length)
+        if self.require_image:
+            clauses.append(NewsArticle.url_to_image.isnot(None))
+        if self.max_age_days is not None:
+            cutoff = (now or datetime.utcnow()) - timedelta(days=self.max_age_days)
+            clauses.append(NewsArticle.published_at >= cutoff)
+        if self.blocked_sources:
+            clauses.append(func.coalesce(NewsArticle.source_name, '').notin_(self.blocked_sources))
+        return clauses
+
+
+class ArticleConverter:
+    """
+    Turns stored news articles into concepts in bulk.
+
+    A batch claims its articles (is_processed = TRUE, guarded on the old
+    value so concurrent runs never convert one article twice), resolves all
+    categories with one upsert and one select, inserts the concepts with one
+    INSERT ... RETURNING and links the articles with one executemany UPDATE,
+    committing once at the end. With `classify`, categories and tags come
+    from a TopicClassifier run over the whole batch; articles it cannot
+    place go to `default_category`.
+    """
+
+    def __init__(self,
+                 quality: Optional[ArticleQualityFilter] = None,
+                 default_category: str = 'General',
+                 classify: bool = False):
+        self.quality = quality or ArticleQualityFilter.from_config(current_app.config if has_app_context() else {})
+        self.default_category = default_category
+        self.classify = classify
+
+    def select(self,
+               limit: int = 10,
+               now: Optional[datetime] = None,
+               article_ids: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Newest unconverted, non-duplicate articles passing the quality
+        filter, optionally among `article_ids` only
+        """
+        query = db.session.query(NewsArticle.id).filter(
+            NewsArticle.is_processed.isnot(True),
+            NewsArticle.duplicate_of_id.is_(None),
+            *self.quality.clauses(now)
+        )
+        if article_ids is not None:
+            query = query.filter(NewsArticle.id.in_(list(article_ids)))
+        rows = query.order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()).limit(limit).all()
+        return [row.id for row in rows]
+
+    def convert(self,
+                article_ids: Sequence[int],
+                category_for: Optional[Callable[[NewsArticle], str]] = None) -> Dict[int, int]:
+        """
+        Convert the given articles; returns {article_id: concept_id} for the
+        ones converted. Already processed articles and near-duplicates are
+        skipped.
+        """
+        if not article_ids:
+            return {}
+
+        try:
+            claimed = db.session.execute(
+                update(NewsArticle).where(
+                    NewsArticle.id.in_(list(article_ids)),
+                    NewsArticle.is_processed.isnot(True),
+                    NewsArticle.duplicate_of_id.is_(None)
+                ).values(is_processed=True).returning(NewsArticle.id),
+                execution_options={'synchronize_session': False}
+            ).scalars().all()
+            if not claimed:
+                db.session.rollback()
+                return {}
+
+            articles = db.session.query(NewsArticle).filter(
+                NewsArticle.id.in_(claimed)
+            ).order_by(NewsArticle.id).all()
+            names, tag_names = self._topics(articles, category_for)
+            category_ids = self.resolve_categories(set(names.values()))
+
+            # Article URLs are unique, so they map returned rows back to articles
+            created = dict(db.session.execute(
+                insert(Concept).returning(Concept.external_url, Concept.id),
+                [self._concept_row(article, category_ids[names[article.id]]) for article in articles]
+            ).all())
+            linked = {article.id: created[article.url] for article in articles}
+
+            db.session.execute(update(NewsArticle), [
+                {'id': article_id, 'concept_id': concept_id} for article_id, concept_id in linked.items()
+            ])
+            self._tag_concepts(linked, tag_names)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error converting articles to concepts: {str(e)}")
+            return {}
+
+        logger.info(f"Converted {len(linked)} articles to concepts")
+        return linked
+
+    def resolve_categories(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Ids for the category names, creating missing categories
+        """
+        names = sorted(set(names))
+        db.session.execute(
+            upsert_insert(Category).values([
+                {'name': name, 'description': f"{name} technology concepts"} for name in names
+            ]).on_conflict_do_nothing(index_elements=['name'])
+        )
+        return dict(db.session.query(Category.name, Category.id).filter(Category.name.in_(names)).all())
+
+    def _topics(self,
+                articles: List[NewsArticle],
+                category_for: Optional[Callable[[NewsArticle], str]]) -> Tuple[Dict[int, str], Dict[int, List[str]]]:
+        """
+        Category name and tag names per article id
+        """
+        if category_for is not None or not self.classify:
+            category_for = category_for or (lambda article: self.default_category)
+            return {article.id: category_for(article) or self.default_category for article in articles}, {}
+
+        classifier = TopicClassifier.from_vocabulary()
+        results = classifier.classify_batch([
+            (article.title, f"{article.description or ''}\n{article.content or ''}") for article in articles
+        ])
+        names = {article.id: result.category or self.default_category for article, result in zip(articles, results)}
+        tags = {article.id: result.tags for article, result in zip(articles, results) if result.tags}
+        return names, tags
+
+    def _tag_concepts(self, linked: Dict[int, int], tag_names: Dict[int, List[str]]):
+        wanted = {name for names in tag_names.values() for name in names}
+        if not wanted:
+            return
+        tag_ids = dict(db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(wanted)).all())
+        rows = [
+            {'concept_id': linked[article_id], 'tag_id': tag_ids[name]}
+            for article_id, names in tag_names.items()
+            for name in names if name in tag_ids
+        ]
+        if rows:
+            db.session.execute(insert(concept_tags), rows)
+
+    def _concept_row(self, article: NewsArticle, category_id: int) -> Dict:
+        return {
+            'title': article.title[:200],
+            'short_description': article.description or article.title,
+            'content': self.enhance_content(article),
+            'difficulty': 'intermediate',
+            'category_id': category_id,
+            'source': 'newsapi',
+            'external_url': article.url,
+            'image_url': article.url_to_image,
+            'author': article.author,
+            'published_at': article.published_at,
+            'meta_info': {
+                'source_name': article.source_name,
+                'original_article_id': article.id
+            }
+        }
+
+    def enhance_content(self, article: NewsArticle) -> str:
+        """
+        Enhance article content for learning purposes
+        """
+        content = f"# {article.title}\n\n"
+
+        if article.description:
+            content += f"## Overview\n{article.description}\n\n"
+
+        if article.content:
+            content += f"## Details\n{article.content}\n\n"
+        else:
+            content += "## Details\nContent not available. Please visit the source for full article.\n\n"
+
+        content += f"## Additional Resources\n"
+        content += f"- [Original Article]({article.url})\n"
+        content += f"- Source: {article.source_name}\n"
+
+        if article.author:
+            content += f"- Author: {article.author}\n"
+
+        return content
@@ -0,0 +1,197 @@
+import random
+import re
+import struct
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import insert, update
+from extensions import db
+from models import NewsArticle, NewsArticleBand
+import logging
+
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles, split into LSH bands.
+
+    Two texts with Jaccard similarity s share at least one band bucket with
+    probability 1 - (1 - s ** rows) ** bands; with the defaults (16 bands of
+    4 rows) that is about 0.5 at s = 0.5 and above 0.99 at s = 0.8.
+    Hashes are seeded, so signatures are stable across processes.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 2, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._format = struct.Struct(f'<{num_perm}I')
+
+    def shingles(self, text: Optional[str]) -> Set[str]:
+        tokens = TOKEN_RE.findall((text or '').lower())
+        if len(tokens) <= self.shingle_size:
+            return {' '.join(tokens)} if tokens else set()
+        size = self.shingle_size
+        return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+    def signature(self, text: Optional[str]) -> Optional[Tuple[int, ...]]:
+        hashes = [zlib.crc32(shingle.encode()) for shingle in self.shingles(text)]
+        if not hashes:
+            return None
+        return tuple(
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def pack(self, signature: Sequence[int]) -> bytes:
+        return self._format.pack(*signature)
+
+    def unpack(self, blob: bytes) -> Tuple[int, ...]:
+        return self._format.unpack(blob)
+
+    def buckets(self, signature: Sequence[int]) -> List[int]:
+        """
+        One bucket per band: a 31-bit hash of the band's rows
+        """
+        rows = self.rows
+        return [
+            zlib.crc32(struct.pack(f'<{rows}I', *signature[band * rows:(band + 1) * rows])) & 0x7fffffff
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+        """
+        Estimated Jaccard similarity of two signatures
+        """
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateDetector:
+    """
+    Clusters news articles that tell the same story under different URLs.
+
+    Each article's MinHash signature is stored on `news_articles.minhash`
+    and its band buckets in `news_article_bands`. New articles are compared
+    only with articles sharing a bucket (one indexed lookup per batch), and
+    a candidate counts as a duplicate when the estimated similarity reaches
+    `threshold`. Duplicates point at the earliest article of their cluster.
+    """
+
+    def __init__(self, hasher: Optional[MinHasher] = None, threshold: float = 0.6, lookup_chunk: int = 900):
+        self.hasher = hasher or MinHasher()
+        self.threshold = threshold
+        self.lookup_chunk = lookup_chunk
+
+    def signature_of(self, title: Optional[str], description: Optional[str]) -> Optional[bytes]:
+        signature = self.hasher.signature(f"{title or ''} {description or ''}")
+        return self.hasher.pack(signature) if signature else None
+
+    def cluster(self, articles: Iterable[Tuple[int, Optional[bytes]]]) -> Dict[int, int]:
+        """
+        Index newly inserted articles and mark near-duplicates in the
+        current transaction; returns {article_id: canonical_id}
+        """
+        signatures = {
+            article_id: self.hasher.unpack(blob)
+            for article_id, blob in sorted(articles) if blob
+        }
+        if not signatures:
+            return {}
+        buckets = {article_id: self.hasher.buckets(sig) for article_id, sig in signatures.items()}
+
+        existing = self._stored_candidates({bucket for values in buckets.values() for bucket in values})
+        local = defaultdict(list)
+        duplicates = {}
+        for article_id, signature in signatures.items():
+            keys = list(enumerate(buckets[article_id]))
+            candidates = {}
+            for key in keys:
+                for candidate_id, (candidate_sig, root_id) in existing.get(key, {}).items():
+                    candidates[candidate_id] = (candidate_sig, root_id)
+                for candidate_id in local.get(key, ()):
+                    candidates[candidate_id] = (signatures[candidate_id], duplicates.get(candidate_id, candidate_id))
+
+            best = None
+            for candidate_id, (candidate_sig, root_id) in candidates.items():
+                score = self.hasher.similarity(signature, candidate_sig)
+                if score >= self.threshold and (best is None or (score, -root_id) > best[0]):
+                    best = ((score, -root_id), root_id)
+            if best is not None:
+                duplicates[article_id] = best[1]
+            for key in keys:
+                local[key].append(article_id)
+
+        db.session.execute(insert(NewsArticleBand), [
+            {'article_id': article_id, 'band': band, 'bucket': bucket}
+            for article_id, values in buckets.items()
+            for band, bucket in enumerate(values)
+        ])
+        if duplicates:
+            db.session.execute(update(NewsArticle), [
+                {'id': article_id, 'duplicate_of_id': root_id}
+                for article_id, root_id in duplicates.items()
+            ])
+        return duplicates
+
+    def backfill(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Sign and cluster stored articles that predate signatures, oldest first
+        """
+        indexed = duplicates = 0
+        last_id = 0
+        while True:
+            rows = db.session.query(
+                NewsArticle.id, NewsArticle.title, NewsArticle.description
+            ).filter(
+                NewsArticle.minhash.is_(None), NewsArticle.id > last_id
+            ).order_by(NewsArticle.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            signed = [(row.id, self.signature_of(row.title, row.description)) for row in rows]
+            signed = [(article_id, blob) for article_id, blob in signed if blob]
+            if signed:
+                db.session.execute(update(NewsArticle), [
+                    {'id': article_id, 'minhash': blob} for article_id, blob in signed
+                ])
+                duplicates += len(self.cluster(signed))
+                indexed += len(signed)
+            db.session.commit()
+
+        logger.info(f"Indexed {indexed} articles, {duplicates} near-duplicates")
+        return {'indexed': indexed, 'duplicates': duplicates}
+
+    def _stored_candidates(self, buckets: Set[int]) -> Dict[Tuple[int, int], Dict[int, Tuple]]:
+        """
+        Stored articles sharing any of the buckets, keyed by (band, bucket),
+        with their signatures and cluster roots
+        """
+        found = defaultdict(dict)
+        buckets = sorted(buckets)
+        for offset in range(0, len(buckets), self.lookup_chunk):
+            rows = db.session.query(
+                NewsArticleBand.band, NewsArticleBand.bucket, NewsArticle.id,
+                NewsArticle.minhash, NewsArticle.duplicate_of_id
+            ).join(
+                NewsArticle, NewsArticle.id == NewsArticleBand.article_id
+            ).filter(
+                NewsArticleBand.bucket.in_(buckets[offset:offset + self.lookup_chunk])
+            ).all()
+            for band, bucket, article_id, blob, root_id in rows:
+                found[(band, bucket)][article_id] = (self.hasher.unpack(blob), root_id or article_id)
+        return found
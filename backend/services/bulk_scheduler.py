@@ -0,0 +1,213 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from sqlalchemy import func, or_, update
+from extensions import db
+from models import User, Concept, DailyContent, UserProgress
+from utils.db_utils import upsert_insert
+from utils.time_utils import local_today, utc_now
+from .affinity import AffinityRecommender, AffinityStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BulkScheduler:
+    """
+    Set-based daily concept scheduling for many users at once.
+
+    Users are processed in chunks. For each chunk the per-day counts,
+    completed/scheduled exclusion sets and affinity vectors are read with
+    one query each, concepts for every user in the chunk are recommended in
+    one batch from the shared concept pool and the new DailyContent rows
+    are written with batched inserts.
+
+    Each user's `scheduled_through` watermark marks the last day up to which
+    every day is known to be full, so a normal nightly run only fills the
+    newly entered last day of the window and users already scheduled
+    through it are skipped.
+    """
+
+    # Progress states that keep a concept out of future schedules
+    excluded_statuses = ('completed', 'skipped')
+
+    def __init__(self,
+                 max_concepts_per_day: int = 3,
+                 lookahead_days: int = 7,
+                 user_chunk_size: int = 500,
+                 insert_batch_size: int = 1000,
+                 min_exploration: float = 0.2,
+                 rng: Optional[random.Random] = None):
+        self.max_concepts_per_day = max_concepts_per_day
+        self.lookahead_days = lookahead_days
+        self.user_chunk_size = user_chunk_size
+        self.insert_batch_size = insert_batch_size
+        self.affinities = AffinityStore()
+        self.recommender = AffinityRecommender(rng=rng, min_exploration=min_exploration)
+
+    def schedule(self,
+                 user_ids: Optional[Iterable[int]] = None,
+                 start_date: Optional[date] = None,
+                 checkpoint: Optional[Callable[[List[int], int], None]] = None) -> Dict[str, int]:
+        """
+        Fill every user's schedule up to max_concepts_per_day for each day
+        in the lookahead window, starting at `start_date` or else at each
+        user's local date. `checkpoint(chunk_user_ids, scheduled)` is
+        called before each chunk commits, inside the same transaction.
+        """
+        if user_ids is None:
+            # Only users whose schedule may not yet reach the end of the window;
+            # without a start date the window ends latest for UTC+14 users
+            window_start = start_date or (utc_now() + timedelta(hours=14)).date()
+            end_date = window_start + timedelta(days=self.lookahead_days - 1)
+            user_ids = [row.id for row in db.session.query(User.id).filter(
+                User.is_active == True,
+                or_(User.scheduled_through.is_(None), User.scheduled_through < end_date)
+            ).order_by(User.id).all()]
+        else:
+            user_ids = list(user_ids)
+
+        scheduled_total = 0
+        for offset in range(0, len(user_ids), self.user_chunk_size):
+            chunk = user_ids[offset:offset + self.user_chunk_size]
+            try:
+                scheduled = self._schedule_chunk(chunk, start_date)
+                if checkpoint is not None:
+                    checkpoint(chunk, scheduled)
+                db.session.commit()
+                scheduled_total += scheduled
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error scheduling users {chunk[0]}-{chunk[-1]}: {str(e)}")
+                raise
+
+        logger.info(f"Scheduled {scheduled_total} concepts for {len(user_ids)} users")
+        return {
+            'users_processed': len(user_ids),
+            'concepts_scheduled': scheduled_total
+        }
+
+    def schedule_users(self, user_ids: Iterable[int], start_date: Optional[date] = None) -> int:
+        """
+        Schedule the given users inside the caller's transaction; nothing is
+        committed. Returns the number of concepts scheduled.
+        """
+        user_ids = list(user_ids)
+        return sum(
+            self._schedule_chunk(user_ids[offset:offset + self.user_chunk_size], start_date)
+            for offset in range(0, len(user_ids), self.user_chunk_size)
+        )
+
+    def _schedule_chunk(self, user_ids: List[int], start_date: Optional[date]) -> int:
+        now = utc_now()
+
+        # First and last day each user still needs examined
+        first_days, end_dates = {}, {}
+        for user_id, through, tz_name in db.session.query(
+            User.id, User.scheduled_through, User.timezone
+        ).filter(User.id.in_(user_ids)).all():
+            user_start = start_date or local_today(tz_name, now)
+            end_date = user_start + timedelta(days=self.lookahead_days - 1)
+            first_day = max(user_start, through + timedelta(days=1)) if through else user_start
+            if first_day <= end_date:
+                first_days[user_id] = first_day
+                end_dates[user_id] = end_date
+        user_ids = [uid for uid in user_ids if uid in first_days]
+        if not user_ids:
+            return 0
+
+        day_counts = self._load_day_counts(user_ids, min(first_days.values()), max(end_dates.values()))
+        excluded = self._load_exclusions(user_ids)
+        vectors = self.affinities.load(user_ids)
+
+        open_slots = {}
+        for user_id in user_ids:
+            first_day = first_days[user_id]
+            open_slots[user_id] = [
+                (day, self.max_concepts_per_day - day_counts.get((user_id, day), 0))
+                for day in (
+                    first_day + timedelta(days=n) for n in range((end_dates[user_id] - first_day).days + 1)
+                )
+            ]
+
+        picks = self.recommender.recommend(
+            {uid: sum(max(needed, 0) for _, needed in slots) for uid, slots in open_slots.items()},
+            excluded,
+            vectors
+        )
+
+        rows = []
+        watermarks = []
+        for user_id, slots in open_slots.items():
+            user_picks = iter(picks.get(user_id, []))
+            # Last day of the unbroken run of full days from the first examined day
+            through = None
+            for day, needed in slots:
+                placed = 0
+                for _ in range(max(needed, 0)):
+                    concept_id = next(user_picks, None)
+                    if concept_id is None:
+                        break
+                    rows.append({
+                        'user_id': user_id,
+                        'concept_id': concept_id,
+                        'scheduled_date': day
+                    })
+                    placed += 1
+                if placed < needed:
+                    break
+                through = day
+            if through is not None:
+                watermarks.append({'id': user_id, 'scheduled_through': through})
+
+        # Replaying a chunk (e.g. after a crash) leaves existing rows untouched;
+        # only rows actually inserted come back and are counted
+        stmt = upsert_insert(DailyContent).on_conflict_do_nothing(
+            index_elements=['user_id', 'concept_id', 'scheduled_date']
+        ).returning(DailyContent.id)
+        inserted = 0
+        for offset in range(0, len(rows), self.insert_batch_size):
+            inserted += len(db.session.execute(stmt, rows[offset:offset + self.insert_batch_size]).all())
+
+        # Days left short (the recommender ran out of concepts) stay past the
+        # watermark, so a later run fills them once the catalog grows
+        if watermarks:
+            db.session.execute(update(User), watermarks)
+
+        return inserted
+
+    def _load_day_counts(self, user_ids: List[int], start_date: date, end_date: date):
+        rows = db.session.query(
+            DailyContent.user_id,
+            DailyContent.scheduled_date,
+            func.count(DailyContent.id)
+        ).filter(
+            DailyContent.user_id.in_(user_ids),
+            DailyContent.scheduled_date >= start_date,
+            DailyContent.scheduled_date <= end_date
+        ).group_by(
+            DailyContent.user_id,
+            DailyContent.scheduled_date
+        ).all()
+        return {(user_id, day): count for user_id, day, count in rows}
+
+    def _load_exclusions(self, user_ids: List[int]) -> Dict[int, Set[int]]:
+        """
+        Concepts each user has completed or already has scheduled
+        """
+        excluded = defaultdict(set)
+
+        scheduled = db.session.query(
+            DailyContent.user_id, DailyContent.concept_id
+        ).filter(DailyContent.user_id.in_(user_ids))
+        completed = db.session.query(
+            UserProgress.user_id, UserProgress.concept_id
+        ).filter(
+            UserProgress.user_id.in_(user_ids),
+            UserProgress.status.in_(self.excluded_statuses)
+        )
+
+        for user_id, concept_id in scheduled.union(completed).all():
+            excluded[user_id].add(concept_id)
+        return excluded
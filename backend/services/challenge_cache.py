@@ -0,0 +1,193 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import load_only, selectinload
+from extensions import db
+from models import Challenge, TestCase
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ChallengeBundle:
+    """Immutable, judge-ready snapshot of a challenge and its test suite"""
+
+    __slots__ = (
+        'challenge_id', 'version', 'is_active', 'points',
+        'time_limit', 'memory_limit', 'hints', 'test_cases', 'size'
+    )
+
+    def __init__(self, challenge: Challenge, test_cases: List[TestCase]):
+        self.challenge_id = challenge.id
+        self.version = challenge.version
+        self.is_active = challenge.is_active
+        self.points = challenge.points
+        self.time_limit = challenge.time_limit
+        self.memory_limit = challenge.memory_limit
+        self.hints = tuple(challenge.hints or [])
+
+        # Same shape the validator consumes, ordered like the judge expects
+        ordered = sorted(test_cases, key=lambda tc: (tc.order_index or 0, tc.id))
+        self.test_cases = tuple(
+            {
+                'id': tc.id,
+                'input': tc.input_data,
+                'expected_output': tc.expected_output
+            }
+            for tc in ordered
+        )
+
+        # Rough memory footprint, used for eviction
+        self.size = 256 + sum(len(h) for h in self.hints) + sum(
+            len(tc['input']) + len(tc['expected_output']) + 64
+            for tc in self.test_cases
+        )
+
+    def test_case_data(self) -> List[Dict]:
+        """Return per-call copies so callers cannot mutate the cached suite"""
+        return [dict(tc) for tc in self.test_cases]
+
+
+class ChallengeCache:
+    """
+    Versioned in-process cache of challenge bundles.
+
+    Each lookup checks the challenge's `version` column (a single indexed
+    primary key read) and only reloads the challenge and its test cases when
+    the version changed. Entries are evicted least-recently-used once the
+    total estimated size exceeds `max_bytes`.
+    """
+
+    # Columns needed to judge; the statement and solution are never loaded
+    _bundle_columns = (
+        Challenge.id, Challenge.version, Challenge.is_active, Challenge.points,
+        Challenge.time_limit, Challenge.memory_limit, Challenge.hints
+    )
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entries: int = 1000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[int, ChallengeBundle]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get('CHALLENGE_CACHE_MAX_BYTES', self.max_bytes)
+        self.max_entries = app.config.get('CHALLENGE_CACHE_MAX_ENTRIES', self.max_entries)
+        # A fresh app may point at a different database
+        self.clear()
+
+        if app.config.get('CHALLENGE_CACHE_WARMUP', False):
+            with app.app_context():
+                try:
+                    self.warm_up()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning(f"Challenge cache warm-up skipped: {str(e)}")
+
+    def get(self, challenge_id: int) -> Optional[ChallengeBundle]:
+        """
+        Get the bundle for a challenge, reloading it if it has been edited
+        """
+        current_version = db.session.query(Challenge.version).filter(
+            Challenge.id == challenge_id
+        ).scalar()
+
+        if current_version is None:
+            self.invalidate(challenge_id)
+            return None
+
+        with self._lock:
+            bundle = self._entries.get(challenge_id)
+            if bundle is not None and bundle.version == current_version:
+                self._entries.move_to_end(challenge_id)
+                self.hits += 1
+                return bundle
+            self.misses += 1
+
+        bundles = self._load([challenge_id])
+        return bundles[0] if bundles else None
+
+    def get_hints(self, challenge_id: int) -> Optional[Tuple[str, ...]]:
+        bundle = self.get(challenge_id)
+        return bundle.hints if bundle else None
+
+    def warm_up(self, limit: Optional[int] = None) -> int:
+        """
+        Preload bundles for active challenges in two queries
+        """
+        query = db.session.query(Challenge.id).filter(
+            Challenge.is_active == True
+        ).order_by(Challenge.id)
+        if limit:
+            query = query.limit(limit)
+
+        challenge_ids = [row.id for row in query.all()]
+        loaded = self._load(challenge_ids) if challenge_ids else []
+        logger.info(f"Warmed challenge cache with {len(loaded)} challenges")
+        return len(loaded)
+
+    def invalidate(self, challenge_id: Optional[int] = None):
+        with self._lock:
+            if challenge_id is None:
+                self._entries.clear()
+                self._total_bytes = 0
+                return
+            bundle = self._entries.pop(challenge_id, None)
+            if bundle is not None:
+                self._total_bytes -= bundle.size
+
+    def clear(self):
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _load(self, challenge_ids: List[int]) -> List[ChallengeBundle]:
+        challenges = Challenge.query.options(
+            load_only(*self._bundle_columns),
+            selectinload(Challenge.test_cases).load_only(
+                TestCase.id, TestCase.challenge_id, TestCase.input_data,
+                TestCase.expected_output, TestCase.order_index
+            )
+        ).filter(
+            Challenge.id.in_(challenge_ids)
+        ).populate_existing().all()
+
+        bundles = [ChallengeBundle(c, c.test_cases) for c in challenges]
+        for bundle in bundles:
+            self._store(bundle)
+        return bundles
+
+    def _store(self, bundle: ChallengeBundle):
+        with self._lock:
+            previous = self._entries.pop(bundle.challenge_id, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+
+            # Oversized bundles are still returned to the caller, just not kept
+            if bundle.size > self.max_bytes:
+                return
+
+            self._entries[bundle.challenge_id] = bundle
+            self._total_bytes += bundle.size
+
+            while self._entries and (
+                self._total_bytes > self.max_bytes or
+                len(self._entries) > self.max_entries
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.size
+
+
+challenge_cache = ChallengeCache()
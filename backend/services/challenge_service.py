@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Optional
 from datetime import datetime
 from sqlalchemy import and_, or_, func
@@ -7,6 +9,10 @@ from models import (
     TestResult, UserChallengeProgress, User
 )
 from .challenge_execution_service import ChallengeValidator
+from .challenge_cache import challenge_cache
+from .progress_writer import ProgressWriter
+from utils.db_utils import greatest, upsert_insert
+from flask import abort
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +21,12 @@ logger = logging.getLogger(__name__)
 class ChallengeService:
     def __init__(self):
         self.validator = ChallengeValidator()
+        self.progress_writer = ProgressWriter()
+        # (user_id, challenge_id) -> hints already recorded by this worker;
+        # the routes share one service across request threads
+        self._hints_unlocked = OrderedDict()
+        self._hints_lock = threading.Lock()
+        self.max_tracked_hint_unlocks = 10000
     
     def get_challenges(self, 
                       user_id: int,
@@ -130,9 +142,11 @@ class ChallengeService:
         """
         Submit and validate a solution
         """
-        # Get challenge and test cases
-        challenge = Challenge.query.get_or_404(challenge_id)
-        test_cases = TestCase.query.filter_by(challenge_id=challenge_id).order_by(TestCase.order_index).all()
+        # Get challenge limits and test cases from the judge cache
+        bundle = challenge_cache.get(challenge_id)
+        if bundle is None:
+            abort(404)
+        test_cases = bundle.test_cases
         
         if not test_cases:
             return {
@@ -162,23 +176,13 @@ class ChallengeService:
         db.session.commit()
         
         try:
-            # Prepare test cases for validation
-            test_case_data = [
-                {
-                    'id': tc.id,
-                    'input': tc.input_data,
-                    'expected_output': tc.expected_output
-                }
-                for tc in test_cases
-            ]
-            
             # Run validation
             validation_result = self.validator.validate_submission(
                 code=code,
                 language=language,
-                test_cases=test_case_data,
-                time_limit=challenge.time_limit,
-                memory_limit=challenge.memory_limit
+                test_cases=bundle.test_case_data(),
+                time_limit=bundle.time_limit,
+                memory_limit=bundle.memory_limit
             )
             
             # Update submission with results
@@ -206,7 +210,7 @@ class ChallengeService:
             
             # Calculate points if all tests passed
             if submission.status == 'passed':
-                submission.points_earned = challenge.points
+                submission.points_earned = bundle.points
             
             # Update user progress
             self._update_user_progress(user_id, challenge_id, submission)
@@ -237,66 +241,58 @@ class ChallengeService:
         """
         Update user progress for a challenge
         """
-        progress = UserChallengeProgress.query.filter_by(
-            user_id=user_id,
-            challenge_id=challenge_id
-        ).first()
-        
-        if not progress:
-            progress = UserChallengeProgress(
-                user_id=user_id,
-                challenge_id=challenge_id,
-                status='attempted',
-                attempts=1,
-                last_attempted_at=datetime.utcnow()
-            )
-            db.session.add(progress)
-        else:
-            progress.attempts += 1
-            progress.last_attempted_at = datetime.utcnow()
-        
-        # Update status and best submission
-        if submission.status == 'passed':
-            if progress.status != 'solved':
-                progress.status = 'solved'
-                progress.first_solved_at = datetime.utcnow()
-            
-            # Update best submission if this one is better
-            if not progress.best_submission_id or submission.points_earned > 0:
-                progress.best_submission_id = submission.id
-        
-        return progress
+        return self.progress_writer.record_challenge_attempt(user_id, challenge_id, submission)
     
     def get_hint(self, user_id: int, challenge_id: int, hint_index: int) -> Optional[str]:
         """
         Get a hint for a challenge
         """
-        challenge = Challenge.query.get_or_404(challenge_id)
+        hints = challenge_cache.get_hints(challenge_id)
+        if hints is None:
+            abort(404)
         
-        if not challenge.hints or hint_index >= len(challenge.hints):
+        if hint_index >= len(hints):
             return None
         
-        # Update hints used count
-        progress = UserChallengeProgress.query.filter_by(
-            user_id=user_id,
-            challenge_id=challenge_id
-        ).first()
-        
-        if progress:
-            progress.hints_used = max(progress.hints_used, hint_index + 1)
-        else:
-            progress = UserChallengeProgress(
-                user_id=user_id,
-                challenge_id=challenge_id,
-                status='attempted',
-                hints_used=hint_index + 1,
-                attempts=0
-            )
-            db.session.add(progress)
+        # hints_used only grows, so a remembered unlock never goes stale
+        hints_used = hint_index + 1
+        key = (user_id, challenge_id)
+        with self._hints_lock:
+            recorded = self._hints_unlocked.get(key, 0) >= hints_used
+        if not recorded:
+            # The upsert is idempotent, so racing threads may both run it
+            self._record_hint_use(user_id, challenge_id, hints_used)
+            with self._hints_lock:
+                if self._hints_unlocked.get(key, 0) < hints_used:
+                    self._hints_unlocked[key] = hints_used
+                self._hints_unlocked.move_to_end(key)
+                if len(self._hints_unlocked) > self.max_tracked_hint_unlocks:
+                    self._hints_unlocked.popitem(last=False)
         
+        return hints[hint_index]
+    
+    def _record_hint_use(self, user_id: int, challenge_id: int, hints_used: int):
+        """
+        Raise hints_used with a single upsert; rows already at or above the
+        requested count are left untouched
+        """
+        table = UserChallengeProgress.__table__
+        stmt = upsert_insert(table).values(
+            user_id=user_id,
+            challenge_id=challenge_id,
+            status='attempted',
+            hints_used=hints_used,
+            attempts=0
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.challenge_id],
+            set_={'hints_used': greatest(
+                func.coalesce(table.c.hints_used, 0), stmt.excluded.hints_used
+            )},
+            where=func.coalesce(table.c.hints_used, 0) < stmt.excluded.hints_used
+        )
+        db.session.execute(stmt)
         db.session.commit()
-        
-        return challenge.hints[hint_index]
     
     def get_leaderboard(self, challenge_id: Optional[int] = None, limit: int = 10) -> List[Dict]:
         """
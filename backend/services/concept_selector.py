@@ -0,0 +1,223 @@
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Concept, concept_tags
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ConceptPool:
+    """
+    In-memory candidate arrays of active concept ids.
+
+    Ids are kept in sorted `array('l')` buffers per category and per
+    difficulty, along with each concept's category and tag ids. The pool
+    rebuilds itself when concepts or their tags are written through a session
+    in this process (ORM flushes and bulk statements alike), and otherwise
+    re-checks a cheap table signature (count, max id, max updated_at) at
+    most every `refresh_interval` seconds so concepts added by other
+    processes (seeding, news conversion) are picked up.
+    """
+
+    def __init__(self, refresh_interval: float = 60.0):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._signature = None
+        self._checked_at = 0.0
+        self.all_ids = array('l')
+        self.by_category: Dict[int, array] = {}
+        self.by_difficulty: Dict[str, array] = {}
+        self.category_of: Dict[int, int] = {}
+        self.tags_of: Dict[int, Tuple[int, ...]] = {}
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('CONCEPT_POOL_REFRESH_SECONDS', self.refresh_interval)
+        # A fresh app may point at a different database
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if not self._dirty and now - self._checked_at < self.refresh_interval:
+            return
+
+        signature = tuple(db.session.query(
+            func.count(Concept.id),
+            func.max(Concept.id),
+            func.max(Concept.updated_at)
+        ).one())
+
+        with self._lock:
+            self._checked_at = now
+            if self._dirty or signature != self._signature:
+                self._rebuild(signature)
+
+    def _rebuild(self, signature):
+        rows = db.session.query(
+            Concept.id, Concept.category_id, Concept.difficulty
+        ).filter(
+            Concept.is_active == True
+        ).order_by(Concept.id).all()
+
+        by_category: Dict[int, array] = {}
+        by_difficulty: Dict[str, array] = {}
+        category_of = {}
+        for concept_id, category_id, difficulty in rows:
+            by_category.setdefault(category_id, array('l')).append(concept_id)
+            by_difficulty.setdefault(difficulty, array('l')).append(concept_id)
+            category_of[concept_id] = category_id
+
+        tags_of: Dict[int, List[int]] = {}
+        for concept_id, tag_id in db.session.query(
+            concept_tags.c.concept_id, concept_tags.c.tag_id
+        ).all():
+            if concept_id in category_of:
+                tags_of.setdefault(concept_id, []).append(tag_id)
+
+        self.all_ids = array('l', (row.id for row in rows))
+        self.by_category = by_category
+        self.by_difficulty = by_difficulty
+        self.category_of = category_of
+        self.tags_of = {concept_id: tuple(tags) for concept_id, tags in tags_of.items()}
+        self._signature = signature
+        self._dirty = False
+        logger.info(f"Rebuilt concept pool with {len(self.all_ids)} active concepts")
+
+    def candidates(self,
+                   category_ids: Optional[Iterable[int]] = None,
+                   difficulty: Optional[str] = None) -> List[Sequence[int]]:
+        """
+        Candidate id arrays for the given filters. Arrays are returned as-is
+        (not merged) so sampling never copies them.
+        """
+        self.ensure_fresh()
+
+        if category_ids is None:
+            arrays = [self.all_ids]
+        else:
+            arrays = [self.by_category[c] for c in sorted(category_ids) if c in self.by_category]
+
+        if difficulty is not None:
+            allowed = set(self.by_difficulty.get(difficulty, ()))
+            arrays = [array('l', (cid for cid in arr if cid in allowed)) for arr in arrays]
+
+        return [arr for arr in arrays if arr]
+
+
+class ConceptSelector:
+    """
+    Samples concepts without replacement from the pool, skipping ids the
+    user has completed or already has scheduled.
+    """
+
+    def __init__(self,
+                 pool: Optional[ConceptPool] = None,
+                 rng: Optional[random.Random] = None,
+                 seed: Optional[int] = None,
+                 preferred_ratio: float = 0.6):
+        self.pool = pool or concept_pool
+        self.rng = rng or random.Random(seed)
+        self.preferred_ratio = preferred_ratio
+
+    def select(self,
+               limit: int,
+               excluded: Set[int],
+               preferred_categories: Optional[Set[int]] = None) -> List[int]:
+        """
+        Pick up to `limit` ids: a share from the preferred categories and the
+        rest from the whole catalog
+        """
+        picked: List[int] = []
+
+        if preferred_categories:
+            preferred_limit = int(limit * self.preferred_ratio)
+            if preferred_limit > 0:
+                picked.extend(self.sample(
+                    self.pool.candidates(category_ids=preferred_categories),
+                    preferred_limit,
+                    excluded
+                ))
+
+        remaining_needed = limit - len(picked)
+        if remaining_needed > 0:
+            picked.extend(self.sample(
+                self.pool.candidates(),
+                remaining_needed,
+                excluded | set(picked) if picked else excluded
+            ))
+
+        return picked[:limit]
+
+    def sample(self,
+               arrays: List[Sequence[int]],
+               k: int,
+               excluded: Set[int]) -> List[int]:
+        """
+        Draw k distinct ids from the union of `arrays`, avoiding `excluded`.
+
+        Uses rejection sampling over the concatenated index space, which is
+        independent of catalog size while most candidates are eligible, and
+        falls back to a filtered scan once too many draws are rejected.
+        """
+        offsets = []
+        total = 0
+        for arr in arrays:
+            offsets.append(total)
+            total += len(arr)
+        if total == 0 or k <= 0:
+            return []
+
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        max_attempts = 8 * k + 32
+        attempts = 0
+        while len(chosen) < k and attempts < max_attempts:
+            attempts += 1
+            position = self.rng.randrange(total)
+            index = bisect_right(offsets, position) - 1
+            concept_id = arrays[index][position - offsets[index]]
+            if concept_id in excluded or concept_id in seen:
+                continue
+            seen.add(concept_id)
+            chosen.append(concept_id)
+
+        if len(chosen) < k:
+            # Dense exclusions: enumerate what is left and sample from it
+            available = [
+                cid for arr in arrays for cid in arr
+                if cid not in excluded and cid not in seen
+            ]
+            chosen.extend(self.rng.sample(available, min(k - len(chosen), len(available))))
+
+        return chosen
+
+
+concept_pool = ConceptPool()
+
+
+@event.listens_for(Concept, 'after_insert')
+@event.listens_for(Concept, 'after_update')
+@event.listens_for(Concept, 'after_delete')
+def _concept_changed(mapper, connection, target):
+    concept_pool.mark_dirty()
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _concept_statement(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements (insert(Concept), Core table
+    # statements) run through the session but skip the mapper events above
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if getattr(table, 'name', None) in (Concept.__tablename__, concept_tags.name):
+        concept_pool.mark_dirty()
@@ -1,12 +1,20 @@
 import logging
 from datetime import datetime, timedelta, date
 from typing import List, Optional, Dict
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, delete, update
+from sqlalchemy.orm import joinedload, selectinload
 from extensions import db
 from models import (
     User, Concept, DailyContent, UserProgress, 
     Category, Tag
 )
+from utils.time_utils import local_today, local_day_end_utc
+from .progress_writer import ProgressWriter
+from .bulk_scheduler import BulkScheduler
+from .affinity import AffinityRecommender
+from .delivery_buffer import delivery_buffer
+from .review_scheduler import ReviewScheduler
+from .streak_tracker import StreakTracker
 import random
 
 logger = logging.getLogger(__name__)
@@ -16,6 +24,12 @@ class DailyDeliveryService:
     def __init__(self):
         self.max_concepts_per_day = 3
         self.lookahead_days = 7  # Schedule concepts for next 7 days
+        self.progress_writer = ProgressWriter()
+        self.recommender = AffinityRecommender()
+        self.delivery_buffer = delivery_buffer
+        self.review_scheduler = ReviewScheduler()
+        self.streak_tracker = StreakTracker()
+        self.max_reviews_per_day = 10
         
     def schedule_daily_concepts_for_user(self, user_id: int) -> Dict[str, int]:
         """
@@ -27,7 +41,7 @@ class DailyDeliveryService:
             
         try:
             scheduled_count = 0
-            today = date.today()
+            today = local_today(user.timezone)
             
             for day_offset in range(self.lookahead_days):
                 target_date = today + timedelta(days=day_offset)
@@ -58,7 +72,8 @@ class DailyDeliveryService:
                     )
                     db.session.add(daily_content)
                     scheduled_count += 1
-                    
+            
+            user.scheduled_through = today + timedelta(days=self.lookahead_days - 1)
             db.session.commit()
             logger.info(f"Scheduled {scheduled_count} concepts for user {user_id}")
             
@@ -80,103 +95,116 @@ class DailyDeliveryService:
         """
         Get suitable concepts for a user based on their progress and preferences
         """
-        # Get user's completed concepts
-        completed_concept_ids = db.session.query(UserProgress.concept_id).filter(
+        # Concepts the user has completed or already has scheduled
+        completed = db.session.query(UserProgress.concept_id).filter(
             UserProgress.user_id == user_id,
-            UserProgress.status == 'completed'
-        ).subquery()
-        
-        # Get already scheduled concepts
-        scheduled_concept_ids = db.session.query(DailyContent.concept_id).filter(
+            UserProgress.status.in_(BulkScheduler.excluded_statuses)
+        )
+        scheduled = db.session.query(DailyContent.concept_id).filter(
             DailyContent.user_id == user_id
-        ).subquery()
-        
-        # Get user's preferred categories (based on progress)
-        user_categories = db.session.query(
-            Category.id,
-            func.count(UserProgress.id).label('progress_count')
-        ).join(
-            Concept, Category.id == Concept.category_id
-        ).join(
-            UserProgress, UserProgress.concept_id == Concept.id
-        ).filter(
-            UserProgress.user_id == user_id
-        ).group_by(
-            Category.id
-        ).all()
-        
-        preferred_category_ids = [cat.id for cat in user_categories] if user_categories else []
-        
-        # Build query for available concepts
-        query = Concept.query.filter(
-            Concept.is_active == True,
-            ~Concept.id.in_(completed_concept_ids),
-            ~Concept.id.in_(scheduled_concept_ids)
         )
+        excluded = {row[0] for row in completed.union(scheduled).all()}
         
-        # Mix of preferred categories and new topics
-        concepts = []
-        
-        # 60% from preferred categories if available
-        if preferred_category_ids:
-            preferred_limit = int(limit * 0.6)
-            preferred_concepts = query.filter(
-                Concept.category_id.in_(preferred_category_ids)
-            ).order_by(func.random()).limit(preferred_limit).all()
-            concepts.extend(preferred_concepts)
+        # Affinity-ranked picks mixed with exploration, sampled in memory
+        vectors = self.progress_writer.affinities.load([user_id])
+        concept_ids = self.recommender.recommend({user_id: limit}, {user_id: excluded}, vectors)[user_id]
+        if not concept_ids:
+            return []
         
-        # Fill remaining with diverse topics
-        remaining_needed = limit - len(concepts)
-        if remaining_needed > 0:
-            exclude_ids = [c.id for c in concepts]
-            diverse_concepts = query.filter(
-                ~Concept.id.in_(exclude_ids)
-            ).order_by(func.random()).limit(remaining_needed).all()
-            concepts.extend(diverse_concepts)
-        
-        return concepts[:limit]
+        concepts_by_id = {
+            concept.id: concept
+            for concept in Concept.query.filter(Concept.id.in_(concept_ids)).all()
+        }
+        return [concepts_by_id[cid] for cid in concept_ids if cid in concepts_by_id]
+    
+    def user_today(self, user_id: int) -> date:
+        """
+        The user's current calendar date in their own timezone
+        """
+        tz_name = db.session.query(User.timezone).filter(User.id == user_id).scalar()
+        return local_today(tz_name)
     
-    def get_today_concepts(self, user_id: int) -> List[Dict]:
+    def get_today_concepts(self, user_id: int, today: Optional[date] = None) -> List[Dict]:
         """
         Get today's scheduled concepts for a user
         """
-        today = date.today()
+        today = today or self.user_today(user_id)
         
-        daily_contents = DailyContent.query.filter_by(
-            user_id=user_id,
-            scheduled_date=today
-        ).all()
+        # Read-only: one query with the concept, category and tags loaded,
+        # delivery is acknowledged through the buffer instead of a commit
+        daily_contents = DailyContent.query.options(
+            joinedload(DailyContent.concept).joinedload(Concept.category),
+            joinedload(DailyContent.concept).joinedload(Concept.tags)
+        ).filter(
+            DailyContent.user_id == user_id,
+            DailyContent.scheduled_date == today
+        ).order_by(DailyContent.id).all()
         
-        # Mark as delivered
-        for dc in daily_contents:
-            if not dc.is_delivered:
-                dc.is_delivered = True
-                dc.delivered_at = datetime.utcnow()
+        undelivered = [dc.id for dc in daily_contents if not dc.is_delivered]
+        acked = self.delivery_buffer.ack(undelivered) if undelivered else {}
         
+        result = []
+        for dc in daily_contents:
+            data = dc.to_dict()
+            if dc.id in acked:
+                data['is_delivered'] = True
+                data['delivered_at'] = acked[dc.id].isoformat()
+            result.append(data)
+        return result
+    
+    def get_due_reviews(self, user_id: int, today: Optional[date] = None) -> List[Dict]:
+        """
+        Completed concepts due for review by the end of the user's day
+        """
+        tz_name = db.session.query(User.timezone).filter(User.id == user_id).scalar()
+        today = today or local_today(tz_name)
+        states = self.review_scheduler.due_reviews(
+            user_id, local_day_end_utc(tz_name, today), limit=self.max_reviews_per_day
+        )
+        return [
+            dict(state.to_dict(), concept=state.concept.to_summary_dict())
+            for state in states
+        ]
+    
+    def record_review(self, user_id: int, concept_id: int, quality: int) -> Optional[Dict]:
+        """
+        Grade a review (0-5) and schedule the next one; None unless the user
+        completed the concept
+        """
+        state = self.review_scheduler.record_review(user_id, concept_id, quality)
+        if state is None:
+            return None
         db.session.commit()
-        
-        return [dc.to_dict() for dc in daily_contents]
+        return state.to_dict()
     
-    def get_upcoming_concepts(self, user_id: int, days: int = 7) -> Dict[str, List]:
+    def get_upcoming_concepts(self, user_id: int, days: int = 7, summary: bool = True) -> Dict[str, List]:
         """
-        Get upcoming scheduled concepts for a user
+        Get upcoming scheduled concepts for a user, grouped by date. The
+        summary view leaves out concept bodies; the query count does not
+        depend on the window size.
         """
-        today = date.today()
+        today = self.user_today(user_id)
         end_date = today + timedelta(days=days)
         
-        daily_contents = DailyContent.query.filter(
+        concept_loader = selectinload(DailyContent.concept)
+        if summary:
+            concept_loader = concept_loader.load_only(
+                Concept.id, Concept.title, Concept.short_description,
+                Concept.difficulty, Concept.category_id
+            )
+        daily_contents = DailyContent.query.options(
+            concept_loader.selectinload(Concept.category),
+            concept_loader.selectinload(Concept.tags)
+        ).filter(
             DailyContent.user_id == user_id,
             DailyContent.scheduled_date >= today,
             DailyContent.scheduled_date <= end_date
-        ).order_by(DailyContent.scheduled_date).all()
+        ).order_by(DailyContent.scheduled_date, DailyContent.id).all()
         
         # Group by date
         grouped = {}
         for dc in daily_contents:
-            date_str = dc.scheduled_date.isoformat()
-            if date_str not in grouped:
-                grouped[date_str] = []
-            grouped[date_str].append(dc.to_dict())
+            grouped.setdefault(dc.scheduled_date.isoformat(), []).append(dc.to_dict(summary=summary))
             
         return grouped
     
@@ -184,23 +212,7 @@ class DailyDeliveryService:
         """
         Mark a concept as started by a user
         """
-        progress = UserProgress.query.filter_by(
-            user_id=user_id,
-            concept_id=concept_id
-        ).first()
-        
-        if not progress:
-            progress = UserProgress(
-                user_id=user_id,
-                concept_id=concept_id,
-                status='in_progress',
-                started_at=datetime.utcnow()
-            )
-            db.session.add(progress)
-        elif progress.status == 'not_started':
-            progress.status = 'in_progress'
-            progress.started_at = datetime.utcnow()
-            
+        progress = self.progress_writer.start_concept(user_id, concept_id)
         db.session.commit()
         return progress
     
@@ -212,129 +224,92 @@ class DailyDeliveryService:
         """
         Mark a concept as completed by a user
         """
-        progress = UserProgress.query.filter_by(
-            user_id=user_id,
-            concept_id=concept_id
-        ).first()
-        
-        if not progress:
-            progress = UserProgress(
-                user_id=user_id,
-                concept_id=concept_id,
-                status='completed',
-                started_at=datetime.utcnow(),
-                completed_at=datetime.utcnow()
-            )
-            db.session.add(progress)
-        else:
-            progress.status = 'completed'
-            progress.completed_at = datetime.utcnow()
-            
-        if rating:
-            progress.rating = rating
-        if notes:
-            progress.notes = notes
-            
+        progress = self.progress_writer.complete_concept(
+            user_id, concept_id, rating, notes
+        )
+        self.review_scheduler.enroll(user_id, concept_id)
+        today = self.user_today(user_id)
+        self.streak_tracker.record_activity(user_id, today)
+        # Learned early: free any later slot holding it and refill
+        self._release_and_top_up(user_id, concept_id, today + timedelta(days=1), today)
         db.session.commit()
         return progress
     
-    def get_user_statistics(self, user_id: int) -> Dict:
+    def skip_concept(self, user_id: int, concept_id: int) -> UserProgress:
         """
-        Get learning statistics for a user
+        Skip a concept: drop it from the user's schedule (including today)
+        and refill the freed slots
         """
-        # Total concepts completed
-        completed_count = UserProgress.query.filter_by(
-            user_id=user_id,
-            status='completed'
-        ).count()
-        
-        # In progress
-        in_progress_count = UserProgress.query.filter_by(
-            user_id=user_id,
-            status='in_progress'
-        ).count()
-        
-        # Concepts by category
-        category_stats = db.session.query(
-            Category.name,
-            func.count(UserProgress.id).label('count')
-        ).join(
-            Concept, Category.id == Concept.category_id
-        ).join(
-            UserProgress, UserProgress.concept_id == Concept.id
-        ).filter(
-            UserProgress.user_id == user_id,
-            UserProgress.status == 'completed'
-        ).group_by(
-            Category.name
-        ).all()
-        
-        # Learning streak
-        streak = self._calculate_learning_streak(user_id)
+        progress = self.progress_writer.skip_concept(user_id, concept_id)
+        today = self.user_today(user_id)
+        self._release_and_top_up(user_id, concept_id, today, today)
+        db.session.commit()
+        return progress
+    
+    def _release_and_top_up(self, user_id: int, concept_id: int, from_date: date, today: date) -> int:
+        """
+        Remove the concept's scheduled slots from `from_date` on and, if any
+        were freed, pull the user's watermark back and top up just those days
+        """
+        released = db.session.execute(
+            delete(DailyContent).where(
+                DailyContent.user_id == user_id,
+                DailyContent.concept_id == concept_id,
+                DailyContent.scheduled_date >= from_date
+            ).returning(DailyContent.scheduled_date),
+            execution_options={'synchronize_session': False}
+        ).scalars().all()
+        if not released:
+            return 0
         
-        # Average rating
-        avg_rating = db.session.query(
-            func.avg(UserProgress.rating)
-        ).filter(
-            UserProgress.user_id == user_id,
-            UserProgress.rating.isnot(None)
-        ).scalar() or 0
+        earliest = min(released)
+        db.session.execute(
+            update(User).where(
+                User.id == user_id,
+                User.scheduled_through >= earliest
+            ).values(scheduled_through=earliest - timedelta(days=1)),
+            execution_options={'synchronize_session': False}
+        )
+        # The caller commits the release, the top-up and its own writes together
+        return self._bulk_scheduler().schedule_users([user_id], start_date=today)
+    
+    def _bulk_scheduler(self) -> BulkScheduler:
+        return BulkScheduler(
+            max_concepts_per_day=self.max_concepts_per_day,
+            lookahead_days=self.lookahead_days
+        )
+    
+    def get_user_statistics(self, user_id: int) -> Dict:
+        """
+        Get learning statistics for a user from the materialized snapshot
+        """
+        snapshot = self.progress_writer.stats.snapshot(user_id)
+        if snapshot is None:
+            snapshot = {
+                'user': None, 'completed_count': 0, 'in_progress_count': 0,
+                'rating_sum': 0, 'rating_count': 0, 'categories': {}
+            }
+        user = snapshot['user']
+        completed_count = snapshot['completed_count']
+        in_progress_count = snapshot['in_progress_count']
+        rating_count = snapshot['rating_count']
+        avg_rating = snapshot['rating_sum'] / rating_count if rating_count else 0
         
         return {
             'completed_concepts': completed_count,
             'in_progress_concepts': in_progress_count,
             'total_concepts_seen': completed_count + in_progress_count,
             'categories_learned': [
-                {'category': cat.name, 'count': cat.count} 
-                for cat in category_stats
+                {'category': name, 'count': count}
+                for name, count in snapshot['categories'].items()
             ],
-            'learning_streak': streak,
+            'learning_streak': self.streak_tracker.current_streak(user) if user else 0,
+            'longest_streak': (user.longest_streak or 0) if user else 0,
             'average_rating': round(float(avg_rating), 2)
         }
     
-    def _calculate_learning_streak(self, user_id: int) -> int:
-        """
-        Calculate consecutive days of learning
-        """
-        # Get all completed dates
-        completed_dates = db.session.query(
-            func.date(UserProgress.completed_at)
-        ).filter(
-            UserProgress.user_id == user_id,
-            UserProgress.status == 'completed',
-            UserProgress.completed_at.isnot(None)
-        ).order_by(
-            func.date(UserProgress.completed_at).desc()
-        ).all()
-        
-        if not completed_dates:
-            return 0
-            
-        streak = 0
-        today = date.today()
-        current_date = today
-        
-        for (completed_date,) in completed_dates:
-            if completed_date == current_date:
-                streak += 1
-                current_date = current_date - timedelta(days=1)
-            elif completed_date < current_date:
-                break
-                
-        return streak
-    
     def schedule_all_users(self) -> Dict[str, int]:
         """
         Schedule concepts for all active users
         """
-        users = User.query.filter_by(is_active=True).all()
-        scheduled_total = 0
-        
-        for user in users:
-            result = self.schedule_daily_concepts_for_user(user.id)
-            scheduled_total += result.get('scheduled', 0)
-            
-        return {
-            'users_processed': len(users),
-            'concepts_scheduled': scheduled_total
-        }
\ No newline at end of file
+        return self._bulk_scheduler().schedule()
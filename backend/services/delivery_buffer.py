@@ -0,0 +1,149 @@
+import atexit
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import bindparam, update
+from extensions import db
+from models import DailyContent
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryBuffer:
+    """
+    In-memory buffer of DailyContent delivery acknowledgements.
+
+    Reading today's concepts only records the ids it served here; a
+    background flusher periodically writes them in batches, one executemany
+    `UPDATE` per batch carrying each row's own acknowledgement time, so the
+    read path never opens a write transaction. Rows already marked
+    delivered are left untouched. A full buffer wakes the flusher early
+    rather than writing on the request's session. Unflushed
+    acknowledgements are lost if the process dies, which only delays the
+    informational delivered flag.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 5.0, max_pending: int = 50000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._atexit_registered = False
+        self.enabled = False
+
+    def init_app(self, app):
+        self.batch_size = app.config.get('DELIVERY_FLUSH_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('DELIVERY_FLUSH_SECONDS', self.flush_interval)
+        self.max_pending = app.config.get('DELIVERY_BUFFER_MAX_PENDING', self.max_pending)
+        self._app = app
+        # A fresh app may point at a different database
+        with self._lock:
+            self._pending.clear()
+        self.enabled = app.config.get('DELIVERY_FLUSHER_ENABLED', True) and self.flush_interval > 0
+
+    def ack(self, daily_content_ids: Iterable[int], at: Optional[datetime] = None) -> Dict[int, datetime]:
+        """
+        Record deliveries and return the acknowledgement time of each id
+        """
+        at = at or datetime.utcnow()
+        acked = {}
+        with self._lock:
+            for dc_id in daily_content_ids:
+                acked[dc_id] = self._pending.setdefault(dc_id, at)
+            overflow = len(self._pending) >= self.max_pending
+
+        if overflow:
+            # Don't let the buffer grow until the next interval; without a
+            # flusher thread, write in a separate app context and session
+            if self._thread is not None and self._thread.is_alive():
+                self._wake.set()
+            else:
+                self._flush_in_app()
+        return acked
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write buffered acknowledgements; returns the number of rows updated
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = DailyContent.__table__
+        stmt = update(table).where(
+            table.c.id == bindparam('dc_id'),
+            table.c.is_delivered.isnot(True)
+        ).values(is_delivered=True, delivered_at=bindparam('at'))
+        items = [{'dc_id': dc_id, 'at': at} for dc_id, at in sorted(pending.items())]
+
+        updated = 0
+        try:
+            for offset in range(0, len(items), self.batch_size):
+                # One executemany round trip per batch
+                result = db.session.execute(stmt, items[offset:offset + self.batch_size])
+                updated += result.rowcount
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            # Put them back so the next flush retries
+            with self._lock:
+                for dc_id, at in pending.items():
+                    self._pending.setdefault(dc_id, at)
+            logger.error(f"Error flushing {len(pending)} delivery acks: {str(e)}")
+            return 0
+
+        logger.debug(f"Flushed {len(pending)} delivery acks ({updated} rows updated)")
+        return updated
+
+    def start(self):
+        """
+        Start the flusher thread; the app calls this in processes serving
+        requests only
+        """
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='delivery-flusher', daemon=True)
+        self._thread.start()
+        if not self._atexit_registered:
+            # Flush whatever is left when the worker shuts down
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self._flush_in_app()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush_in_app()
+
+    def _flush_in_app(self):
+        if self._app is None:
+            return
+        with self._app.app_context():
+            try:
+                self.flush()
+            finally:
+                db.session.remove()
+
+
+# Per-process buffer shared by all requests
+delivery_buffer = DeliveryBuffer()
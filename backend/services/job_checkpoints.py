@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import List, Optional
+from extensions import db
+from models import JobCheckpoint
+from utils.db_utils import upsert_insert
+
+
+class CheckpointStore:
+    """
+    Per-shard progress cursors for a job run.
+
+    `advance` is meant to be called inside the transaction that commits a
+    chunk of work, so the cursor and the work it describes are committed
+    together and a resumed run never repeats or skips a chunk.
+    """
+
+    def __init__(self, run_id: int):
+        self.run_id = run_id
+
+    def advance(self, shard_index: int, user_ids: List[int], scheduled: int):
+        now = datetime.utcnow()
+        stmt = upsert_insert(JobCheckpoint).values(
+            run_id=self.run_id,
+            shard_index=shard_index,
+            status='running',
+            last_user_id=max(user_ids),
+            users_processed=len(user_ids),
+            concepts_scheduled=scheduled,
+            updated_at=now
+        )
+        current = JobCheckpoint
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[current.run_id, current.shard_index],
+            set_={
+                'status': 'running',
+                'last_user_id': excluded.last_user_id,
+                'users_processed': current.users_processed + excluded.users_processed,
+                'concepts_scheduled': current.concepts_scheduled + excluded.concepts_scheduled,
+                'updated_at': excluded.updated_at
+            }
+        )
+        db.session.execute(stmt)
+
+    def finish(self, shard_index: int, error: Optional[str] = None):
+        stmt = upsert_insert(JobCheckpoint).values(
+            run_id=self.run_id,
+            shard_index=shard_index,
+            status='failed' if error else 'completed',
+            last_user_id=0,
+            users_processed=0,
+            concepts_scheduled=0,
+            error_message=error,
+            updated_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobCheckpoint.run_id, JobCheckpoint.shard_index],
+            set_={
+                'status': stmt.excluded.status,
+                'error_message': stmt.excluded.error_message,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+
+    def load(self):
+        return {
+            cp.shard_index: cp
+            for cp in JobCheckpoint.query.filter_by(run_id=self.run_id).all()
+        }
@@ -0,0 +1,266 @@
+import random
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, update
+from extensions import db
+from models import Category, Concept, User, UserProgress, UserStats, UserCategoryStats
+from utils.db_utils import upsert_insert
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (status, rating) of a UserProgress row, or None when there is no row
+ProgressState = Optional[Tuple[Optional[str], Optional[int]]]
+
+
+class LearningStats:
+    """
+    Materialized per-user learning statistics.
+
+    `user_stats` holds completed/in-progress counts and the rating sum and
+    count, `user_category_stats` the completed count per category. Progress
+    writes lock the user's stats row, read the old progress state and apply
+    the difference in the same transaction, so the snapshot is always
+    consistent with `user_progress` and is served with one query.
+    `check_consistency` recomputes a sample of users from raw rows and
+    `backfill` rebuilds everyone (backfill_learning_stats.py).
+    """
+
+    def lock(self, user_id: int):
+        """
+        Serialize progress writes for one user until the transaction ends
+        """
+        db.session.execute(
+            upsert_insert(UserStats).values(user_id=user_id).on_conflict_do_nothing(
+                index_elements=['user_id']
+            )
+        )
+        db.session.query(UserStats.user_id).filter(
+            UserStats.user_id == user_id
+        ).with_for_update().one()
+
+    def current_state(self, user_id: int, concept_id: int) -> Tuple[Optional[int], ProgressState]:
+        """
+        The concept's category and the user's current progress on it
+        """
+        row = db.session.query(
+            Concept.category_id, UserProgress.id, UserProgress.status, UserProgress.rating
+        ).outerjoin(
+            UserProgress, and_(UserProgress.concept_id == Concept.id, UserProgress.user_id == user_id)
+        ).filter(Concept.id == concept_id).first()
+        if row is None:
+            return None, None
+        category_id, progress_id, status, rating = row
+        return category_id, (status, rating) if progress_id is not None else None
+
+    def apply(self, user_id: int, category_id: Optional[int], before: ProgressState, after: ProgressState):
+        """
+        Apply the change from `before` to `after` to the snapshot
+        """
+        before_status, before_rating = before or (None, None)
+        after_status, after_rating = after or (None, None)
+
+        completed = (after_status == 'completed') - (before_status == 'completed')
+        in_progress = (after_status == 'in_progress') - (before_status == 'in_progress')
+        rating_sum = (after_rating or 0) - (before_rating or 0)
+        rating_count = (after_rating is not None) - (before_rating is not None)
+        if not (completed or in_progress or rating_sum or rating_count):
+            return
+
+        current = UserStats
+        db.session.execute(
+            update(UserStats).where(current.user_id == user_id).values(
+                completed_count=current.completed_count + completed,
+                in_progress_count=current.in_progress_count + in_progress,
+                rating_sum=current.rating_sum + rating_sum,
+                rating_count=current.rating_count + rating_count
+            ),
+            execution_options={'synchronize_session': False}
+        )
+
+        if completed and category_id is not None:
+            stmt = upsert_insert(UserCategoryStats).values(
+                user_id=user_id,
+                category_id=category_id,
+                completed_count=max(completed, 0)
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserCategoryStats.user_id, UserCategoryStats.category_id],
+                set_={'completed_count': UserCategoryStats.completed_count + completed}
+            )
+            db.session.execute(stmt)
+
+    def snapshot(self, user_id: int) -> Optional[Dict]:
+        """
+        The user's stats and streak columns in one query
+        """
+        rows = db.session.query(
+            User.timezone, User.current_streak, User.longest_streak, User.last_activity_date,
+            UserStats.completed_count, UserStats.in_progress_count,
+            UserStats.rating_sum, UserStats.rating_count,
+            Category.name.label('category'), UserCategoryStats.completed_count.label('category_count')
+        ).select_from(User).outerjoin(
+            UserStats, UserStats.user_id == User.id
+        ).outerjoin(
+            UserCategoryStats, and_(
+                UserCategoryStats.user_id == User.id,
+                UserCategoryStats.completed_count > 0
+            )
+        ).outerjoin(
+            Category, Category.id == UserCategoryStats.category_id
+        ).filter(User.id == user_id).all()
+        if not rows:
+            return None
+
+        first = rows[0]
+        return {
+            'user': first,
+            'completed_count': first.completed_count or 0,
+            'in_progress_count': first.in_progress_count or 0,
+            'rating_sum': first.rating_sum or 0,
+            'rating_count': first.rating_count or 0,
+            'categories': {row.category: row.category_count for row in rows if row.category is not None}
+        }
+
+    def recompute(self, user_id: int) -> Dict:
+        """
+        Stats for one user computed from raw progress rows
+        """
+        progress = db.session.query(
+            UserProgress.status, UserProgress.rating, Concept.category_id
+        ).join(Concept, Concept.id == UserProgress.concept_id).filter(
+            UserProgress.user_id == user_id
+        ).all()
+
+        categories = Counter(category_id for status, _, category_id in progress if status == 'completed')
+        ratings = [rating for _, rating, _ in progress if rating is not None]
+        return {
+            'completed_count': sum(1 for status, _, _ in progress if status == 'completed'),
+            'in_progress_count': sum(1 for status, _, _ in progress if status == 'in_progress'),
+            'rating_sum': sum(ratings),
+            'rating_count': len(ratings),
+            'categories': dict(categories)
+        }
+
+    def stored(self, user_id: int) -> Dict:
+        stats = db.session.get(UserStats, user_id, populate_existing=True)
+        categories = dict(db.session.query(
+            UserCategoryStats.category_id, UserCategoryStats.completed_count
+        ).filter(
+            UserCategoryStats.user_id == user_id,
+            UserCategoryStats.completed_count != 0
+        ).all())
+        data = stats.to_dict() if stats else {
+            'completed_count': 0, 'in_progress_count': 0, 'rating_sum': 0, 'rating_count': 0
+        }
+        data['categories'] = categories
+        return data
+
+    def rebuild(self, user_id: int, expected: Optional[Dict] = None):
+        """
+        Overwrite a user's snapshot with values recomputed from raw rows
+        """
+        self.lock(user_id)
+        expected = expected or self.recompute(user_id)
+        db.session.execute(
+            update(UserStats).where(UserStats.user_id == user_id).values(
+                completed_count=expected['completed_count'],
+                in_progress_count=expected['in_progress_count'],
+                rating_sum=expected['rating_sum'],
+                rating_count=expected['rating_count']
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(delete(UserCategoryStats).where(UserCategoryStats.user_id == user_id))
+        if expected['categories']:
+            db.session.execute(insert(UserCategoryStats), [
+                {'user_id': user_id, 'category_id': category_id, 'completed_count': count}
+                for category_id, count in expected['categories'].items()
+            ])
+
+    def backfill(self, user_ids: Optional[Iterable[int]] = None, chunk_size: int = 500) -> Dict[str, int]:
+        """
+        Rebuild the snapshot of every user (or the given ones) from raw
+        progress rows with a few grouped queries per chunk; users who
+        predate the snapshot tables get their rows here
+        """
+        if user_ids is None:
+            user_ids = [row.id for row in db.session.query(User.id).order_by(User.id).all()]
+        else:
+            user_ids = list(user_ids)
+
+        for offset in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[offset:offset + chunk_size]
+            # Same row locks as progress writes, so none is lost mid-rebuild
+            db.session.execute(
+                upsert_insert(UserStats).values([{'user_id': user_id} for user_id in chunk]).on_conflict_do_nothing(
+                    index_elements=['user_id']
+                )
+            )
+            db.session.query(UserStats.user_id).filter(UserStats.user_id.in_(chunk)).with_for_update().all()
+
+            totals = {
+                user_id: (completed or 0, in_progress or 0, rating_sum or 0, rating_count)
+                for user_id, completed, in_progress, rating_sum, rating_count in db.session.query(
+                    UserProgress.user_id,
+                    func.sum(case((UserProgress.status == 'completed', 1), else_=0)),
+                    func.sum(case((UserProgress.status == 'in_progress', 1), else_=0)),
+                    func.sum(UserProgress.rating),
+                    func.count(UserProgress.rating)
+                ).filter(UserProgress.user_id.in_(chunk)).group_by(UserProgress.user_id).all()
+            }
+            db.session.execute(update(UserStats), [
+                dict(zip(
+                    ('user_id', 'completed_count', 'in_progress_count', 'rating_sum', 'rating_count'),
+                    (user_id,) + totals.get(user_id, (0, 0, 0, 0))
+                ))
+                for user_id in chunk
+            ])
+
+            categories = db.session.query(
+                UserProgress.user_id, Concept.category_id, func.count(UserProgress.id)
+            ).join(Concept, Concept.id == UserProgress.concept_id).filter(
+                UserProgress.user_id.in_(chunk),
+                UserProgress.status == 'completed'
+            ).group_by(UserProgress.user_id, Concept.category_id).all()
+            db.session.execute(delete(UserCategoryStats).where(UserCategoryStats.user_id.in_(chunk)))
+            if categories:
+                db.session.execute(insert(UserCategoryStats), [
+                    {'user_id': user_id, 'category_id': category_id, 'completed_count': count}
+                    for user_id, category_id, count in categories
+                ])
+            db.session.commit()
+
+        logger.info(f"Backfilled learning stats for {len(user_ids)} users")
+        return {'users_processed': len(user_ids)}
+
+    def check_consistency(self,
+                          sample_size: Optional[int] = 100,
+                          repair: bool = True,
+                          rng: Optional[random.Random] = None) -> Dict:
+        """
+        Compare the snapshot with raw rows for a random sample of users
+        (every user when `sample_size` is falsy) and optionally rebuild the
+        ones that drifted
+        """
+        rng = rng or random.Random()
+        user_ids = [row.id for row in db.session.query(User.id).order_by(User.id).all()]
+        sample = rng.sample(user_ids, min(sample_size, len(user_ids))) if sample_size else user_ids
+
+        mismatched: List[int] = []
+        for user_id in sample:
+            expected = self.recompute(user_id)
+            if self.stored(user_id) != expected:
+                mismatched.append(user_id)
+                if repair:
+                    self.rebuild(user_id, expected)
+                    db.session.commit()
+
+        if mismatched:
+            logger.warning(f"Learning stats drifted for {len(mismatched)} of {len(sample)} sampled users")
+        return {
+            'checked': len(sample),
+            'mismatched': len(mismatched),
+            'repaired': len(mismatched) if repair else 0,
+            'user_ids': mismatched
+        }
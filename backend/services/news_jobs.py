@@ -0,0 +1,207 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import and_, or_, update
+from extensions import db
+from models import NewsFetchJob
+from .news_service import NewsAPIService
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('fetch', 'daily')
+
+
+class NewsJobQueue:
+    """
+    Database-backed queue for NewsAPI work requested over HTTP.
+
+    `submit` records a NewsFetchJob and returns at once. Worker threads in
+    the web processes claim queued rows from the table (`FOR UPDATE SKIP
+    LOCKED` plus a guarded status update), so a job queued by a process
+    that restarts is still picked up by another one. Jobs left `running`
+    for longer than `stale_seconds` belonged to a dead worker and are
+    failed when a worker starts and on each poll. An identical job (same
+    kind, parameters and requester) still queued, or running and not
+    stale, within `coalesce_seconds` is returned instead of a new one; jobs
+    are only visible to their requester, so users never share one. The
+    response cache still spares NewsAPI the duplicate calls. With background
+    jobs disabled (tests), jobs run inline.
+    """
+
+    def __init__(self,
+                 max_queued: int = 16,
+                 coalesce_seconds: int = 600,
+                 stale_seconds: int = 1800,
+                 poll_interval: float = 5.0,
+                 service=None):
+        self.max_queued = max_queued
+        self.coalesce_seconds = coalesce_seconds
+        self.stale_seconds = stale_seconds
+        self.poll_interval = poll_interval
+        self.service = service
+        self.background = False
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def init_app(self, app):
+        self.max_queued = app.config.get('NEWS_JOB_QUEUE_SIZE', self.max_queued)
+        self.coalesce_seconds = app.config.get('NEWS_JOB_COALESCE_SECONDS', self.coalesce_seconds)
+        self.stale_seconds = app.config.get('NEWS_JOB_STALE_SECONDS', self.stale_seconds)
+        self.background = app.config.get('NEWS_BACKGROUND_JOBS', True)
+        self._app = app
+
+    def submit(self, kind: str, params: Optional[Dict] = None, user_id: Optional[int] = None) -> Optional[NewsFetchJob]:
+        """
+        Queue a job, or return the identical one this user already has
+        pending; None when the queue is full
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown news job kind: {kind}")
+        params = params or {}
+        dedupe_key = hashlib.sha256(json.dumps([kind, params], sort_keys=True).encode()).hexdigest()
+        now = datetime.utcnow()
+
+        pending = NewsFetchJob.query.filter(
+            NewsFetchJob.dedupe_key == dedupe_key,
+            NewsFetchJob.requested_by == user_id,
+            NewsFetchJob.created_at >= now - timedelta(seconds=self.coalesce_seconds),
+            or_(
+                NewsFetchJob.status == 'queued',
+                and_(
+                    NewsFetchJob.status == 'running',
+                    NewsFetchJob.started_at >= now - timedelta(seconds=self.stale_seconds)
+                )
+            )
+        ).order_by(NewsFetchJob.id).first()
+        if pending is not None:
+            return pending
+
+        if self.background and self.pending_count() >= self.max_queued:
+            logger.warning(f"News job queue full; rejected {kind} job")
+            return None
+
+        job = NewsFetchJob(kind=kind, params=params, dedupe_key=dedupe_key, requested_by=user_id)
+        db.session.add(job)
+        db.session.commit()
+
+        if not self.background:
+            self.run_job(job.id)
+        else:
+            self._wake.set()
+        return job
+
+    def run_job(self, job_id: int) -> bool:
+        """
+        Claim a queued job and run it; False if another worker got it first
+        """
+        claimed = db.session.execute(
+            update(NewsFetchJob).where(
+                NewsFetchJob.id == job_id,
+                NewsFetchJob.status == 'queued'
+            ).values(status='running', started_at=datetime.utcnow()),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return False
+
+        job = db.session.get(NewsFetchJob, job_id)
+        db.session.refresh(job)
+        try:
+            result = self._execute(job.kind, job.params or {})
+            job = db.session.get(NewsFetchJob, job_id)
+            job.status = 'completed'
+            job.result = result
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(NewsFetchJob, job_id)
+            job.status = 'failed'
+            job.error_message = str(e)
+            logger.error(f"News job {job_id} failed: {str(e)}")
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return True
+
+    def claim_next(self) -> Optional[int]:
+        """
+        Id of the oldest queued job, skipping rows another worker has locked
+        """
+        job_id = db.session.query(NewsFetchJob.id).filter(
+            NewsFetchJob.status == 'queued'
+        ).order_by(NewsFetchJob.id).with_for_update(skip_locked=True).limit(1).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+        self.run_job(job_id)
+        return job_id
+
+    def fail_stale(self) -> int:
+        """
+        Fail jobs left running by a worker that died
+        """
+        now = datetime.utcnow()
+        failed = db.session.execute(
+            update(NewsFetchJob).where(
+                NewsFetchJob.status == 'running',
+                NewsFetchJob.started_at < now - timedelta(seconds=self.stale_seconds)
+            ).values(status='failed', error_message='Worker stopped before the job finished', finished_at=now),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        if failed:
+            logger.warning(f"Failed {failed} stale news jobs")
+        return failed
+
+    def pending_count(self) -> int:
+        return NewsFetchJob.query.filter(NewsFetchJob.status == 'queued').count()
+
+    def start(self):
+        """
+        Start the worker thread; the app calls this in processes serving
+        requests only
+        """
+        if not self.background or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='news-jobs', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _execute(self, kind: str, params: Dict) -> Dict:
+        if self.service is None:
+            self.service = NewsAPIService()
+        if kind == 'daily':
+            return self.service.fetch_and_process_daily()
+        articles = self.service.fetch_tech_news(query=params.get('query'))
+        return {'fetched': len(articles), 'saved': self.service.save_articles(articles)}
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._app.app_context():
+                try:
+                    self.fail_stale()
+                    # Drain the queue, including jobs other processes queued
+                    while not self._stop.is_set() and self.claim_next() is not None:
+                        pass
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"News job worker error: {str(e)}")
+                finally:
+                    db.session.remove()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+
+# Per-process worker shared by all requests
+news_jobs = NewsJobQueue()
@@ -0,0 +1,229 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class TopicArticles(NamedTuple):
+    topic: str
+    articles: List[Dict]
+    last: bool       # Final batch of the topic
+    complete: bool   # Every page of the topic was fetched
+
+
+class RowBatch(NamedTuple):
+    topic: str
+    rows: List[Dict]
+    newest: Optional[datetime]  # Latest publishedAt in the fetched batch
+    last: bool
+    complete: bool
+
+
+class PersistedBatch(NamedTuple):
+    topic: str
+    article_ids: List[int]
+
+
+class _StageFailed(NamedTuple):
+    error: BaseException
+
+
+class NewsPipeline:
+    """
+    Streaming daily news ingestion: fetch -> normalize -> persist -> convert.
+
+    Each stage is a generator consuming and yielding batches of at most
+    `batch_size` articles. With `concurrent`, fetching and normalizing run
+    in background threads connected by queues of `queue_size` batches, so
+    memory stays bounded and database writes in the calling thread (which
+    holds the app context) overlap network I/O. A topic's watermark
+    advances once its last batch is stored; time and item counts per stage
+    are reported in `stats`.
+    """
+
+    def __init__(self,
+                 service,
+                 batch_size: int = 100,
+                 queue_size: int = 4,
+                 concurrent: bool = True,
+                 page_size: int = 20):
+        self.service = service
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.concurrent = concurrent
+        self.page_size = page_size
+        self._stats = defaultdict(lambda: {'batches': 0, 'items': 0, 'seconds': 0.0})
+        self._stats_lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, Dict]:
+        with self._stats_lock:
+            return {
+                stage: dict(counters, seconds=round(counters['seconds'], 4))
+                for stage, counters in self._stats.items()
+            }
+
+    def run(self, topics: List[str], convert_limit: int = 10) -> Dict:
+        """
+        Ingest the topics and convert up to `convert_limit` articles
+        """
+        watermarks = self.service.load_watermarks(topics)
+        # Lease the worst case up front; fetch threads spend it without the database
+        allowance = self.service.quota.lease(len(topics) * self.service.max_pages)
+        results = {'fetched': 0, 'saved': 0, 'converted': 0}
+        try:
+            fetched = self.fetch(topics, watermarks, allowance)
+            normalized = self.normalize(self._stage(fetched) if self.concurrent else fetched)
+            persisted = self.persist(self._stage(normalized) if self.concurrent else normalized)
+            for converted in self.convert(persisted, convert_limit):
+                results['converted'] += converted
+        finally:
+            self.service.quota.release(allowance)
+        with self._stats_lock:
+            results['fetched'] = self._stats['normalize']['items']
+            results['saved'] = self._stats['persist']['items']
+        results['stages'] = self.stats
+        return results
+
+    def fetch(self, topics: List[str], watermarks: Dict, allowance=None) -> Iterator[TopicArticles]:
+        """
+        Topics in the order they finish, split into batches
+        """
+        if not topics:
+            return
+        workers = min(self.service.max_workers, len(topics))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='newsapi') as executor:
+            futures = {
+                executor.submit(self._fetch_topic, topic, watermarks.get(topic), allowance): topic
+                for topic in topics
+            }
+            for future in as_completed(futures):
+                articles, complete = future.result()
+                topic = futures[future]
+                chunks = [articles[i:i + self.batch_size] for i in range(0, len(articles), self.batch_size)] or [[]]
+                for index, chunk in enumerate(chunks):
+                    yield TopicArticles(topic, chunk, index == len(chunks) - 1, complete)
+
+    def normalize(self, batches: Iterable[TopicArticles]) -> Iterator[RowBatch]:
+        """
+        Rows with MinHash signatures, dropping URLs seen earlier in the run
+        """
+        seen = set()
+        for batch in batches:
+            with self._timed('normalize', len(batch.articles)):
+                rows = self.service.normalize_articles(batch.articles, seen=seen)
+                published = [self.service._parse_date(a.get('publishedAt')) for a in batch.articles]
+                newest = max((d for d in published if d), default=None)
+            yield RowBatch(batch.topic, rows, newest, batch.last, batch.complete)
+
+    def persist(self, batches: Iterable[RowBatch]) -> Iterator[PersistedBatch]:
+        """
+        Insert each batch, clustering near-duplicates, and advance a topic's
+        watermark after its last batch
+        """
+        latest = {}
+        for batch in batches:
+            with self._timed('persist') as timer:
+                article_ids = self.service.persist_rows(batch.rows, raise_errors=True) if batch.rows else []
+                timer['items'] = len(article_ids)
+                if batch.newest and (batch.topic not in latest or batch.newest > latest[batch.topic]):
+                    latest[batch.topic] = batch.newest
+                if batch.last:
+                    newest = latest.pop(batch.topic, None)
+                    if batch.complete and newest:
+                        self.service.store_watermarks({batch.topic: newest})
+            yield PersistedBatch(batch.topic, article_ids)
+
+    def convert(self, batches: Iterable[PersistedBatch], limit: int) -> Iterator[int]:
+        """
+        Classify and convert qualifying new articles as they are stored;
+        once the stream ends, any remaining quota goes to older backlog
+        """
+        converter = self.service.converter
+        remaining = limit
+        for batch in batches:
+            if remaining <= 0 or not batch.article_ids:
+                continue
+            with self._timed('convert') as timer:
+                linked = converter.convert(converter.select(limit=remaining, article_ids=batch.article_ids))
+                timer['items'] = len(linked)
+            remaining -= len(linked)
+            yield len(linked)
+        if remaining > 0:
+            with self._timed('convert') as timer:
+                linked = converter.convert(converter.select(limit=remaining))
+                timer['items'] = len(linked)
+            yield len(linked)
+
+    def _fetch_topic(self, topic: str, since, allowance):
+        with self._timed('fetch') as timer:
+            articles, complete = self.service.fetch_new_articles(
+                topic, since=since, page_size=self.page_size, allowance=allowance
+            )
+            timer['items'] = len(articles)
+        return articles, complete
+
+    @contextmanager
+    def _timed(self, stage: str, items: int = 0):
+        timer = {'items': items}
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                counters = self._stats[stage]
+                counters['batches'] += 1
+                counters['items'] += timer['items']
+                counters['seconds'] += elapsed
+
+    def _stage(self, upstream: Iterator) -> Iterator:
+        """
+        Run a generator in a background thread behind a bounded queue
+        """
+        buffer = queue.Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def pump():
+            try:
+                for item in upstream:
+                    if not put(item):
+                        break
+            except BaseException as e:
+                put(_StageFailed(e))
+            else:
+                put(_DONE)
+            finally:
+                upstream.close()
+
+        thread = threading.Thread(target=pump, name='news-pipeline', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _StageFailed):
+                    raise item.error
+                yield item
+        finally:
+            stopped.set()
+            thread.join()
@@ -1,194 +1,388 @@
-import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from flask import current_app, has_app_context
 from sqlalchemy import and_
 from extensions import db
-from models import NewsArticle, Concept, Category, Tag
+from models import NewsArticle, NewsTopicWatermark, Concept, Category, Tag
+from utils.db_utils import upsert_insert
+from utils.http import (
+    RETRY_STATUSES, HostLimiter, RequestCoalescer, ResponseCache, TokenBucket, build_session, retry_delay
+)
+from .api_quota import Allowance, QuotaTracker
+from .article_converter import ArticleConverter, ArticleQualityFilter
+from .article_dedup import NearDuplicateDetector
+from .news_pipeline import NewsPipeline
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tech topics fetched by the daily job
+DAILY_TOPICS = [
+    'artificial intelligence',
+    'web development',
+    'cloud computing',
+    'cybersecurity',
+    'blockchain',
+    'data science',
+    'DevOps',
+    'mobile development'
+]
+
 
 class NewsAPIService:
-    def __init__(self):
-        self.api_key = os.getenv('NEWS_API_KEY')
-        self.base_url = 'https://newsapi.org/v2'
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 max_per_host: Optional[int] = None,
+                 retries: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 max_pages: Optional[int] = None,
+                 cache_seconds: Optional[float] = None,
+                 cache_dir: Optional[str] = None,
+                 duplicate_threshold: Optional[float] = None,
+                 daily_quota: Optional[int] = None,
+                 rate_per_second: Optional[float] = None,
+                 rate_burst: Optional[float] = None):
+        # Settings come from the app's config (config.Config and subclasses)
+        config = current_app.config if has_app_context() else {}
+        self.api_key = api_key or config.get('NEWS_API_KEY')
+        self.base_url = (base_url or config.get('NEWS_API_BASE_URL') or 'https://newsapi.org/v2').rstrip('/')
         self.tech_sources = [
             'techcrunch', 'the-verge', 'ars-technica', 'wired',
             'hacker-news', 'recode', 'engadget', 'techradar'
         ]
+        self.max_workers = max_workers or config.get('NEWS_FETCH_WORKERS', 8)
+        self.retries = retries if retries is not None else config.get('NEWS_API_RETRIES', 3)
+        self.timeout = timeout or config.get('NEWS_API_TIMEOUT', 10)
+        self.host_limiter = HostLimiter(max_per_host or config.get('NEWS_API_MAX_PER_HOST', 4))
+        self.max_pages = max_pages or config.get('NEWS_API_MAX_PAGES', 5)
+        self.cache = ResponseCache(
+            ttl=cache_seconds if cache_seconds is not None else config.get('NEWS_API_CACHE_SECONDS', 900),
+            directory=cache_dir or config.get('NEWS_API_CACHE_DIR') or None,
+            max_entries=config.get('NEWS_API_CACHE_MAX_ENTRIES', 256)
+        )
+        self.converter = ArticleConverter(
+            ArticleQualityFilter.from_config(config),
+            classify=config.get('NEWS_CLASSIFY_TOPICS', True)
+        )
+        self.convert_limit = config.get('NEWS_CONVERT_LIMIT', 10)
+        self.pipeline_batch_size = config.get('NEWS_PIPELINE_BATCH_SIZE', 100)
+        self.pipeline_queue_size = config.get('NEWS_PIPELINE_QUEUE_SIZE', 4)
+        self.deduplicator = NearDuplicateDetector(
+            threshold=duplicate_threshold or config.get('NEWS_DUPLICATE_THRESHOLD', 0.6)
+        )
+        # Upstream budget: a process-wide token bucket plus the key's daily quota
+        self.rate_limiter = TokenBucket(
+            rate_per_second if rate_per_second is not None else config.get('NEWS_API_RATE_PER_SECOND', 5),
+            rate_burst if rate_burst is not None else config.get('NEWS_API_RATE_BURST', 10)
+        )
+        self.rate_limit_wait = config.get('NEWS_API_RATE_WAIT', 30)
+        self.quota = QuotaTracker(
+            'newsapi', daily_quota if daily_quota is not None else config.get('NEWS_API_DAILY_QUOTA', 100)
+        )
+        self.coalescer = RequestCoalescer()
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """Shared keep-alive session, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # Retries happen in _call_everything, where each one is charged
+                    self._session = build_session(pool_size=self.max_workers, retries=0)
+        return self._session
         
     def fetch_tech_news(self, 
                        query: Optional[str] = None,
                        category: str = 'technology',
-                       page_size: int = 100) -> List[Dict]:
+                       page_size: int = 100,
+                       since: Optional[datetime] = None,
+                       page: int = 1,
+                       allowance: Optional[Allowance] = None) -> List[Dict]:
         """
         Fetch technology news from NewsAPI
         """
+        data = self._request_everything(self._everything_params(query, category, page_size, since, page), allowance)
+        return data.get('articles', []) if data else []
+    
+    def fetch_new_articles(self,
+                           topic: str,
+                           since: Optional[datetime] = None,
+                           page_size: int = 100,
+                           max_pages: Optional[int] = None,
+                           allowance: Optional[Allowance] = None) -> Tuple[List[Dict], bool]:
+        """
+        Page through a topic newest-first until reaching articles published
+        at or before `since` (the topic's watermark). Also returns whether
+        every page was fetched; after a failed page the watermark must stay
+        put so the gap is fetched again next time.
+        """
+        max_pages = max_pages or self.max_pages
+        collected = []
+        for page in range(1, max_pages + 1):
+            params = self._everything_params(topic, 'technology', page_size, since, page)
+            data = self._request_everything(params, allowance)
+            if not data:
+                return collected, False
+            articles = data.get('articles', [])
+            fresh = [a for a in articles if since is None or (self._parse_date(a.get('publishedAt')) or since) > since]
+            collected.extend(fresh)
+            if len(fresh) < len(articles) or len(articles) < page_size:
+                break
+            if page * page_size >= (data.get('totalResults') or 0):
+                break
+        else:
+            logger.info(f"Stopped paging '{topic}' after {max_pages} pages; older new articles are skipped")
+        return collected, True
+    
+    def fetch_topics(self, topics: List[str], page_size: int = 20) -> Dict[str, List[Dict]]:
+        """
+        Fetch several topics concurrently; results keep the topics' order
+        """
+        allowance = self.quota.lease(len(topics))
+        try:
+            return self._map_topics(
+                lambda topic: self.fetch_tech_news(query=topic, page_size=page_size, allowance=allowance), topics
+            )
+        finally:
+            self.quota.release(allowance)
+    
+    def _map_topics(self, fetch, topics: List[str]) -> Dict:
+        if not topics:
+            return {}
+        workers = min(self.max_workers, len(topics))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='newsapi') as executor:
+            return dict(zip(topics, executor.map(fetch, topics)))
+    
+    def load_watermarks(self, topics: List[str]) -> Dict[str, datetime]:
+        """
+        Stored watermarks for the given topics; topics never fetched are absent
+        """
+        rows = db.session.query(
+            NewsTopicWatermark.topic, NewsTopicWatermark.latest_published_at
+        ).filter(NewsTopicWatermark.topic.in_(topics)).all()
+        return {topic: published_at for topic, published_at in rows}
+    
+    def advance_watermarks(self, results: Dict[str, List[Dict]]):
+        """
+        Move each topic's watermark up to the newest article fetched for it
+        """
+        latest = {}
+        for topic, articles in results.items():
+            published = [d for d in (self._parse_date(a.get('publishedAt')) for a in articles) if d]
+            if published:
+                latest[topic] = max(published)
+        self.store_watermarks(latest)
+    
+    def store_watermarks(self, latest: Dict[str, datetime]):
+        """
+        Upsert watermarks; they never move backwards
+        """
+        now = datetime.utcnow()
+        for topic, published_at in latest.items():
+            stmt = upsert_insert(NewsTopicWatermark).values(
+                topic=topic, latest_published_at=published_at, last_fetched_at=now
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['topic'],
+                set_={
+                    'latest_published_at': stmt.excluded.latest_published_at,
+                    'last_fetched_at': stmt.excluded.last_fetched_at
+                },
+                where=NewsTopicWatermark.latest_published_at < stmt.excluded.latest_published_at
+            )
+            db.session.execute(stmt)
+        db.session.commit()
+    
+    def _everything_params(self,
+                           query: Optional[str],
+                           category: str,
+                           page_size: int,
+                           since: Optional[datetime],
+                           page: int) -> Dict:
+        # Build query parameters
+        params = {
+            'apiKey': self.api_key,
+            'category': category,
+            'language': 'en',
+            'pageSize': page_size,
+            'sortBy': 'publishedAt'
+        }
+        
+        # Add query if provided
+        if query:
+            params['q'] = query
+        else:
+            # Default technology-related keywords
+            params['q'] = 'programming OR "machine learning" OR "web development" OR "cloud computing" OR "cybersecurity" OR "data science"'
+        
+        # Only articles since the watermark, otherwise the last 7 days
+        if since:
+            params['from'] = since.strftime('%Y-%m-%dT%H:%M:%S')
+        else:
+            params['from'] = (datetime.utcnow() - timedelta(days=7)).strftime('%Y-%m-%d')
+        if page > 1:
+            params['page'] = page
+        return params
+    
+    def _request_everything(self, params: Dict, allowance: Optional[Allowance] = None) -> Optional[Dict]:
+        """
+        GET /everything, answering from the response cache when the same
+        parameters were requested within the cache window and sharing one
+        upstream call between concurrent identical requests. Upstream calls
+        spend `allowance` (worker threads must be given one) or lease a
+        single request from the daily quota.
+        """
         if not self.api_key:
             logger.error("NEWS_API_KEY not configured")
-            return []
-            
+            return None
+        
+        url = f"{self.base_url}/everything"
+        cached = self.cache.get(url, params)
+        if cached is not None:
+            return cached
+        
+        return self.coalescer.run(
+            self.cache.key(url, params),
+            lambda: self._call_everything(url, params, allowance)
+        )
+    
+    def _call_everything(self, url: str, params: Dict, allowance: Optional[Allowance]) -> Optional[Dict]:
+        """
+        Request the endpoint, retrying 429/5xx and connection errors here
+        rather than in the session, so every attempt spends its own quota
+        unit and rate-limit token
+        """
+        leased = allowance is None
+        if leased:
+            allowance = self.quota.lease(1 + self.retries)
         try:
-            # Build query parameters
-            params = {
-                'apiKey': self.api_key,
-                'category': category,
-                'language': 'en',
-                'pageSize': page_size,
-                'sortBy': 'publishedAt'
-            }
-            
-            # Add query if provided
-            if query:
-                params['q'] = query
-            else:
-                # Default technology-related keywords
-                params['q'] = 'programming OR "machine learning" OR "web development" OR "cloud computing" OR "cybersecurity" OR "data science"'
-            
-            # Add date range (last 7 days)
-            from_date = (datetime.utcnow() - timedelta(days=7)).strftime('%Y-%m-%d')
-            params['from'] = from_date
-            
-            # Make API request
-            response = requests.get(
-                f"{self.base_url}/everything",
-                params=params,
-                timeout=10
-            )
+            for attempt in range(self.retries + 1):
+                if not allowance.take():
+                    logger.warning(f"NewsAPI daily quota exhausted; skipping '{params.get('q')}'")
+                    return None
+                if not self.rate_limiter.acquire(timeout=self.rate_limit_wait):
+                    allowance.give_back()
+                    logger.warning(f"NewsAPI rate limit wait exceeded; skipping '{params.get('q')}'")
+                    return None
+                
+                response = None
+                try:
+                    with self.host_limiter.slot(url):
+                        response = self.session.get(
+                            url,
+                            params=params,
+                            timeout=(3.05, self.timeout)
+                        )
+                except requests.RequestException as e:
+                    logger.warning(f"NewsAPI request failed (attempt {attempt + 1}): {str(e)}")
+                else:
+                    if response.status_code == 200:
+                        data = response.json()
+                        self.cache.set(url, params, data)
+                        return data
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                
+                if attempt < self.retries:
+                    time.sleep(retry_delay(attempt + 1, response))
             
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('articles', [])
-            else:
+            if response is not None:
                 logger.error(f"NewsAPI error: {response.status_code} - {response.text}")
-                return []
+            return None
                 
         except Exception as e:
             logger.error(f"Error fetching news: {str(e)}")
-            return []
+            return None
+        finally:
+            if leased:
+                self.quota.release(allowance)
     
     def save_articles(self, articles: List[Dict]) -> int:
         """
-        Save fetched articles to database
+        Save fetched articles to database, skipping URLs already stored
         """
-        saved_count = 0
-        
+        return len(self.insert_articles(articles))
+    
+    def insert_articles(self, articles: List[Dict], chunk_size: int = 500, raise_errors: bool = False) -> List[int]:
+        """
+        De-duplicate a batch by URL and insert it with chunked
+        INSERT ... ON CONFLICT (url) DO NOTHING, then cluster the new rows
+        with near-duplicate stories; returns the new article ids
+        """
+        return self.persist_rows(self.normalize_articles(articles), chunk_size=chunk_size, raise_errors=raise_errors)
+    
+    def normalize_articles(self, articles: Iterable[Dict], seen: Optional[Set[str]] = None) -> List[Dict]:
+        """
+        NewsAPI articles as news_articles rows with MinHash signatures,
+        skipping URLs that are missing, over-long or already in `seen`
+        """
+        seen = set() if seen is None else seen
+        rows = []
         for article_data in articles:
-            try:
-                # Check if article already exists
-                existing = NewsArticle.query.filter_by(
-                    url=article_data.get('url')
-                ).first()
-                
-                if existing:
-                    continue
-                
-                # Create new article
-                article = NewsArticle(
-                    title=article_data.get('title', '')[:300],
-                    description=article_data.get('description', ''),
-                    content=article_data.get('content', ''),
-                    url=article_data.get('url', ''),
-                    url_to_image=article_data.get('urlToImage'),
-                    source_name=article_data.get('source', {}).get('name'),
-                    author=article_data.get('author'),
-                    published_at=self._parse_date(article_data.get('publishedAt')),
-                    category='technology'
-                )
-                
-                db.session.add(article)
-                saved_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error saving article: {str(e)}")
+            url = article_data.get('url')
+            if not url or url in seen:
                 continue
-        
-        try:
-            db.session.commit()
-            logger.info(f"Saved {saved_count} new articles")
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Error committing articles: {str(e)}")
-            
-        return saved_count
+            if len(url) > NewsArticle.url.type.length:
+                logger.warning(f"Skipping article with over-long URL: {url[:100]}...")
+                continue
+            seen.add(url)
+            image_url = article_data.get('urlToImage') or None
+            title = (article_data.get('title') or '')[:300]
+            # One over-long value would fail the whole chunk, so clip to the columns
+            rows.append({
+                'title': title,
+                'description': article_data.get('description') or '',
+                'content': article_data.get('content') or '',
+                'url': url,
+                'url_to_image': image_url if image_url and len(image_url) <= 500 else None,
+                'source_name': ((article_data.get('source') or {}).get('name') or '')[:100] or None,
+                'author': (article_data.get('author') or '')[:100] or None,
+                'published_at': self._parse_date(article_data.get('publishedAt')),
+                'category': 'technology',
+                'minhash': self.deduplicator.signature_of(title, article_data.get('description'))
+            })
+        return rows
     
-    def convert_to_concept(self, article_id: int, category_name: str = 'General') -> Optional[Concept]:
+    def persist_rows(self, rows: List[Dict], chunk_size: int = 500, raise_errors: bool = False) -> List[int]:
         """
-        Convert a news article to a learning concept
+        Insert normalized rows, skipping stored URLs, and cluster the new
+        ones with near-duplicates in the same transaction
         """
-        article = NewsArticle.query.get(article_id)
-        if not article or article.is_processed:
-            return None
-            
+        signatures = {row['url']: row['minhash'] for row in rows}
+        inserted = []
         try:
-            # Get or create category
-            category = Category.query.filter_by(name=category_name).first()
-            if not category:
-                category = Category(
-                    name=category_name,
-                    description=f"{category_name} technology concepts"
-                )
-                db.session.add(category)
-                db.session.commit()
-            
-            # Create concept from article
-            concept = Concept(
-                title=article.title,
-                short_description=article.description or article.title,
-                content=self._enhance_content(article),
-                difficulty='intermediate',
-                category_id=category.id,
-                source='newsapi',
-                external_url=article.url,
-                image_url=article.url_to_image,
-                author=article.author,
-                published_at=article.published_at,
-                meta_info={
-                    'source_name': article.source_name,
-                    'original_article_id': article.id
-                }
+            for offset in range(0, len(rows), chunk_size):
+                stmt = upsert_insert(NewsArticle).values(rows[offset:offset + chunk_size])
+                stmt = stmt.on_conflict_do_nothing(index_elements=['url']).returning(NewsArticle.id, NewsArticle.url)
+                inserted.extend(db.session.execute(stmt).all())
+            duplicates = self.deduplicator.cluster(
+                (article_id, signatures[url]) for article_id, url in inserted
             )
-            
-            db.session.add(concept)
-            
-            # Mark article as processed
-            article.is_processed = True
-            article.concept_id = concept.id
-            
             db.session.commit()
-            logger.info(f"Converted article {article_id} to concept")
-            
-            return concept
-            
+            logger.info(f"Saved {len(inserted)} new articles ({len(duplicates)} near-duplicates)")
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Error converting article to concept: {str(e)}")
-            return None
+            logger.error(f"Error saving articles: {str(e)}")
+            if raise_errors:
+                raise
+            return []
+            
+        return [article_id for article_id, _ in inserted]
     
-    def _enhance_content(self, article: NewsArticle) -> str:
+    def convert_to_concept(self, article_id: int, category_name: str = 'General') -> Optional[Concept]:
         """
-        Enhance article content for learning purposes
+        Convert a news article to a learning concept
         """
-        content = f"# {article.title}\n\n"
-        
-        if article.description:
-            content += f"## Overview\n{article.description}\n\n"
-            
-        if article.content:
-            content += f"## Details\n{article.content}\n\n"
-        else:
-            content += "## Details\nContent not available. Please visit the source for full article.\n\n"
-            
-        content += f"## Additional Resources\n"
-        content += f"- [Original Article]({article.url})\n"
-        content += f"- Source: {article.source_name}\n"
-        
-        if article.author:
-            content += f"- Author: {article.author}\n"
-            
-        return content
+        linked = self.converter.convert([article_id], category_for=lambda article: category_name)
+        return db.session.get(Concept, linked[article_id]) if article_id in linked else None
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """
@@ -198,55 +392,22 @@ class NewsAPIService:
             return None
             
         try:
-            # NewsAPI date format: 2024-01-14T10:30:00Z
-            return datetime.strptime(date_str.replace('Z', '+00:00'), '%Y-%m-%dT%H:%M:%S%z')
+            # NewsAPI date format: 2024-01-14T10:30:00Z, stored as naive UTC
+            parsed = datetime.strptime(date_str.replace('Z', '+00:00'), '%Y-%m-%dT%H:%M:%S%z')
+            return parsed.astimezone(timezone.utc).replace(tzinfo=None)
         except:
             try:
                 return datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S')
             except:
                 return None
     
-    def fetch_and_process_daily(self) -> Dict[str, int]:
+    def fetch_and_process_daily(self) -> Dict:
         """
         Fetch and process daily news articles
         """
-        results = {
-            'fetched': 0,
-            'saved': 0,
-            'converted': 0
-        }
-        
-        # Fetch articles for different tech topics
-        topics = [
-            'artificial intelligence',
-            'web development',
-            'cloud computing',
-            'cybersecurity',
-            'blockchain',
-            'data science',
-            'DevOps',
-            'mobile development'
-        ]
-        
-        all_articles = []
-        for topic in topics:
-            articles = self.fetch_tech_news(query=topic, page_size=20)
-            all_articles.extend(articles)
-            
-        results['fetched'] = len(all_articles)
-        
-        # Save articles
-        results['saved'] = self.save_articles(all_articles)
-        
-        # Auto-convert some high-quality articles
-        unprocessed = NewsArticle.query.filter_by(
-            is_processed=False
-        ).order_by(NewsArticle.published_at.desc()).limit(10).all()
-        
-        for article in unprocessed:
-            if article.content and len(article.content) > 500:
-                concept = self.convert_to_concept(article.id)
-                if concept:
-                    results['converted'] += 1
-                    
-        return results
\ No newline at end of file
+        # Stream topics through fetch -> normalize -> persist -> convert;
+        # each topic only asks for articles newer than its watermark
+        pipeline = NewsPipeline(self, batch_size=self.pipeline_batch_size, queue_size=self.pipeline_queue_size)
+        results = pipeline.run(DAILY_TOPICS, convert_limit=self.convert_limit)
+        logger.info(f"News pipeline stages: {results['stages']}")
+        return results
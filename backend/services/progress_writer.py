@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, func
+from extensions import db
+from models import UserProgress, UserChallengeProgress, ChallengeSubmission
+from utils.db_utils import upsert_insert
+from .learning_stats import LearningStats
+from .affinity import AffinityStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressWriter:
+    """
+    Single-statement progress transitions.
+
+    Every method issues one INSERT ... ON CONFLICT DO UPDATE against the
+    (user, item) unique constraint and returns the resulting row, so
+    concurrent requests for the same user and item cannot race into a
+    duplicate insert. Concept transitions also keep the user's materialized
+    LearningStats and affinity vector in step. Callers own the transaction.
+    """
+
+    def __init__(self, stats: Optional[LearningStats] = None, affinities: Optional[AffinityStore] = None):
+        self.stats = stats or LearningStats()
+        self.affinities = affinities or AffinityStore()
+
+    def _execute(self, stmt, model):
+        return db.session.execute(
+            stmt.returning(model),
+            execution_options={'populate_existing': True}
+        ).scalar_one()
+
+    def _transition(self, user_id: int, concept_id: int, stmt) -> UserProgress:
+        self.stats.lock(user_id)
+        category_id, before = self.stats.current_state(user_id, concept_id)
+        progress = self._execute(stmt, UserProgress)
+        self.stats.apply(user_id, category_id, before, (progress.status, progress.rating))
+        self.affinities.record(user_id, concept_id, category_id, before[0] if before else None, progress.status)
+        return progress
+
+    def record_challenge_attempt(self,
+                                 user_id: int,
+                                 challenge_id: int,
+                                 submission: ChallengeSubmission) -> UserChallengeProgress:
+        """
+        Count an attempt and, if it passed, mark the challenge solved
+        """
+        now = datetime.utcnow()
+        passed = submission.status == 'passed'
+        # A passing submission with points replaces the best one
+        promote = passed and (submission.points_earned or 0) > 0
+
+        stmt = upsert_insert(UserChallengeProgress).values(
+            user_id=user_id,
+            challenge_id=challenge_id,
+            status='solved' if passed else 'attempted',
+            attempts=1,
+            hints_used=0,
+            last_attempted_at=now,
+            first_solved_at=now if passed else None,
+            best_submission_id=submission.id if passed else None
+        )
+        current = UserChallengeProgress
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[current.user_id, current.challenge_id],
+            set_={
+                'attempts': func.coalesce(current.attempts, 0) + 1,
+                'last_attempted_at': excluded.last_attempted_at,
+                'status': case(
+                    (excluded.status == 'solved', 'solved'),
+                    (current.status == 'solved', 'solved'),
+                    else_='attempted'
+                ),
+                'first_solved_at': case(
+                    (current.status == 'solved', current.first_solved_at),
+                    else_=excluded.first_solved_at
+                ),
+                'best_submission_id': excluded.best_submission_id if promote else
+                    func.coalesce(current.best_submission_id, excluded.best_submission_id)
+            }
+        )
+        return self._execute(stmt, UserChallengeProgress)
+
+    def start_concept(self, user_id: int, concept_id: int) -> UserProgress:
+        """
+        Move a concept to in_progress unless it was already started
+        """
+        now = datetime.utcnow()
+        stmt = upsert_insert(UserProgress).values(
+            user_id=user_id,
+            concept_id=concept_id,
+            status='in_progress',
+            started_at=now,
+            created_at=now,
+            updated_at=now
+        )
+        current = UserProgress
+        not_started = current.status == 'not_started'
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[current.user_id, current.concept_id],
+            set_={
+                'status': case((not_started, 'in_progress'), else_=current.status),
+                'started_at': case((not_started, stmt.excluded.started_at), else_=current.started_at),
+                'updated_at': case((not_started, stmt.excluded.updated_at), else_=current.updated_at)
+            }
+        )
+        return self._transition(user_id, concept_id, stmt)
+
+    def complete_concept(self,
+                         user_id: int,
+                         concept_id: int,
+                         rating: Optional[int] = None,
+                         notes: Optional[str] = None) -> UserProgress:
+        """
+        Mark a concept completed, keeping any earlier rating or notes
+        unless new ones are given
+        """
+        now = datetime.utcnow()
+        stmt = upsert_insert(UserProgress).values(
+            user_id=user_id,
+            concept_id=concept_id,
+            status='completed',
+            started_at=now,
+            completed_at=now,
+            rating=rating or None,
+            notes=notes or None,
+            created_at=now,
+            updated_at=now
+        )
+        current = UserProgress
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[current.user_id, current.concept_id],
+            set_={
+                'status': 'completed',
+                'completed_at': excluded.completed_at,
+                'rating': func.coalesce(excluded.rating, current.rating),
+                'notes': func.coalesce(excluded.notes, current.notes),
+                'updated_at': excluded.updated_at
+            }
+        )
+        return self._transition(user_id, concept_id, stmt)
+
+    def skip_concept(self, user_id: int, concept_id: int) -> UserProgress:
+        """
+        Mark a concept skipped so it is not scheduled again; completed
+        concepts stay completed
+        """
+        now = datetime.utcnow()
+        stmt = upsert_insert(UserProgress).values(
+            user_id=user_id,
+            concept_id=concept_id,
+            status='skipped',
+            created_at=now,
+            updated_at=now
+        )
+        current = UserProgress
+        completed = current.status == 'completed'
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[current.user_id, current.concept_id],
+            set_={
+                'status': case((completed, current.status), else_='skipped'),
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        return self._transition(user_id, concept_id, stmt)
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import literal, select
+from sqlalchemy.orm import selectinload
+from extensions import db
+from models import Concept, ReviewState, UserProgress
+from utils.db_utils import upsert_insert
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def sm2_step(ease_factor: float,
+             interval_days: int,
+             repetitions: int,
+             quality: int) -> Tuple[float, int, int, bool]:
+    """
+    One SM-2 review step. `quality` is the 0-5 recall grade; returns the
+    new (ease_factor, interval_days, repetitions, lapsed)
+    """
+    quality = max(0, min(5, quality))
+    lapsed = quality < 3
+    if lapsed:
+        repetitions = 0
+        interval_days = 1
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval_days = 1
+        elif repetitions == 2:
+            interval_days = 6
+        else:
+            interval_days = max(1, round(interval_days * ease_factor))
+
+    ease_factor += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return max(1.3, ease_factor), interval_days, repetitions, lapsed
+
+
+class ReviewScheduler:
+    """
+    SM-2 spaced-repetition scheduling of completed concepts.
+
+    Each (user, concept) pair has one `review_states` row holding its ease,
+    interval and next due time. Due reviews are read through the
+    (user_id, due_at) index, so fetching a user's queue is an index range
+    scan regardless of how many concepts they have learned.
+    """
+
+    first_interval_days = 1
+    max_interval_days = 365
+
+    def enroll(self, user_id: int, concept_id: int, now: Optional[datetime] = None):
+        """
+        Start reviewing a newly completed concept; existing states are kept
+        """
+        now = now or datetime.utcnow()
+        stmt = upsert_insert(ReviewState).values(
+            user_id=user_id,
+            concept_id=concept_id,
+            ease_factor=2.5,
+            interval_days=0,
+            repetitions=0,
+            lapses=0,
+            due_at=now + timedelta(days=self.first_interval_days),
+            created_at=now
+        ).on_conflict_do_nothing(index_elements=['user_id', 'concept_id'])
+        db.session.execute(stmt)
+
+    def record_review(self,
+                      user_id: int,
+                      concept_id: int,
+                      quality: int,
+                      now: Optional[datetime] = None) -> Optional[ReviewState]:
+        """
+        Grade a review and move the concept's next due time; None when the
+        user has not completed the concept
+        """
+        completed = db.session.query(UserProgress.id).filter(
+            UserProgress.user_id == user_id,
+            UserProgress.concept_id == concept_id,
+            UserProgress.status == 'completed'
+        ).first()
+        if completed is None:
+            return None
+
+        now = now or datetime.utcnow()
+        self.enroll(user_id, concept_id, now)
+        state = ReviewState.query.filter_by(
+            user_id=user_id, concept_id=concept_id
+        ).with_for_update().populate_existing().one()
+
+        ease, interval, repetitions, lapsed = sm2_step(
+            state.ease_factor, state.interval_days, state.repetitions, quality
+        )
+        state.ease_factor = ease
+        state.interval_days = min(interval, self.max_interval_days)
+        state.repetitions = repetitions
+        state.lapses = (state.lapses or 0) + (1 if lapsed else 0)
+        state.last_reviewed_at = now
+        state.due_at = now + timedelta(days=state.interval_days)
+        return state
+
+    def due_reviews(self, user_id: int, due_before: datetime, limit: int = 10) -> List[ReviewState]:
+        """
+        The user's most overdue reviews, with concept summaries loaded
+        """
+        return ReviewState.query.options(
+            selectinload(ReviewState.concept).selectinload(Concept.category),
+            selectinload(ReviewState.concept).selectinload(Concept.tags)
+        ).filter(
+            ReviewState.user_id == user_id,
+            ReviewState.due_at < due_before
+        ).order_by(ReviewState.due_at).limit(limit).all()
+
+    def backfill(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Enroll completed concepts that have no review state yet (completions
+        from before reviews existed), due like a fresh enrollment
+        """
+        now = now or datetime.utcnow()
+        completed = select(
+            UserProgress.user_id,
+            UserProgress.concept_id,
+            literal(now + timedelta(days=self.first_interval_days)).label('due_at'),
+            literal(now).label('created_at')
+        ).where(UserProgress.status == 'completed')
+        stmt = upsert_insert(ReviewState).from_select(
+            ['user_id', 'concept_id', 'due_at', 'created_at'], completed
+        ).on_conflict_do_nothing(index_elements=['user_id', 'concept_id'])
+        enrolled = db.session.execute(stmt).rowcount or 0
+        db.session.commit()
+
+        logger.info(f"Review backfill: {enrolled} enrolled")
+        return {'enrolled': enrolled}
@@ -0,0 +1,145 @@
+import heapq
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from extensions import db
+from models import User
+from utils.locks import JobLock
+from utils.time_utils import local_date_of, next_occurrence_utc, parse_clock, utc_now
+from .bulk_scheduler import BulkScheduler
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (timezone name, 'HH:MM' local delivery time)
+BucketKey = Tuple[str, str]
+
+
+class RollingScheduler:
+    """
+    Timezone-aware rolling delivery scheduler.
+
+    Active users are bucketed by (timezone, local reminder time). A min-heap
+    keyed on each bucket's next processing instant (due time minus
+    `lead_time`) drives a loop that schedules each bucket shortly before its
+    users' local delivery time, so database work (and any delivery hook such
+    as reminder emails) is spread over the day instead of one nightly burst.
+
+    `lock_factory` returns the lock shared with the nightly ScheduleJob; a
+    bucket is only scheduled while holding it, so the two never fill the
+    same users' days concurrently. A bucket whose lock is taken is retried
+    on the next poll.
+    """
+
+    def __init__(self,
+                 lead_time: timedelta = timedelta(minutes=30),
+                 rebuild_interval: timedelta = timedelta(hours=1),
+                 poll_interval: float = 60.0,
+                 scheduler_options: Optional[Dict] = None,
+                 on_bucket_due: Optional[Callable[[BucketKey, List[int], datetime], None]] = None,
+                 lock_factory: Optional[Callable[[], JobLock]] = None):
+        self.lead_time = lead_time
+        self.rebuild_interval = rebuild_interval
+        self.poll_interval = poll_interval
+        self.scheduler_options = scheduler_options or {}
+        self.on_bucket_due = on_bucket_due
+        self.lock_factory = lock_factory
+        self.buckets: Dict[BucketKey, List[int]] = {}
+        self._heap: List[Tuple[datetime, datetime, BucketKey]] = []
+        self._last_due: Dict[BucketKey, datetime] = {}
+        self._built_at: Optional[datetime] = None
+
+    def rebuild(self, now: Optional[datetime] = None):
+        """
+        Re-read users' timezones and reminder times and rebuild the heap
+        """
+        now = now or utc_now()
+        buckets: Dict[BucketKey, List[int]] = {}
+        rows = db.session.query(User.id, User.timezone, User.preferences).filter(
+            User.is_active == True
+        ).order_by(User.id).all()
+        for user_id, tz_name, preferences in rows:
+            clock = parse_clock((preferences or {}).get('daily_reminder_time'))
+            key = (tz_name or 'UTC', clock.strftime('%H:%M'))
+            buckets.setdefault(key, []).append(user_id)
+
+        # Keep pending due times of known buckets so a rebuild never skips one
+        pending = {key: due for _, due, key in self._heap}
+        heap = []
+        for key in buckets:
+            due = pending.get(key)
+            if due is None:
+                after = self._last_due.get(key, now)
+                due = next_occurrence_utc(key[0], parse_clock(key[1]), after)
+            heap.append((due - self.lead_time, due, key))
+        heapq.heapify(heap)
+
+        self.buckets = buckets
+        self._heap = heap
+        self._built_at = now
+        logger.info(f"Rolling scheduler tracking {len(rows)} users in {len(buckets)} buckets")
+
+    def next_run_at(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    def run_pending(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Process every bucket whose processing instant has passed
+        """
+        now = now or utc_now()
+        if self._built_at is None or now - self._built_at >= self.rebuild_interval:
+            self.rebuild(now)
+
+        processed = []
+        while self._heap and self._heap[0][0] <= now:
+            _, due, key = heapq.heappop(self._heap)
+            result = self._process_bucket(key, due)
+            processed.append(result)
+            if result.get('deferred'):
+                # Another scheduling run holds the lock; try again on the next poll
+                retry_at = now + timedelta(seconds=self.poll_interval)
+                heapq.heappush(self._heap, (retry_at, due, key))
+                break
+            self._last_due[key] = due
+            next_due = next_occurrence_utc(key[0], parse_clock(key[1]), due)
+            heapq.heappush(self._heap, (next_due - self.lead_time, next_due, key))
+        return processed
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.run_pending()
+            # Don't hold a transaction open while sleeping
+            db.session.remove()
+            next_run = self.next_run_at()
+            wait = self.poll_interval
+            if next_run is not None:
+                wait = min(wait, max(0.0, (next_run - utc_now()).total_seconds()))
+            stop_event.wait(wait)
+
+    def _process_bucket(self, key: BucketKey, due: datetime) -> Dict:
+        user_ids = self.buckets.get(key, [])
+        start_date = local_date_of(due, key[0])
+        result = {'bucket': key, 'due': due.isoformat(), 'start_date': start_date.isoformat()}
+        lock = self.lock_factory() if self.lock_factory else None
+        if lock is not None and not lock.acquire():
+            logger.info(f"Scheduling lock busy; deferring bucket {key}")
+            result['deferred'] = True
+            return result
+        try:
+            result.update(BulkScheduler(**self.scheduler_options).schedule(
+                user_ids=user_ids,
+                start_date=start_date
+            ))
+            if self.on_bucket_due:
+                self.on_bucket_due(key, user_ids, due)
+        except Exception as e:
+            db.session.rollback()
+            result['error'] = str(e)
+            logger.error(f"Error scheduling bucket {key}: {str(e)}")
+        else:
+            logger.info(f"Scheduled bucket {key} due {due.isoformat()}: {result}")
+        finally:
+            if lock is not None:
+                lock.release()
+        return result
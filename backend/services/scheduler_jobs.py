@@ -0,0 +1,151 @@
+import socket
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import JobRun
+from utils.locks import JobLock
+from .job_checkpoints import CheckpointStore
+from .sharded_scheduler import ShardedScheduler
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduleJob:
+    """
+    Checkpointed, single-instance nightly scheduling run.
+
+    A JobLock ensures only one run is active across hosts. Each run is
+    recorded in `job_runs` (one row per job and date) with per-shard cursors
+    in `job_checkpoints`; if a run for the same date did not complete, the
+    next invocation resumes it with the same sharding and skips completed
+    shards and already-checkpointed users.
+    """
+
+    job_name = 'schedule_daily_concepts'
+
+    def __init__(self, scheduler: ShardedScheduler, lock: Optional[JobLock] = None):
+        self.scheduler = scheduler
+        self.lock = lock or JobLock(self.job_name)
+
+    def run(self, run_date: Optional[date] = None, force: bool = False) -> Dict:
+        run_date = run_date or date.today()
+
+        with self.lock as acquired:
+            if not acquired:
+                logger.warning(f"Another {self.job_name} run is active; skipping")
+                return {'skipped': True, 'reason': 'locked'}
+
+            job_run = JobRun.query.filter_by(job_name=self.job_name, run_date=run_date).first()
+            if job_run and job_run.status == 'completed' and not force:
+                logger.info(f"{self.job_name} already completed for {run_date}")
+                return {'skipped': True, 'reason': 'completed', 'run_id': job_run.id}
+            if job_run and force:
+                # Start over: drop the previous run's shard cursors and partitioning
+                job_run.checkpoints = []
+                job_run.params = self._params()
+                job_run.attempts = 0
+
+            job_run = self._start_or_resume(job_run, run_date)
+            shards = self._pending_shards(job_run)
+
+            try:
+                summary = self.scheduler.run(shards=shards, run_id=job_run.id)
+            except Exception as e:
+                db.session.rollback()
+                self._finish(job_run, 'failed', {'error': str(e)})
+                raise
+
+            status = 'failed' if summary['shards_failed'] else 'completed'
+            summary['run_id'] = job_run.id
+            summary['resumed'] = job_run.attempts > 1
+            self._finish(job_run, status, summary)
+            return summary
+
+    def _start_or_resume(self, job_run: Optional[JobRun], run_date: date) -> JobRun:
+        if job_run is None:
+            job_run = JobRun(
+                job_name=self.job_name,
+                run_date=run_date,
+                status='running',
+                host=socket.gethostname(),
+                params=self._params()
+            )
+            db.session.add(job_run)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another host created the run between our check and insert
+                db.session.rollback()
+                job_run = JobRun.query.filter_by(job_name=self.job_name, run_date=run_date).one()
+            else:
+                return job_run
+
+        if job_run.attempts:
+            logger.info(f"Resuming {self.job_name} run {job_run.id} (status {job_run.status})")
+        # Resume with the original partitioning so shard cursors stay valid
+        params = job_run.params or {}
+        self.scheduler.shard_count = params.get('shard_count', self.scheduler.shard_count)
+        self.scheduler.strategy = params.get('strategy', self.scheduler.strategy)
+        job_run.status = 'running'
+        job_run.host = socket.gethostname()
+        job_run.attempts = (job_run.attempts if job_run.attempts is not None else 1) + 1
+        job_run.finished_at = None
+        db.session.commit()
+        return job_run
+
+    def _params(self) -> Dict:
+        return {
+            'shard_count': self.scheduler.shard_count,
+            'strategy': self.scheduler.strategy
+        }
+
+    def _partition(self, job_run: JobRun) -> Dict[int, List[int]]:
+        """
+        Shards for the run. Range shards keep the id bounds recorded by the
+        first attempt, so users added or deactivated since never move a
+        user into a shard that already completed; users outside every
+        recorded range form one extra shard.
+        """
+        user_ids = self.scheduler.active_user_ids()
+        params = job_run.params or {}
+        if self.scheduler.strategy != 'range':
+            # Hash shards depend only on the id, so they are stable already
+            return self.scheduler.partition(user_ids)
+
+        bounds = {int(index): tuple(bound) for index, bound in (params.get('bounds') or {}).items()}
+        if not bounds:
+            shards = self.scheduler.partition(user_ids)
+            job_run.params = dict(params, bounds={
+                str(index): [shard[0], shard[-1]] for index, shard in shards.items()
+            })
+            db.session.commit()
+            return shards
+
+        shards = {index: [] for index in bounds}
+        extra = max(bounds) + 1
+        for user_id in user_ids:
+            index = next((i for i, (low, high) in bounds.items() if low <= user_id <= high), extra)
+            shards.setdefault(index, []).append(user_id)
+        return {index: shard for index, shard in shards.items() if shard}
+
+    def _pending_shards(self, job_run: JobRun):
+        shards = self._partition(job_run)
+        checkpoints = CheckpointStore(job_run.id).load()
+
+        pending = {}
+        for index, user_ids in shards.items():
+            checkpoint = checkpoints.get(index)
+            if checkpoint is None:
+                pending[index] = user_ids
+            elif checkpoint.status != 'completed':
+                cursor = checkpoint.last_user_id or 0
+                pending[index] = [user_id for user_id in user_ids if user_id > cursor]
+        return pending
+
+    def _finish(self, job_run: JobRun, status: str, summary: Dict):
+        job_run.status = status
+        job_run.summary = summary
+        job_run.finished_at = datetime.utcnow()
+        db.session.commit()
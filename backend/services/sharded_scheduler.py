@@ -0,0 +1,231 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from extensions import db
+from models import User
+from .bulk_scheduler import BulkScheduler
+from .job_checkpoints import CheckpointStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def partition_users(user_ids: List[int], shard_count: int, strategy: str = 'hash') -> List[List[int]]:
+    """
+    Split user ids into shards, either by id hash (even spread regardless of
+    gaps in the id space) or by contiguous id range
+    """
+    shard_count = max(1, shard_count)
+    if strategy == 'range':
+        ordered = sorted(user_ids)
+        size, extra = divmod(len(ordered), shard_count)
+        shards, start = [], 0
+        for index in range(shard_count):
+            end = start + size + (1 if index < extra else 0)
+            shards.append(ordered[start:end])
+            start = end
+        return shards
+
+    if strategy != 'hash':
+        raise ValueError(f"Unknown sharding strategy: {strategy}")
+
+    shards = [[] for _ in range(shard_count)]
+    for user_id in user_ids:
+        shards[user_id % shard_count].append(user_id)
+    return shards
+
+
+def run_shard(shard_index: int,
+              user_ids: List[int],
+              config_name: Optional[str] = None,
+              scheduler_options: Optional[Dict] = None,
+              run_id: Optional[int] = None) -> Dict:
+    """
+    Schedule one shard in a worker process with its own app and session
+    """
+    from app import create_app
+
+    app = create_app(config_name, background_workers=False)
+    with app.app_context():
+        try:
+            return schedule_shard(shard_index, user_ids, scheduler_options, run_id)
+        finally:
+            db.session.remove()
+            db.engine.dispose()
+
+
+def schedule_shard(shard_index: int,
+                   user_ids: List[int],
+                   scheduler_options: Optional[Dict] = None,
+                   run_id: Optional[int] = None) -> Dict:
+    started = time.monotonic()
+    store = CheckpointStore(run_id) if run_id else None
+    checkpoint = (lambda chunk, scheduled: store.advance(shard_index, chunk, scheduled)) if store else None
+
+    try:
+        result = BulkScheduler(**(scheduler_options or {})).schedule(
+            user_ids=sorted(user_ids),
+            checkpoint=checkpoint
+        )
+    except Exception as e:
+        if store:
+            db.session.rollback()
+            store.finish(shard_index, error=str(e))
+        raise
+
+    if store:
+        store.finish(shard_index)
+    return {
+        'shard': shard_index,
+        'users_processed': result['users_processed'],
+        'concepts_scheduled': result['concepts_scheduled'],
+        'seconds': round(time.monotonic() - started, 3)
+    }
+
+
+class ShardedScheduler:
+    """
+    Runs the bulk scheduler over user shards in a process pool.
+
+    Each shard runs in its own process with its own app context and database
+    session. Failed shards are retried up to `max_retries` times and the
+    per-shard results are aggregated into one summary. With `workers=1`
+    shards run inline in the current app context.
+    """
+
+    def __init__(self,
+                 workers: int = 4,
+                 shard_count: Optional[int] = None,
+                 strategy: str = 'hash',
+                 max_retries: int = 2,
+                 config_name: Optional[str] = None,
+                 scheduler_options: Optional[Dict] = None):
+        self.workers = max(1, workers)
+        self.shard_count = shard_count or self.workers
+        self.strategy = strategy
+        self.max_retries = max_retries
+        self.config_name = config_name
+        self.scheduler_options = scheduler_options or {}
+        self.run_id = None
+
+    @classmethod
+    def from_config(cls, config, config_name: Optional[str] = None, **overrides):
+        options = {
+            'workers': config.get('SCHEDULER_WORKERS', 4),
+            'shard_count': config.get('SCHEDULER_SHARDS'),
+            'strategy': config.get('SCHEDULER_SHARD_STRATEGY', 'hash'),
+            'max_retries': config.get('SCHEDULER_SHARD_RETRIES', 2),
+            'config_name': config_name
+        }
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**options)
+
+    def active_user_ids(self) -> List[int]:
+        return [row.id for row in db.session.query(User.id).filter(
+            User.is_active == True
+        ).order_by(User.id).all()]
+
+    def partition(self, user_ids: List[int]) -> Dict[int, List[int]]:
+        shards = partition_users(user_ids, self.shard_count, self.strategy)
+        return {index: shard for index, shard in enumerate(shards) if shard}
+
+    def run(self,
+            user_ids: Optional[List[int]] = None,
+            shards: Optional[Dict[int, List[int]]] = None,
+            run_id: Optional[int] = None) -> Dict:
+        """
+        Schedule the given users (default: all active users), or explicit
+        pre-partitioned shards. With `run_id`, shards checkpoint their
+        progress to that job run.
+        """
+        if shards is None:
+            shards = self.partition(user_ids if user_ids is not None else self.active_user_ids())
+        self.run_id = run_id
+
+        logger.info(f"Scheduling {sum(len(s) for s in shards.values())} users in "
+                    f"{len(shards)} shards with {self.workers} workers")
+
+        started = time.monotonic()
+        pending = dict(shards)
+        attempts = {index: 0 for index in pending}
+        results: Dict[int, Dict] = {}
+        errors: Dict[int, str] = {}
+
+        while pending:
+            for index in pending:
+                attempts[index] += 1
+            failed = self._run_round(pending, results, errors, len(shards))
+            pending = {
+                index: self._remaining(index, shards[index]) for index in failed
+                if attempts[index] <= self.max_retries
+            }
+            for index in pending:
+                logger.warning(f"Retrying shard {index} (attempt {attempts[index] + 1})")
+
+        summary = {
+            'users_processed': sum(r['users_processed'] for r in results.values()),
+            'concepts_scheduled': sum(r['concepts_scheduled'] for r in results.values()),
+            'shards': len(shards),
+            'shards_succeeded': len(results),
+            'shards_failed': len(errors),
+            'retries': sum(count - 1 for count in attempts.values()),
+            'failed_shards': errors,
+            'seconds': round(time.monotonic() - started, 3)
+        }
+        logger.info(f"Sharded scheduling summary: {summary}")
+        return summary
+
+    def _remaining(self, shard_index: int, user_ids: List[int]) -> List[int]:
+        """
+        Users of a failed shard still to do, resuming after its last checkpoint
+        """
+        if not self.run_id:
+            return user_ids
+        checkpoint = CheckpointStore(self.run_id).load().get(shard_index)
+        cursor = checkpoint.last_user_id if checkpoint else 0
+        return [user_id for user_id in user_ids if user_id > (cursor or 0)]
+
+    def _run_round(self,
+                   pending: Dict[int, List[int]],
+                   results: Dict,
+                   errors: Dict,
+                   total: int) -> List[int]:
+        failed = []
+
+        def record(index, result=None, error=None):
+            if error is None:
+                results[index] = result
+                errors.pop(index, None)
+                logger.info(f"Shard {index} done: {result['users_processed']} users, "
+                            f"{result['concepts_scheduled']} concepts in {result['seconds']}s "
+                            f"({len(results)}/{total} shards complete)")
+            else:
+                errors[index] = error
+                failed.append(index)
+                logger.error(f"Shard {index} failed: {error}")
+
+        if self.workers == 1:
+            for index, user_ids in pending.items():
+                try:
+                    record(index, schedule_shard(index, user_ids, self.scheduler_options, self.run_id))
+                except Exception as e:
+                    db.session.rollback()
+                    record(index, error=str(e))
+            return failed
+
+        # Forked workers must not inherit the parent's pooled connections
+        db.engine.dispose()
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+            futures = {
+                executor.submit(
+                    run_shard, index, user_ids, self.config_name, self.scheduler_options, self.run_id
+                ): index
+                for index, user_ids in pending.items()
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    record(index, future.result())
+                except Exception as e:
+                    record(index, error=str(e))
+        return failed
@@ -0,0 +1,113 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import bindparam, case, func, or_, update
+from extensions import db
+from models import User, UserProgress
+from utils.db_utils import greatest
+from utils.time_utils import local_date_of, local_today
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StreakTracker:
+    """
+    Per-user learning streak counters.
+
+    `current_streak`, `longest_streak` and `last_activity_date` live on the
+    user row and are advanced by one conditional UPDATE whenever a concept
+    is completed, so reading a streak never scans the completion history.
+    Days are the user's local calendar days. `backfill` rebuilds the
+    counters from UserProgress for existing users.
+    """
+
+    def record_activity(self, user_id: int, today: date):
+        """
+        Count activity on the user's local `today`
+        """
+        current = func.coalesce(User.current_streak, 0)
+        new_streak = case(
+            (User.last_activity_date == today, current),
+            (User.last_activity_date == today - timedelta(days=1), current + 1),
+            else_=1
+        )
+        db.session.execute(
+            update(User).where(
+                User.id == user_id,
+                # Never move the counters backwards for a late, older event
+                or_(User.last_activity_date.is_(None), User.last_activity_date <= today)
+            ).values(
+                current_streak=new_streak,
+                longest_streak=greatest(func.coalesce(User.longest_streak, 0), new_streak),
+                last_activity_date=today
+            ),
+            execution_options={'synchronize_session': False}
+        )
+
+    def current_streak(self, user: User, today: Optional[date] = None) -> int:
+        """
+        The streak as of the user's today; it only counts once the user
+        has been active today
+        """
+        today = today or local_today(user.timezone)
+        if user.last_activity_date == today:
+            return user.current_streak or 0
+        return 0
+
+    def backfill(self, user_ids: Optional[Iterable[int]] = None, chunk_size: int = 500) -> Dict[str, int]:
+        """
+        Recompute the counters from completion history
+        """
+        if user_ids is None:
+            user_ids = [row.id for row in db.session.query(User.id).order_by(User.id).all()]
+        else:
+            user_ids = list(user_ids)
+
+        for offset in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[offset:offset + chunk_size]
+            timezones = dict(db.session.query(User.id, User.timezone).filter(User.id.in_(chunk)).all())
+
+            days = defaultdict(set)
+            rows = db.session.query(UserProgress.user_id, UserProgress.completed_at).filter(
+                UserProgress.user_id.in_(chunk),
+                UserProgress.status == 'completed',
+                UserProgress.completed_at.isnot(None)
+            ).all()
+            for user_id, completed_at in rows:
+                days[user_id].add(local_date_of(completed_at, timezones.get(user_id)))
+
+            params = []
+            for user_id in chunk:
+                current, longest, last = self._runs(sorted(days[user_id]))
+                params.append({
+                    'uid': user_id,
+                    'current': current,
+                    'longest': longest,
+                    'last': last
+                })
+
+            users = User.__table__
+            db.session.execute(
+                users.update().where(users.c.id == bindparam('uid')).values(
+                    current_streak=bindparam('current'),
+                    longest_streak=bindparam('longest'),
+                    last_activity_date=bindparam('last')
+                ),
+                params
+            )
+            db.session.commit()
+
+        logger.info(f"Backfilled streaks for {len(user_ids)} users")
+        return {'users_processed': len(user_ids)}
+
+    @staticmethod
+    def _runs(days: List[date]):
+        """(current run ending on the last day, longest run, last day)"""
+        if not days:
+            return 0, 0, None
+        longest = run = 1
+        for previous, day in zip(days, days[1:]):
+            run = run + 1 if day - previous == timedelta(days=1) else 1
+            longest = max(longest, run)
+        return run, longest, days[-1]
@@ -0,0 +1,212 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from extensions import db
+from models import Category, Tag
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+# Spellings that tokenization would otherwise break apart or lose
+SPELLINGS = [
+    (re.compile(r'\bc#'), ' csharp '),
+    (re.compile(r'\bc\+\+'), ' cplusplus '),
+    (re.compile(r'\bnode\.?js\b'), ' nodejs '),
+    (re.compile(r'\bci\s*/\s*cd\b'), ' cicd '),
+    (re.compile(r'\.net\b'), ' dotnet ')
+]
+STOPWORDS = frozenset(['and', 'the', 'of', 'for', 'in', 'concepts', 'technologies', 'services', 'features'])
+
+# Keywords per seeded category (seed_data.SEED_CATEGORIES), on top of the
+# words of each category's name and description
+CATEGORY_KEYWORDS = {
+    'Web Development': [
+        'web', 'frontend', 'backend', 'browser', 'html', 'css', 'javascript', 'typescript',
+        'react', 'vue', 'angular', 'svelte', 'nextjs', 'webassembly', 'http', 'rest api', 'graphql'
+    ],
+    'Machine Learning': [
+        'artificial intelligence', 'ai', 'machine learning', 'deep learning', 'neural network',
+        'llm', 'large language model', 'chatgpt', 'openai', 'gpt', 'model training', 'inference',
+        'tensorflow', 'pytorch', 'scikit learn', 'data science', 'generative ai', 'computer vision'
+    ],
+    'Cloud Computing': [
+        'cloud', 'aws', 'amazon web services', 'azure', 'gcp', 'google cloud', 'serverless',
+        'lambda', 's3', 'saas', 'iaas', 'multi cloud', 'data center'
+    ],
+    'DevOps': [
+        'devops', 'cicd', 'continuous integration', 'continuous delivery', 'deployment', 'docker',
+        'kubernetes', 'k8s', 'terraform', 'ansible', 'observability', 'sre', 'github actions', 'gitops'
+    ],
+    'Cybersecurity': [
+        'security', 'cybersecurity', 'vulnerability', 'exploit', 'malware', 'ransomware', 'breach',
+        'phishing', 'hackers', 'hack', 'encryption', 'zero day', 'cve', 'patch', 'authentication'
+    ],
+    'Mobile Development': [
+        'mobile', 'ios', 'android', 'iphone', 'app store', 'google play', 'swift', 'kotlin',
+        'flutter', 'react native', 'smartphone', 'mobile app'
+    ],
+    'Data Engineering': [
+        'data engineering', 'big data', 'data pipeline', 'etl', 'data warehouse', 'data lake',
+        'spark', 'kafka', 'airflow', 'snowflake', 'databricks', 'sql', 'database', 'postgresql', 'analytics'
+    ],
+    'Programming Languages': [
+        'programming language', 'python', 'java', 'rust', 'golang', 'csharp', 'cplusplus', 'kotlin',
+        'typescript', 'compiler', 'runtime', 'language release', 'syntax'
+    ]
+}
+
+# Alternative spellings per seeded tag (seed_data.SEED_TAGS)
+TAG_ALIASES = {
+    'nodejs': ['nodejs'],
+    'ci/cd': ['cicd', 'continuous integration', 'continuous delivery'],
+    'scikit-learn': ['scikit learn', 'sklearn'],
+    'kubernetes': ['kubernetes', 'k8s'],
+    'aws': ['aws', 'amazon web services'],
+    'gcp': ['gcp', 'google cloud'],
+    'postgresql': ['postgresql', 'postgres'],
+    'mongodb': ['mongodb', 'mongo'],
+    'golang': ['golang'],
+    'csharp': ['csharp', 'dotnet'],
+    'api': ['api', 'apis'],
+    'security': ['security', 'cybersecurity']
+}
+
+
+class Classification(NamedTuple):
+    category: Optional[str]
+    tags: List[str]
+    score: float
+
+
+def normalize(text: Optional[str]) -> List[str]:
+    text = (text or '').lower()
+    for pattern, replacement in SPELLINGS:
+        text = pattern.sub(replacement, text)
+    return TOKEN_RE.findall(text)
+
+
+class TopicClassifier:
+    """
+    Keyword classifier assigning a category and tags to articles.
+
+    Every keyword (one to three words) is compiled into one term index
+    mapping the term to the categories and tags it signals, so classifying
+    a document is one pass over its words, building longer n-grams only
+    where a known phrase starts. A term's category weight is its
+    specificity (an IDF over the categories, divided by the number of
+    categories sharing the term); document counts are dampened with
+    1 + log(tf) and title hits count `title_weight` times. Documents
+    scoring below `min_score` get no category.
+    """
+
+    def __init__(self,
+                 categories: Dict[str, Iterable[str]],
+                 tags: Dict[str, Iterable[str]],
+                 min_score: float = 1.0,
+                 max_tags: int = 5,
+                 title_weight: float = 2.0):
+        self.min_score = min_score
+        self.max_tags = max_tags
+        self.title_weight = title_weight
+        self.category_names = sorted(categories)
+        self.tag_names = sorted(tags)
+
+        category_terms = defaultdict(set)
+        for name, keywords in categories.items():
+            for keyword in keywords:
+                term = self._term(keyword)
+                if term and term not in STOPWORDS:
+                    category_terms[term].add(name)
+        total = len(self.category_names) or 1
+        self.category_index: Dict[str, List[Tuple[str, float]]] = {
+            term: [(name, math.log(1 + total / len(names)) / len(names)) for name in sorted(names)]
+            for term, names in category_terms.items()
+        }
+
+        tag_terms = defaultdict(set)
+        for name, aliases in tags.items():
+            for alias in aliases:
+                term = self._term(alias)
+                if term:
+                    tag_terms[term].add(name)
+        self.tag_index = {term: sorted(names) for term, names in tag_terms.items()}
+        terms = list(self.category_index) + list(self.tag_index)
+        self.max_ngram = max((term.count(' ') + 1 for term in terms), default=1)
+        self.phrase_starts = frozenset(term.split(' ', 1)[0] for term in terms if ' ' in term)
+
+    @classmethod
+    def from_vocabulary(cls, **kwargs) -> 'TopicClassifier':
+        """
+        Classifier over the stored categories and tags (seeded by
+        seed_data.py), extended with CATEGORY_KEYWORDS and TAG_ALIASES
+        """
+        categories = db.session.query(Category.name, Category.description).all()
+        tags = [row.name for row in db.session.query(Tag.name).all()]
+        return cls.from_names(categories, tags, **kwargs)
+
+    @classmethod
+    def from_names(cls,
+                   categories: Iterable[Tuple[str, Optional[str]]],
+                   tags: Iterable[str],
+                   **kwargs) -> 'TopicClassifier':
+        category_keywords = {}
+        for name, description in categories:
+            words = normalize(name) + normalize(description)
+            category_keywords[name] = [name] + words + CATEGORY_KEYWORDS.get(name, [])
+        tag_aliases = {tag: [tag] + TAG_ALIASES.get(tag, []) for tag in tags}
+        return cls(category_keywords, tag_aliases, **kwargs)
+
+    def classify(self, title: Optional[str], text: Optional[str] = None) -> Classification:
+        return self.classify_batch([(title, text)])[0]
+
+    def classify_batch(self, documents: Sequence[Tuple[Optional[str], Optional[str]]]) -> List[Classification]:
+        """
+        Classify (title, text) pairs
+        """
+        category_index = self.category_index
+        tag_index = self.tag_index
+        results = []
+        for title, text in documents:
+            counts = self._terms(normalize(text))
+            for term, count in self._terms(normalize(title)).items():
+                counts[term] += count * self.title_weight
+
+            scores = defaultdict(float)
+            tag_counts = Counter()
+            for term, count in counts.items():
+                weights = category_index.get(term)
+                if weights:
+                    damped = 1 + math.log(count)
+                    for name, weight in weights:
+                        scores[name] += weight * damped
+                for tag in tag_index.get(term, ()):
+                    tag_counts[tag] += count
+
+            category, score = None, 0.0
+            if scores:
+                category, score = max(scores.items(), key=lambda item: (item[1], item[0]))
+                if score < self.min_score:
+                    category = None
+            tags = [tag for tag, _ in sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))]
+            results.append(Classification(category, tags[:self.max_tags], round(score, 3)))
+        return results
+
+    def _terms(self, tokens: List[str]) -> Counter:
+        """
+        Counts of the document's words and of the multi-word terms it
+        contains; longer n-grams are only built where a known term starts
+        """
+        counts = Counter(tokens)
+        starts = self.phrase_starts
+        for i, token in enumerate(tokens):
+            if token in starts:
+                for size in range(2, self.max_ngram + 1):
+                    if i + size <= len(tokens):
+                        counts[' '.join(tokens[i:i + size])] += 1
+        return counts
+
+    @staticmethod
+    def _term(keyword: str) -> str:
+        return ' '.join(normalize(keyword))
@@ -0,0 +1,102 @@
+import hashlib
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from flask import current_app
+from sqlalchemy import event, func
+from extensions import db
+from models import Category, Tag
+import logging
+
+logger = logging.getLogger(__name__)
+
+VOCABULARIES = {
+    'categories': Category,
+    'tags': Tag
+}
+
+
+class CachedListing(NamedTuple):
+    version: Tuple
+    body: bytes       # Serialized JSON, as jsonify would render it
+    etag: str         # Strong validator: digest of the body
+    loaded_at: float  # time.monotonic() when the table was read
+
+
+class VocabularyCache:
+    """
+    In-process cache of the category and tag listings.
+
+    The lists only grow when seeding or news conversion adds rows, so each
+    listing is kept as ready-to-send JSON bytes with an ETag. A lookup runs
+    one aggregate query (row count and highest id) as the version and only
+    reloads and re-serializes the table when it changed; ORM edits to
+    existing rows in this process bump a local generation as well. Edits
+    made elsewhere without adding rows (the tables have no updated_at to
+    aggregate) are picked up once an entry is `max_lifetime` seconds old.
+    """
+
+    def __init__(self, max_age: int = 60, max_lifetime: float = 300):
+        self.max_age = max_age
+        self.max_lifetime = max_lifetime
+        self._entries: Dict[str, CachedListing] = {}
+        self._generations = {name: 0 for name in VOCABULARIES}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_age = app.config.get('VOCABULARY_CACHE_MAX_AGE', self.max_age)
+        self.max_lifetime = app.config.get('VOCABULARY_CACHE_MAX_LIFETIME', self.max_lifetime)
+        # A fresh app may point at a different database
+        self.clear()
+
+    def get(self, name: str) -> CachedListing:
+        model = VOCABULARIES[name]
+        count, max_id = db.session.query(func.count(model.id), func.max(model.id)).one()
+        with self._lock:
+            version = (count, max_id, self._generations[name])
+            listing = self._entries.get(name)
+            if (listing is not None and listing.version == version
+                    and time.monotonic() - listing.loaded_at < self.max_lifetime):
+                self.hits += 1
+                return listing
+            self.misses += 1
+
+        rows = model.query.order_by(model.id).all()
+        body = current_app.json.dumps([row.to_dict() for row in rows]).encode() + b'\n'
+        listing = CachedListing(version, body, hashlib.sha256(body).hexdigest()[:32], time.monotonic())
+        with self._lock:
+            # An edit while loading leaves the generation ahead, forcing a reload next time
+            self._entries[name] = listing
+        return listing
+
+    def invalidate(self, name: Optional[str] = None):
+        with self._lock:
+            for key in ([name] if name else list(VOCABULARIES)):
+                self._generations[key] += 1
+                self._entries.pop(key, None)
+
+    def clear(self):
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+vocabulary_cache = VocabularyCache()
+
+
+def _listen(name: str, model):
+    def changed(mapper, connection, target):
+        vocabulary_cache.invalidate(name)
+
+    for event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, event_name, changed)
+
+
+for _name, _model in VOCABULARIES.items():
+    _listen(_name, _model)
@@ -8,6 +8,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from app import create_app
 from extensions import db
 from models.user import User
+from models import Category, Challenge, TestCase, Concept
 
 
 @pytest.fixture
@@ -39,4 +40,55 @@ def auth_headers(client):
     })
     
     token = response.json['access_token']
-    return {'Authorization': f'Bearer {token}'}
\ No newline at end of file
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def challenge(app):
+    """Create a challenge with two test cases."""
+    category = Category(name='Algorithms')
+    db.session.add(category)
+    db.session.flush()
+
+    challenge = Challenge(
+        title='Echo',
+        description='Echo the input',
+        difficulty='easy',
+        category_id=category.id,
+        problem_statement='Print the input back',
+        initial_code='print(input())',
+        hints=['Use input()', 'Use print()'],
+        time_limit=2000,
+        points=15
+    )
+    challenge.test_cases = [
+        TestCase(input_data='b', expected_output='b', order_index=1),
+        TestCase(input_data='a', expected_output='a', order_index=0)
+    ]
+    db.session.add(challenge)
+    db.session.commit()
+    return challenge
+
+
+@pytest.fixture
+def user(app):
+    """Create a plain user."""
+    user = User(username='hintuser', email='hint@example.com', password='TestPass123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def concept(app):
+    """Create an active concept."""
+    category = Category.query.filter_by(name='Algorithms').first() or Category(name='Algorithms')
+    concept = Concept(
+        title='Binary Search',
+        short_description='Halving the search space',
+        content='# Binary Search',
+        category=category
+    )
+    db.session.add(concept)
+    db.session.commit()
+    return concept
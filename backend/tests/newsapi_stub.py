@@ -0,0 +1,142 @@
+"""
+Local stand-in for the NewsAPI /v2/everything endpoint, used by tests and
+benchmarks.
+
+    with NewsAPIStub(latency=0.2) as stub:
+        service = NewsAPIService(api_key='test', base_url=stub.base_url)
+"""
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class NewsAPIStub:
+    """
+    Threaded HTTP server returning deterministic articles per query.
+
+    `latency` delays every response (`latencies` overrides it per query);
+    `failures` maps a query to a list of
+    statuses returned (in order) before it succeeds, e.g. {'DevOps': [429]}.
+    Article i of a query is published i hours after `published_base`, so
+    raising `articles_per_query` publishes newer ones. Results are served
+    newest-first, honour `from`, `pageSize` and `page`, and every request's
+    parameters are recorded alongside hits and peak concurrency.
+    """
+
+    def __init__(self, latency: float = 0.0, failures=None, articles_per_query: int = 5, latencies=None):
+        self.latency = latency
+        self.latencies = dict(latencies or {})
+        self.failures = {q: list(statuses) for q, statuses in (failures or {}).items()}
+        self.articles_per_query = articles_per_query
+        self.published_base = (datetime.utcnow() - timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        self.hits = defaultdict(int)
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v2'
+
+    @property
+    def request_count(self):
+        return sum(self.hits.values())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def articles_for(self, query):
+        return [
+            {
+                'source': {'id': None, 'name': 'Stub News'},
+                'author': 'Stub Author',
+                'title': f'{query} story {i}',
+                'description': f'About {query}',
+                'url': f'https://news.example.com/{query.replace(" ", "-")}/{i}',
+                'urlToImage': None,
+                'publishedAt': (self.published_base + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'content': f'{query} content {i}'
+            }
+            for i in reversed(range(self.articles_per_query))
+        ]
+
+    def page_for(self, params):
+        articles = self.articles_for(params.get('q', ''))
+        since = params.get('from')
+        if since:
+            # Inclusive, like NewsAPI; dates are compared as ISO strings
+            articles = [a for a in articles if a['publishedAt'][:len(since)] >= since]
+        page_size = int(params.get('pageSize', 100))
+        page = int(params.get('page', 1))
+        return len(articles), articles[(page - 1) * page_size:page * page_size]
+
+    def _handle(self, request):
+        url = urlsplit(request.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        query = params.get('q', '')
+        with self._lock:
+            self.hits[query] += 1
+            self.requests.append(params)
+            self.connections.add(request.client_address)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            pending = self.failures.get(query)
+            status = pending.pop(0) if pending else 200
+        try:
+            latency = self.latencies.get(query, self.latency)
+            if latency:
+                time.sleep(latency)
+            if url.path != '/v2/everything':
+                status = 404
+            if status == 200:
+                total, articles = self.page_for(params)
+                body = {'status': 'ok', 'totalResults': total, 'articles': articles}
+            else:
+                body = {'status': 'error', 'code': str(status)}
+            payload = json.dumps(body).encode()
+            request.send_response(status)
+            request.send_header('Content-Type', 'application/json')
+            request.send_header('Content-Length', str(len(payload)))
+            if status == 429:
+                request.send_header('Retry-After', '0')
+            request.end_headers()
+            request.wfile.write(payload)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
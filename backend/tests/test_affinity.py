@@ -0,0 +1,109 @@
+import random
+import pytest
+from extensions import db
+from models import Category, Concept, Tag, UserAffinity
+from services.affinity import AffinityRecommender, AffinityScorer, AffinityStore, AffinityVector
+from services.concept_selector import ConceptPool
+from services.progress_writer import ProgressWriter
+
+
+@pytest.fixture
+def catalog(app):
+    """Two categories of ten concepts; Web concepts are tagged http."""
+    web, data = Category(name='Web'), Category(name='Data')
+    http = Tag(name='http')
+    concepts = [
+        Concept(title=f'Concept {i}', short_description='Short', content='Body',
+                category=web if i % 2 else data, tags=[http] if i % 2 else [])
+        for i in range(20)
+    ]
+    db.session.add_all(concepts)
+    db.session.commit()
+    return {'web': web.id, 'data': data.id, 'http': http.id, 'concepts': concepts}
+
+
+class TestAffinityStore:
+    """Test cases for incremental affinity vectors."""
+
+    def test_progress_events_update_vector(self, user, catalog):
+        """Starting, completing and skipping move category and tag weights."""
+        writer = ProgressWriter()
+        web_concept = catalog['concepts'][1]
+        data_concept = catalog['concepts'][0]
+        writer.start_concept(user.id, web_concept.id)
+        writer.complete_concept(user.id, web_concept.id)
+        writer.skip_concept(user.id, data_concept.id)
+        db.session.commit()
+
+        vector = AffinityStore().load([user.id])[user.id]
+        assert vector.category_weights == {catalog['web']: 2.0, catalog['data']: -1.0}
+        assert vector.tag_weights == {catalog['http']: 2.0}
+        assert vector.events == 3
+
+    def test_rebuild_matches_incremental(self, user, catalog):
+        """The backfill derives the same weights from progress rows."""
+        writer = ProgressWriter()
+        for concept in catalog['concepts'][:3]:
+            writer.complete_concept(user.id, concept.id)
+        db.session.commit()
+        incremental = AffinityStore().load([user.id])[user.id]
+
+        UserAffinity.query.delete()
+        db.session.commit()
+        AffinityStore().rebuild()
+
+        rebuilt = AffinityStore().load([user.id])[user.id]
+        assert rebuilt.category_weights == incremental.category_weights
+        assert rebuilt.tag_weights == incremental.tag_weights
+
+
+class TestAffinityScorer:
+    """Test cases for candidate scoring."""
+
+    @pytest.mark.parametrize('use_numpy', [False, True])
+    def test_scores_category_and_tags(self, catalog, use_numpy):
+        """A score is the category weight plus the weighted tag weights."""
+        pool = ConceptPool()
+        pool.ensure_fresh()
+        scorer = AffinityScorer(pool, tag_weight=0.5, use_numpy=use_numpy)
+        web_concept, data_concept = catalog['concepts'][1].id, catalog['concepts'][0].id
+        vectors = [
+            AffinityVector({catalog['web']: 2.0}, {catalog['http']: 4.0}),
+            AffinityVector({catalog['data']: 1.0})
+        ]
+
+        scores = scorer.score(vectors, [[web_concept, data_concept], [data_concept]])
+
+        assert scores == [[4.0, 0.0], [1.0]]
+
+
+class TestAffinityRecommender:
+    """Test cases for the exploitation/exploration mix."""
+
+    def test_new_users_explore(self, catalog):
+        """Without history every pick is exploration."""
+        recommender = AffinityRecommender(pool=ConceptPool(), rng=random.Random(1))
+        assert recommender.exploration_rate(None) == 1.0
+
+        picks = recommender.recommend({1: 4}, {}, {})
+        assert len(set(picks[1])) == 4
+
+    def test_exploration_decays_with_history(self):
+        """More events mean less exploration, down to the floor."""
+        recommender = AffinityRecommender(pool=ConceptPool(), min_exploration=0.2, exploration_halflife=10)
+        rates = [
+            recommender.exploration_rate(AffinityVector({1: 1.0}, events=events))
+            for events in (0, 10, 1000)
+        ]
+        assert rates == [1.0, 0.5, 0.2]
+
+    def test_experienced_users_get_preferred_categories(self, catalog):
+        """Exploitation picks the highest-scoring concepts first."""
+        pool = ConceptPool()
+        recommender = AffinityRecommender(pool=pool, rng=random.Random(2), min_exploration=0.0)
+        vector = AffinityVector({catalog['web']: 5.0}, {catalog['http']: 5.0}, events=10000)
+
+        picks = recommender.recommend({7: 4}, {7: set()}, {7: vector})[7]
+
+        assert len(picks) == 4
+        assert all(pool.category_of[cid] == catalog['web'] for cid in picks)
@@ -0,0 +1,130 @@
+import itertools
+from datetime import datetime, timedelta
+from extensions import db
+from models import Category, Concept, NewsArticle
+from services.article_converter import ArticleConverter, ArticleQualityFilter
+
+_urls = itertools.count()
+
+
+def _add_articles(count, content_length=600, **overrides):
+    articles = []
+    for i in range(count):
+        fields = {
+            'title': f'Story {i}',
+            'description': f'Summary of story {i}',
+            'content': 'x' * content_length,
+            'url': f'https://news.example.com/{next(_urls)}',
+            'source_name': 'Wire',
+            'published_at': datetime(2024, 1, 1) + timedelta(hours=i)
+        }
+        fields.update(overrides)
+        articles.append(NewsArticle(**fields))
+    db.session.add_all(articles)
+    db.session.commit()
+    return [article.id for article in articles]
+
+
+class TestArticleConverter:
+    """Test cases for batch article-to-concept conversion."""
+
+    def test_articles_are_linked_to_their_concepts(self, app):
+        """Each converted article is processed and points at its concept."""
+        ids = _add_articles(3)
+        linked = ArticleConverter().convert(ids)
+
+        assert sorted(linked) == ids
+        for article in NewsArticle.query.all():
+            concept = db.session.get(Concept, article.concept_id)
+            assert article.is_processed
+            assert concept.external_url == article.url
+            assert concept.meta_info['original_article_id'] == article.id
+            assert concept.category.name == 'General'
+
+    def test_constant_statements_per_batch(self, app):
+        """A batch of any size takes the same handful of statements."""
+        ids = _add_articles(25)
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            linked = ArticleConverter().convert(ids)
+        finally:
+            db.event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert len(linked) == 25
+        # claim, load articles, upsert + select categories, insert concepts, link articles
+        assert len(statements) == 6
+
+    def test_categories_are_resolved_once(self, app):
+        """Per-article categories are created once and reused."""
+        ids = _add_articles(4)
+        db.session.add(Category(name='AI'))
+        db.session.commit()
+
+        ArticleConverter().convert(ids, category_for=lambda a: 'AI' if a.title.endswith(('0', '2')) else 'Cloud')
+
+        counts = dict(db.session.query(Category.name, db.func.count(Concept.id)).join(Concept).group_by(Category.name))
+        assert counts == {'AI': 2, 'Cloud': 2}
+        assert Category.query.count() == 2
+
+    def test_processed_and_duplicate_articles_are_skipped(self, app):
+        """Articles already converted or marked as duplicates are not converted again."""
+        first, second, third = _add_articles(3)
+        converter = ArticleConverter()
+        converter.convert([first])
+        db.session.get(NewsArticle, third).duplicate_of_id = second
+        db.session.commit()
+
+        assert list(converter.convert([first, second, third])) == [second]
+        assert Concept.query.count() == 2
+
+
+class TestArticleQualityFilter:
+    """Test cases for selecting articles worth converting."""
+
+    def test_default_filter_requires_long_content(self, app):
+        """Only articles with more than 500 characters of content qualify."""
+        long_ids = _add_articles(2)
+        _add_articles(2, content_length=100)
+
+        assert sorted(ArticleConverter(ArticleQualityFilter()).select()) == long_ids
+
+    def test_configurable_filters(self, app):
+        """Image, age and source filters narrow the selection."""
+        [fresh] = _add_articles(1, url_to_image='https://img/1', published_at=datetime(2024, 3, 1))
+        _add_articles(1, url_to_image='https://img/2', published_at=datetime(2023, 1, 1))
+        _add_articles(1, source_name='Spam Daily', url_to_image='https://img/3', published_at=datetime(2024, 3, 1))
+        _add_articles(1, published_at=datetime(2024, 3, 1), title='No image')
+
+        quality = ArticleQualityFilter(require_image=True, max_age_days=30, blocked_sources=['Spam Daily'])
+        assert ArticleConverter(quality).select(now=datetime(2024, 3, 10)) == [fresh]
+
+    def test_select_skips_duplicates_and_respects_limit(self, app):
+        """Selection is newest first, capped and free of duplicates."""
+        ids = _add_articles(5)
+        db.session.get(NewsArticle, ids[-1]).duplicate_of_id = ids[0]
+        db.session.commit()
+
+        assert ArticleConverter(ArticleQualityFilter()).select(limit=2) == [ids[3], ids[2]]
+
+    def test_filter_and_service_read_app_config(self, app):
+        """Quality and fetch settings come from the app's config, not the environment."""
+        from services.news_service import NewsAPIService
+
+        app.config.update(NEWS_CONVERT_REQUIRE_IMAGE=True, NEWS_CONVERT_MAX_AGE_DAYS='30',
+                          NEWS_CONVERT_BLOCKED_SOURCES='Spam Daily', NEWS_CLASSIFY_TOPICS=False,
+                          NEWS_FETCH_WORKERS=2, NEWS_PIPELINE_BATCH_SIZE=25)
+        quality = ArticleQualityFilter.from_config(app.config)
+        assert quality.require_image is True
+        assert quality.max_age_days == 30
+        assert quality.blocked_sources == ['Spam Daily']
+
+        service = NewsAPIService(api_key='test')
+        assert service.converter.quality.require_image is True
+        assert service.converter.classify is False
+        assert service.max_workers == 2
+        assert service.pipeline_batch_size == 25
@@ -0,0 +1,123 @@
+from extensions import db
+from models import NewsArticle, NewsArticleBand
+from services.article_dedup import MinHasher, NearDuplicateDetector
+from services.news_service import NewsAPIService
+
+STORY = ("OpenAI releases a new reasoning model for developers",
+         "The model is available through the API today and improves coding, math and science benchmarks "
+         "while costing less than the previous generation.")
+
+
+def _article(url, title, description, source='Wire'):
+    return {'url': url, 'title': title, 'description': description,
+            'source': {'name': source}, 'publishedAt': '2024-01-02T10:00:00Z'}
+
+
+def _syndicated(url, source):
+    title, description = STORY
+    return _article(url, title + f' | {source}', description, source)
+
+
+class TestMinHasher:
+    """Test cases for MinHash signatures and LSH buckets."""
+
+    def test_signatures_are_stable_across_instances(self):
+        """Seeded hashes give the same signature in every process."""
+        text = ' '.join(STORY)
+        assert MinHasher().signature(text) == MinHasher().signature(text)
+
+    def test_similarity_tracks_overlap(self):
+        """Near-identical texts score high, unrelated texts low."""
+        hasher = MinHasher()
+        base = hasher.signature(' '.join(STORY))
+        edited = hasher.signature(' '.join(STORY) + ' Reported by TechCrunch')
+        other = hasher.signature('Rust 1.80 stabilizes lazy cell and exclusive range patterns')
+
+        assert hasher.similarity(base, edited) > 0.7
+        assert hasher.similarity(base, other) < 0.2
+
+    def test_similar_texts_share_a_bucket(self):
+        """LSH bands put near-duplicates into a common bucket."""
+        hasher = MinHasher()
+        a = hasher.buckets(hasher.signature(' '.join(STORY)))
+        b = hasher.buckets(hasher.signature(' '.join(STORY) + ' via The Verge'))
+        assert len(a) == 16
+        assert any(x == y for x, y in zip(a, b))
+
+    def test_empty_text_has_no_signature(self):
+        """Text without tokens cannot be signed."""
+        assert MinHasher().signature(' -- ') is None
+
+
+class TestNearDuplicateDetection:
+    """Test cases for clustering syndicated articles on insert."""
+
+    def test_syndicated_copies_point_at_first_article(self, app):
+        """Copies under other URLs are marked as duplicates of the first one."""
+        service = NewsAPIService(api_key='test')
+        ids = service.insert_articles([
+            _syndicated('https://techcrunch.com/a', 'TechCrunch'),
+            _syndicated('https://theverge.com/b', 'The Verge'),
+            _article('https://wired.com/c', 'Kubernetes 1.30 ships', 'Sidecar containers graduate to beta.'),
+        ])
+
+        articles = {a.url: a for a in NewsArticle.query.all()}
+        assert len(ids) == 3
+        assert articles['https://techcrunch.com/a'].duplicate_of_id is None
+        assert articles['https://theverge.com/b'].duplicate_of_id == articles['https://techcrunch.com/a'].id
+        assert articles['https://wired.com/c'].duplicate_of_id is None
+        assert NewsArticleBand.query.count() == 3 * 16
+
+    def test_matches_articles_from_earlier_batches(self, app):
+        """A later batch is clustered with stored articles."""
+        service = NewsAPIService(api_key='test')
+        [first] = service.insert_articles([_syndicated('https://techcrunch.com/a', 'TechCrunch')])
+        service.insert_articles([_syndicated('https://wired.com/b', 'Wired')])
+        service.insert_articles([_syndicated('https://theverge.com/c', 'The Verge')])
+
+        duplicates = NewsArticle.query.filter(NewsArticle.duplicate_of_id.isnot(None)).all()
+        assert [a.duplicate_of_id for a in duplicates] == [first, first]
+
+    def test_lookup_cost_does_not_grow_with_table(self, app):
+        """Clustering a batch issues the same statements however many articles are stored."""
+        service = NewsAPIService(api_key='test')
+        service.insert_articles([
+            _article(f'https://news/{i}', f'Story number {i} about topic {i * 7}', f'Details {i} {i * 3}')
+            for i in range(200)
+        ])
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            service.insert_articles([_syndicated('https://techcrunch.com/a', 'TechCrunch')])
+        finally:
+            db.event.remove(db.engine, 'before_cursor_execute', record)
+
+        # INSERT article, SELECT candidates by bucket, INSERT bands
+        assert len(statements) == 3
+
+    def test_duplicates_are_not_converted(self, app):
+        """Only the first article of a cluster becomes a concept."""
+        service = NewsAPIService(api_key='test')
+        first, copy = service.insert_articles([
+            _syndicated('https://techcrunch.com/a', 'TechCrunch'),
+            _syndicated('https://theverge.com/b', 'The Verge'),
+        ])
+
+        assert service.convert_to_concept(copy) is None
+        assert service.convert_to_concept(first) is not None
+
+    def test_backfill_signs_existing_articles(self, app):
+        """Articles stored without signatures are signed and clustered."""
+        title, description = STORY
+        for url in ('https://a', 'https://b'):
+            db.session.add(NewsArticle(url=url, title=title, description=description))
+        db.session.commit()
+
+        result = NearDuplicateDetector().backfill(batch_size=1)
+
+        assert result == {'indexed': 2, 'duplicates': 1}
+        assert NewsArticle.query.filter(NewsArticle.minhash.is_(None)).count() == 0
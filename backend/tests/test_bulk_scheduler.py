@@ -0,0 +1,221 @@
+import random
+from datetime import date, timedelta
+import pytest
+from extensions import db
+from models import Category, Concept, DailyContent, User, UserProgress
+from services.bulk_scheduler import BulkScheduler
+
+
+@pytest.fixture
+def catalog(app):
+    """Create two categories with enough concepts for a full week."""
+    categories = [Category(name='Web'), Category(name='Data')]
+    db.session.add_all(categories)
+    db.session.flush()
+
+    concepts = []
+    for i in range(40):
+        concepts.append(Concept(
+            title=f'Concept {i}',
+            short_description='Short',
+            content='Body',
+            category_id=categories[i % 2].id
+        ))
+    db.session.add_all(concepts)
+    db.session.commit()
+    return concepts
+
+
+def _make_users(count):
+    users = [
+        User(username=f'user{i}', email=f'user{i}@example.com', password='TestPass123')
+        for i in range(count)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+class TestBulkScheduler:
+    """Test cases for set-based scheduling."""
+
+    def test_fills_every_day_without_repeats(self, catalog):
+        """Each user gets a full, duplicate-free week."""
+        users = _make_users(3)
+        result = BulkScheduler(rng=random.Random(1)).schedule()
+
+        assert result == {'users_processed': 3, 'concepts_scheduled': 63}
+        for user in users:
+            rows = DailyContent.query.filter_by(user_id=user.id).all()
+            assert len(rows) == 21
+            assert len({row.concept_id for row in rows}) == 21
+
+    def test_tops_up_existing_days_and_skips_completed(self, catalog):
+        """Existing rows count towards the day and completed concepts are skipped."""
+        user = _make_users(1)[0]
+        today = date.today()
+        db.session.add(DailyContent(user_id=user.id, concept_id=catalog[0].id, scheduled_date=today))
+        db.session.add(UserProgress(user_id=user.id, concept_id=catalog[1].id, status='completed'))
+        db.session.commit()
+
+        BulkScheduler(rng=random.Random(2)).schedule(start_date=today)
+
+        assert DailyContent.query.filter_by(user_id=user.id, scheduled_date=today).count() == 3
+        assert DailyContent.query.filter_by(user_id=user.id, concept_id=catalog[1].id).count() == 0
+        assert DailyContent.query.filter_by(user_id=user.id, concept_id=catalog[0].id).count() == 1
+
+    def test_query_count_independent_of_users(self, catalog):
+        """Scheduling more users in one chunk does not add queries."""
+        _make_users(2)
+
+        def count_queries(user_count):
+            statements = []
+
+            def record(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            db.session.query(DailyContent).delete()
+            db.session.query(User).update({'scheduled_through': None})
+            db.session.commit()
+            db.event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                BulkScheduler(rng=random.Random(3)).schedule(
+                    user_ids=[u.id for u in User.query.limit(user_count)]
+                )
+            finally:
+                db.event.remove(db.engine, 'before_cursor_execute', record)
+            return len(statements)
+
+        count_queries(1)  # builds the concept pool
+        assert count_queries(1) == count_queries(2)
+
+    def test_replayed_rows_are_not_counted(self, catalog, monkeypatch):
+        """Rows that already exist (a replayed or concurrent run) don't inflate concepts_scheduled."""
+        user = _make_users(1)[0]
+        BulkScheduler(rng=random.Random(1)).schedule()
+        before = DailyContent.query.count()
+        user.scheduled_through = None
+        db.session.commit()
+
+        # Plan as if nothing had been written yet, like a run that read state before the first committed
+        scheduler = BulkScheduler(rng=random.Random(1))
+        monkeypatch.setattr(scheduler, '_load_day_counts', lambda *args: {})
+        monkeypatch.setattr(scheduler, '_load_exclusions', lambda *args: {})
+        result = scheduler.schedule()
+
+        assert before == 21
+        assert result['concepts_scheduled'] == DailyContent.query.count() - before
+        assert result['concepts_scheduled'] < 21
+
+    def test_watermark_limits_next_run_to_new_day(self, catalog):
+        """The following night only the newly entered last day is filled."""
+        user = _make_users(1)[0]
+        today = date.today()
+        BulkScheduler(rng=random.Random(4)).schedule(start_date=today)
+        assert db.session.get(User, user.id).scheduled_through == today + timedelta(days=6)
+
+        result = BulkScheduler(rng=random.Random(5)).schedule(start_date=today + timedelta(days=1))
+
+        assert result['concepts_scheduled'] == 3
+        assert DailyContent.query.filter_by(
+            user_id=user.id, scheduled_date=today + timedelta(days=7)
+        ).count() == 3
+
+        # Already scheduled through the window: nothing to do
+        result = BulkScheduler().schedule(start_date=today + timedelta(days=1))
+        assert result == {'users_processed': 0, 'concepts_scheduled': 0}
+
+
+    def test_short_days_are_filled_after_catalog_grows(self, app):
+        """The watermark stops before a day left short, so new concepts fill it later."""
+        category = Category(name='Web')
+        db.session.add(category)
+        db.session.flush()
+        db.session.add_all([
+            Concept(title=f'Concept {i}', short_description='Short', content='Body', category_id=category.id)
+            for i in range(5)
+        ])
+        db.session.commit()
+        user = _make_users(1)[0]
+        today = date.today()
+
+        result = BulkScheduler(rng=random.Random(6)).schedule(start_date=today)
+        assert result['concepts_scheduled'] == 5
+        # Day one is full, day two only has two concepts
+        assert db.session.get(User, user.id).scheduled_through == today
+
+        db.session.add_all([
+            Concept(title=f'New concept {i}', short_description='Short', content='Body', category_id=category.id)
+            for i in range(20)
+        ])
+        db.session.commit()
+        result = BulkScheduler(rng=random.Random(7)).schedule(start_date=today)
+
+        assert result['concepts_scheduled'] == 16
+        for offset in range(7):
+            assert DailyContent.query.filter_by(
+                user_id=user.id, scheduled_date=today + timedelta(days=offset)
+            ).count() == 3
+        assert db.session.get(User, user.id).scheduled_through == today + timedelta(days=6)
+
+
+class TestScheduleTopUp:
+    """Test cases for event-driven schedule top-ups."""
+
+    @pytest.fixture
+    def scheduled_user(self, catalog):
+        from services.daily_delivery_service import DailyDeliveryService
+
+        service = DailyDeliveryService()
+        user = _make_users(1)[0]
+        today = service.user_today(user.id)
+        service._bulk_scheduler().schedule(user_ids=[user.id], start_date=today)
+        return service, user, today
+
+    def test_skip_replaces_slot(self, scheduled_user):
+        """Skipping a concept removes it and refills its day."""
+        service, user, today = scheduled_user
+        concept_id = DailyContent.query.filter_by(user_id=user.id, scheduled_date=today).first().concept_id
+
+        progress = service.skip_concept(user.id, concept_id)
+
+        assert progress.status == 'skipped'
+        assert DailyContent.query.filter_by(user_id=user.id, concept_id=concept_id).count() == 0
+        assert DailyContent.query.filter_by(user_id=user.id, scheduled_date=today).count() == 3
+        assert db.session.get(User, user.id).scheduled_through == today + timedelta(days=6)
+
+    def test_early_completion_frees_future_slot(self, scheduled_user):
+        """Completing a concept scheduled for a later day refills that day."""
+        service, user, today = scheduled_user
+        later = today + timedelta(days=3)
+        concept_id = DailyContent.query.filter_by(user_id=user.id, scheduled_date=later).first().concept_id
+
+        service.mark_concept_completed(user.id, concept_id)
+
+        assert DailyContent.query.filter_by(user_id=user.id, concept_id=concept_id).count() == 0
+        assert DailyContent.query.filter_by(user_id=user.id, scheduled_date=later).count() == 3
+
+    def test_skip_keeps_completed_status(self, scheduled_user):
+        """A completed concept is not downgraded by a skip."""
+        service, user, today = scheduled_user
+        slot = DailyContent.query.filter_by(user_id=user.id, scheduled_date=today).first()
+        service.mark_concept_completed(user.id, slot.concept_id)
+
+        assert service.skip_concept(user.id, slot.concept_id).status == 'completed'
+
+    def test_skip_commits_once(self, scheduled_user):
+        """The release, the top-up and the progress write share one transaction."""
+        service, user, today = scheduled_user
+        concept_id = DailyContent.query.filter_by(user_id=user.id, scheduled_date=today).first().concept_id
+        commits = []
+
+        def record(session):
+            commits.append(session)
+
+        db.event.listen(db.session, 'after_commit', record)
+        try:
+            service.skip_concept(user.id, concept_id)
+        finally:
+            db.event.remove(db.session, 'after_commit', record)
+
+        assert len(commits) == 1
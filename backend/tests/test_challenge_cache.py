@@ -0,0 +1,82 @@
+import pytest
+from extensions import db
+from models import Challenge, TestCase
+from services.challenge_cache import ChallengeCache
+
+
+class TestChallengeCache:
+    """Test cases for the judge's challenge cache."""
+
+    def test_bundle_contents(self, challenge):
+        """Bundles carry limits, hints and ordered test cases."""
+        cache = ChallengeCache()
+        bundle = cache.get(challenge.id)
+
+        assert bundle.time_limit == 2000
+        assert bundle.points == 15
+        assert bundle.hints == ('Use input()', 'Use print()')
+        assert [tc['input'] for tc in bundle.test_cases] == ['a', 'b']
+
+    def test_repeat_lookup_is_cached(self, challenge):
+        """Unchanged challenges are served from memory."""
+        cache = ChallengeCache()
+        first = cache.get(challenge.id)
+        second = cache.get(challenge.id)
+
+        assert first is second
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_test_case_edit_invalidates(self, challenge):
+        """Adding a test case bumps the version and reloads the bundle."""
+        cache = ChallengeCache()
+        cache.get(challenge.id)
+
+        db.session.add(TestCase(
+            challenge_id=challenge.id, input_data='c', expected_output='c', order_index=2
+        ))
+        db.session.commit()
+
+        bundle = cache.get(challenge.id)
+        assert len(bundle.test_cases) == 3
+
+    def test_challenge_edit_invalidates(self, challenge):
+        """Editing challenge limits reloads the bundle."""
+        cache = ChallengeCache()
+        cache.get(challenge.id)
+
+        challenge.time_limit = 1000
+        db.session.commit()
+
+        assert cache.get(challenge.id).time_limit == 1000
+
+    def test_missing_challenge(self, app):
+        """Unknown challenges return None."""
+        assert ChallengeCache().get(9999) is None
+
+    def test_eviction_by_size(self, challenge):
+        """Entries beyond the byte budget are evicted oldest first."""
+        second = Challenge(
+            title='Echo 2',
+            description='Echo again',
+            category_id=challenge.category_id,
+            problem_statement='Print the input back',
+            initial_code='print(input())'
+        )
+        db.session.add(second)
+        db.session.commit()
+
+        cache = ChallengeCache()
+        first_bundle = cache.get(challenge.id)
+        cache.max_bytes = first_bundle.size
+        cache.get(second.id)
+
+        assert cache.stats()['entries'] == 1
+        assert cache.stats()['bytes'] <= cache.max_bytes
+
+    def test_warm_up(self, challenge):
+        """Warm-up preloads active challenges."""
+        cache = ChallengeCache()
+        assert cache.warm_up() == 1
+        cache.get(challenge.id)
+        assert cache.stats()['hits'] == 1
@@ -0,0 +1,81 @@
+import threading
+import pytest
+from extensions import db
+from models import UserChallengeProgress
+from services.challenge_service import ChallengeService
+
+
+def _progress(user, challenge):
+    return UserChallengeProgress.query.filter_by(
+        user_id=user.id, challenge_id=challenge.id
+    ).one()
+
+
+class TestChallengeHints:
+    """Test cases for hint lookup and hint usage tracking."""
+
+    def test_first_hint_creates_progress(self, user, challenge):
+        """Viewing a hint creates an attempted progress row."""
+        service = ChallengeService()
+        assert service.get_hint(user.id, challenge.id, 1) == 'Use print()'
+
+        progress = _progress(user, challenge)
+        assert progress.hints_used == 2
+        assert progress.status == 'attempted'
+        assert progress.attempts == 0
+
+    def test_hints_used_never_decreases(self, user, challenge):
+        """Viewing an earlier hint keeps the higher count."""
+        ChallengeService().get_hint(user.id, challenge.id, 1)
+        ChallengeService().get_hint(user.id, challenge.id, 0)
+
+        assert _progress(user, challenge).hints_used == 2
+
+    def test_repeat_view_skips_write(self, user, challenge):
+        """Hints already unlocked by this worker issue no further writes."""
+        service = ChallengeService()
+        service.get_hint(user.id, challenge.id, 1)
+
+        statements = []
+        engine = db.engine
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.event.listen(engine, 'before_cursor_execute', record)
+        try:
+            assert service.get_hint(user.id, challenge.id, 0) == 'Use input()'
+        finally:
+            db.event.remove(engine, 'before_cursor_execute', record)
+
+        assert not any(s.lstrip().upper().startswith('INSERT') for s in statements)
+
+    def test_concurrent_unlocks_keep_memo_bounded(self, app, user, challenge, monkeypatch):
+        """Request threads sharing one service never corrupt or overgrow the memo."""
+        service = ChallengeService()
+        service.max_tracked_hint_unlocks = 50
+        monkeypatch.setattr(service, '_record_hint_use', lambda *args: None)
+        service.get_hint(user.id, challenge.id, 0)
+        errors = []
+
+        def unlock(offset):
+            try:
+                with app.app_context():
+                    for user_id in range(offset, offset + 200):
+                        service.get_hint(user_id, challenge.id, 1)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=unlock, args=(n * 1000,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(service._hints_unlocked) == 50
+
+    def test_out_of_range_hint(self, user, challenge):
+        """Unknown hint indexes return None without recording progress."""
+        assert ChallengeService().get_hint(user.id, challenge.id, 5) is None
+        assert UserChallengeProgress.query.count() == 0
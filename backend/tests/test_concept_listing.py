@@ -0,0 +1,95 @@
+import pytest
+from extensions import db
+from models import Category, Concept, Tag
+
+
+@pytest.fixture
+def catalog(app):
+    """Create 25 tagged concepts across two categories."""
+    categories = [Category(name='Web'), Category(name='Data')]
+    tags = [Tag(name='python'), Tag(name='sql'), Tag(name='react')]
+    db.session.add_all(categories + tags)
+    for i in range(25):
+        db.session.add(Concept(
+            title=f'Concept {i}',
+            short_description=f'About {i}',
+            content='# Body\n' + 'x' * 2000,
+            category=categories[i % 2],
+            tags=tags[:i % 3 + 1]
+        ))
+    db.session.commit()
+
+
+def _statements(app, client, url, headers):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db.event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        db.event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return response, statements
+
+
+class TestConceptListing:
+    """Test cases for eager loading and sparse fieldsets on GET /api/concepts."""
+
+    def test_query_count_does_not_grow_with_page_size(self, app, client, auth_headers, catalog):
+        """Category and tags load in one query each, not one per concept."""
+        small, small_statements = _statements(app, client, '/api/concepts?per_page=5', auth_headers)
+        large, large_statements = _statements(app, client, '/api/concepts?per_page=25', auth_headers)
+
+        assert len(small.json['concepts']) == 5
+        assert len(large.json['concepts']) == 25
+        assert len(large_statements) == len(small_statements) <= 4
+
+    def test_full_listing_keeps_shape(self, client, auth_headers, catalog):
+        """Without fields= every concept is serialized as before."""
+        response = client.get('/api/concepts?per_page=3', headers=auth_headers)
+        concept = response.json['concepts'][0]
+
+        assert set(concept) == set(Concept.FIELDS)
+        assert concept['category'] in ('Web', 'Data')
+        assert concept['tags']
+        assert response.json['total'] == 25
+
+    def test_summary_view_defers_content(self, app, client, auth_headers, catalog):
+        """The summary view leaves the content column out of the SELECT."""
+        response, statements = _statements(app, client, '/api/concepts?view=summary&per_page=25', auth_headers)
+
+        assert all(set(c) == set(Concept.SUMMARY_FIELDS) for c in response.json['concepts'])
+        # The pagination count wraps the unoptimized query; only the row SELECT matters
+        rows = [s for s in statements if not s.startswith('SELECT count(*)')]
+        assert not any('concepts.content' in statement for statement in rows)
+        assert len(statements) <= 4
+
+    def test_sparse_fieldset(self, app, client, auth_headers, catalog):
+        """fields= returns only the named fields and skips unused relationships."""
+        response, statements = _statements(app, client, '/api/concepts?fields=id,title&per_page=25', auth_headers)
+
+        assert response.json['concepts'][0].keys() == {'id', 'title'}
+        assert not any('concept_tags' in statement or 'FROM categories' in statement for statement in statements)
+
+    def test_tag_filter_with_fields(self, client, auth_headers, catalog):
+        """Filtering by tag still works with a sparse fieldset."""
+        response = client.get('/api/concepts?tag=react&fields=id,tags&per_page=25', headers=auth_headers)
+
+        assert response.json['total'] == 8
+        assert all('react' in c['tags'] for c in response.json['concepts'])
+
+    def test_unknown_field_is_rejected(self, client, auth_headers, catalog):
+        """Unknown field names are a client error."""
+        response = client.get('/api/concepts?fields=id,password', headers=auth_headers)
+
+        assert response.status_code == 400
+        assert 'password' in response.json['error']
+
+    def test_empty_fieldset_is_rejected(self, client, auth_headers, catalog):
+        """fields= naming no field is a client error, not the full listing."""
+        response = client.get('/api/concepts?fields=,', headers=auth_headers)
+
+        assert response.status_code == 400
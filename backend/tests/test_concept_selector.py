@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import insert
+from extensions import db
+from models import Category, Concept
+from services.concept_selector import ConceptPool, ConceptSelector, concept_pool
+
+
+@pytest.fixture
+def pool(app):
+    """Create a small catalog across two categories."""
+    categories = [Category(name='Web'), Category(name='Data')]
+    db.session.add_all(categories)
+    db.session.flush()
+    db.session.add_all([
+        Concept(
+            title=f'Concept {i}',
+            short_description='Short',
+            content='Body',
+            category_id=categories[i % 2].id,
+            difficulty='beginner' if i < 10 else 'advanced'
+        )
+        for i in range(20)
+    ])
+    db.session.commit()
+    return ConceptPool()
+
+
+class TestConceptSelector:
+    """Test cases for in-memory concept sampling."""
+
+    def test_same_seed_same_selection(self, pool):
+        """Seeded selectors are reproducible."""
+        first = ConceptSelector(pool=pool, seed=7).select(5, set())
+        second = ConceptSelector(pool=pool, seed=7).select(5, set())
+        assert first == second
+        assert len(set(first)) == 5
+
+    def test_exclusions_are_respected(self, pool):
+        """Excluded ids are never returned, even when nearly all are excluded."""
+        pool.ensure_fresh()
+        all_ids = set(pool.all_ids)
+        excluded = set(sorted(all_ids)[:18])
+
+        picked = ConceptSelector(pool=pool, seed=1).select(3, excluded)
+        assert set(picked) == all_ids - excluded
+
+    def test_preferred_share(self, pool):
+        """The preferred share comes from the preferred categories."""
+        pool.ensure_fresh()
+        web_id = Category.query.filter_by(name='Web').one().id
+
+        picked = ConceptSelector(pool=pool, seed=3).select(5, set(), {web_id})
+        assert sum(1 for cid in picked if pool.category_of[cid] == web_id) >= 3
+
+    def test_shared_pool_sees_orm_writes(self, pool):
+        """ORM inserts and updates refresh the module-level pool."""
+        concept_pool.ensure_fresh()
+        concept = Concept.query.first()
+        concept.is_active = False
+        added = Concept(title='New', short_description='Short', content='Body',
+                        category_id=concept.category_id)
+        db.session.add(added)
+        db.session.commit()
+
+        candidates = concept_pool.candidates()[0]
+        assert concept.id not in candidates
+        assert added.id in candidates
+
+    def test_shared_pool_sees_bulk_inserts(self, pool):
+        """insert(Concept) statements bypass mapper events but still refresh the pool."""
+        concept_pool.ensure_fresh()
+        category_id = Category.query.first().id
+        new_id = db.session.execute(
+            insert(Concept).returning(Concept.id),
+            [{'title': 'Bulk', 'short_description': 'Short', 'content': 'Body', 'category_id': category_id}]
+        ).scalar_one()
+        db.session.commit()
+
+        assert new_id in concept_pool.candidates()[0]
+
+    def test_difficulty_pool(self, pool):
+        """Difficulty filters restrict the candidates."""
+        arrays = pool.candidates(difficulty='advanced')
+        assert sum(len(arr) for arr in arrays) == 10
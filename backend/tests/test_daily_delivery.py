@@ -0,0 +1,74 @@
+from datetime import timedelta
+import pytest
+from extensions import db
+from models import Category, Concept, DailyContent, Tag
+from services.daily_delivery_service import DailyDeliveryService
+
+
+def _schedule(user, days):
+    """Schedule two tagged concepts per day for `days` days."""
+    service = DailyDeliveryService()
+    today = service.user_today(user.id)
+    categories = [Category(name='Web'), Category(name='Data')]
+    tags = [Tag(name='http'), Tag(name='sql')]
+    for day in range(days):
+        for i in range(2):
+            concept = Concept(
+                title=f'Concept {day}-{i}', short_description='Short', content='# Long body',
+                category=categories[i], tags=[tags[i]]
+            )
+            db.session.add(concept)
+            db.session.flush()
+            db.session.add(DailyContent(
+                user_id=user.id, concept_id=concept.id,
+                scheduled_date=today + timedelta(days=day)
+            ))
+    db.session.commit()
+    return service
+
+
+def _count_queries(fn):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db.event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        db.event.remove(db.engine, 'before_cursor_execute', record)
+    return result, len(statements)
+
+
+class TestUpcomingConcepts:
+    """Test cases for the upcoming schedule view."""
+
+    @pytest.mark.parametrize('days', [2, 6])
+    def test_query_count_is_constant(self, user, days):
+        """The window size does not change the number of queries."""
+        service = _schedule(user, days)
+        user_id = user.id
+        db.session.expire_all()
+
+        upcoming, queries = _count_queries(lambda: service.get_upcoming_concepts(user_id, days))
+
+        assert len(upcoming) == days
+        assert queries == 5  # user timezone, schedule, concepts, categories, tags
+
+    def test_summary_omits_body(self, user):
+        """Summaries carry the listing fields but not the content."""
+        service = _schedule(user, 1)
+        upcoming = service.get_upcoming_concepts(user.id, 1)
+
+        concept = next(iter(upcoming.values()))[0]['concept']
+        assert 'content' not in concept
+        assert concept['category'] in ('Web', 'Data')
+        assert concept['tags'] in (['http'], ['sql'])
+
+    def test_full_view_includes_body(self, user):
+        """The full view keeps the complete concept."""
+        service = _schedule(user, 1)
+        upcoming = service.get_upcoming_concepts(user.id, 1, summary=False)
+
+        assert next(iter(upcoming.values()))[0]['concept']['content'] == '# Long body'
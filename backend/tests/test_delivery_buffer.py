@@ -0,0 +1,180 @@
+import threading
+from datetime import date, datetime, timedelta
+import pytest
+from app import create_app
+from extensions import db
+from models import Category, Concept, DailyContent, Tag
+from services.daily_delivery_service import DailyDeliveryService
+from services.delivery_buffer import DeliveryBuffer, delivery_buffer
+from services.news_jobs import news_jobs
+
+
+@pytest.fixture
+def todays_content(user):
+    """Schedule three tagged concepts for the user today."""
+    category = Category(name='Web')
+    tags = [Tag(name='http'), Tag(name='caching')]
+    concepts = [
+        Concept(title=f'Concept {i}', short_description='Short', content='Body',
+                category=category, tags=tags)
+        for i in range(3)
+    ]
+    db.session.add_all(concepts)
+    db.session.flush()
+    today = date.today()
+    rows = [DailyContent(user_id=user.id, concept_id=c.id, scheduled_date=today) for c in concepts]
+    db.session.add_all(rows)
+    db.session.commit()
+    return today, [row.id for row in rows]
+
+
+def _statements(fn):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db.event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        db.event.remove(db.engine, 'before_cursor_execute', record)
+    return result, statements
+
+
+class TestTodayReadPath:
+    """Test cases for the read-only today endpoint."""
+
+    def test_single_query_and_no_writes(self, user, todays_content):
+        """Today's concepts load in one SELECT and are only buffered as delivered."""
+        today, ids = todays_content
+        service = DailyDeliveryService()
+        service.delivery_buffer = DeliveryBuffer()
+        user_id = user.id
+        db.session.expire_all()
+
+        concepts, statements = _statements(lambda: service.get_today_concepts(user_id, today))
+
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith('SELECT')
+        assert [c['id'] for c in concepts] == ids
+        assert all(c['is_delivered'] and c['delivered_at'] for c in concepts)
+        assert sorted(concepts[0]['concept']['tags']) == ['caching', 'http']
+        assert service.delivery_buffer.pending_count() == 3
+        assert DailyContent.query.filter_by(is_delivered=True).count() == 0
+
+
+class TestDeliveryBuffer:
+    """Test cases for batched delivery acknowledgements."""
+
+    def test_flush_marks_rows_in_batches(self, user, todays_content):
+        """Buffered acks are written with one UPDATE per batch."""
+        _, ids = todays_content
+        buffer = DeliveryBuffer(batch_size=2)
+        buffer.ack(ids)
+
+        updated, statements = _statements(buffer.flush)
+
+        assert updated == 3
+        assert len([s for s in statements if s.lstrip().upper().startswith('UPDATE')]) == 2
+        assert buffer.pending_count() == 0
+        assert DailyContent.query.filter_by(is_delivered=True).count() == 3
+
+    def test_keeps_first_delivery_time(self, user, todays_content):
+        """Rows already delivered keep their original timestamp."""
+        _, ids = todays_content
+        first = datetime(2024, 1, 1, 9, 0)
+        row = db.session.get(DailyContent, ids[0])
+        row.is_delivered = True
+        row.delivered_at = first
+        db.session.commit()
+
+        buffer = DeliveryBuffer()
+        buffer.ack(ids, at=first + timedelta(days=1))
+        buffer.ack(ids[1:], at=first + timedelta(days=2))
+
+        assert buffer.flush() == 2
+        db.session.expire_all()
+        assert db.session.get(DailyContent, ids[0]).delivered_at == first
+        assert db.session.get(DailyContent, ids[1]).delivered_at == first + timedelta(days=1)
+
+    def test_rows_keep_their_own_ack_time(self, user, todays_content):
+        """Acks at different times share one batched UPDATE yet keep their own time."""
+        _, ids = todays_content
+        first = datetime(2024, 1, 1, 9, 0)
+        buffer = DeliveryBuffer()
+        buffer.ack(ids[:1], at=first)
+        buffer.ack(ids[1:], at=first + timedelta(hours=3))
+
+        updated, statements = _statements(buffer.flush)
+
+        assert updated == 3
+        assert len([s for s in statements if s.lstrip().upper().startswith('UPDATE')]) == 1
+        db.session.expire_all()
+        assert db.session.get(DailyContent, ids[0]).delivered_at == first
+        assert [db.session.get(DailyContent, dc_id).delivered_at for dc_id in ids[1:]] == [
+            first + timedelta(hours=3)
+        ] * 2
+
+    def test_overflow_wakes_the_flusher(self, app, user, todays_content):
+        """Reaching max_pending signals a running flusher instead of waiting out its interval."""
+        _, ids = todays_content
+        buffer = DeliveryBuffer()
+        buffer.init_app(app)
+        buffer.max_pending = 2
+        buffer.flush_interval = 60
+        buffer.enabled = True
+        buffer.start()
+        try:
+            buffer.ack(ids)
+            for _ in range(100):
+                if buffer.pending_count() == 0:
+                    break
+                threading.Event().wait(0.05)
+            flushed_early = buffer.pending_count() == 0
+        finally:
+            buffer.stop()
+
+        assert flushed_early
+        assert DailyContent.query.filter_by(is_delivered=True).count() == 3
+
+    def test_overflow_without_flusher_uses_own_session(self, app, user, todays_content):
+        """With no flusher thread, a full buffer is written in a separate app context."""
+        _, ids = todays_content
+        buffer = DeliveryBuffer()
+        buffer.init_app(app)
+        buffer.max_pending = 2
+        request_session = db.session()
+
+        buffer.ack(ids)
+
+        assert buffer.pending_count() == 0
+        assert db.session() is request_session
+        assert DailyContent.query.filter_by(is_delivered=True).count() == 3
+
+
+class TestBackgroundWorkers:
+    """Test cases for when per-process background threads start."""
+
+    def test_threads_start_with_first_request_only(self, monkeypatch):
+        """Building an app starts nothing; the first request starts the workers."""
+        monkeypatch.setattr('config.TestingConfig.DELIVERY_FLUSHER_ENABLED', True)
+        monkeypatch.setattr('config.TestingConfig.NEWS_BACKGROUND_JOBS', True)
+        app = create_app('testing')
+        names = {thread.name for thread in threading.enumerate()}
+        assert 'delivery-flusher' not in names and 'news-jobs' not in names
+        try:
+            app.test_client().get('/api/health')
+            names = {thread.name for thread in threading.enumerate()}
+            assert 'delivery-flusher' in names and 'news-jobs' in names
+        finally:
+            delivery_buffer.stop()
+            news_jobs.stop()
+
+    def test_disabled_app_never_starts_threads(self, monkeypatch):
+        """Apps built with background_workers=False (shards, scripts) stay single-threaded."""
+        monkeypatch.setattr('config.TestingConfig.NEWS_BACKGROUND_JOBS', True)
+        app = create_app('testing', background_workers=False)
+        app.test_client().get('/api/health')
+
+        assert 'news-jobs' not in {thread.name for thread in threading.enumerate()}
@@ -0,0 +1,100 @@
+import random
+from extensions import db
+from models import Category, Concept, UserProgress, UserStats
+from services.daily_delivery_service import DailyDeliveryService
+from services.learning_stats import LearningStats
+
+
+def _concepts(concept, count):
+    others = [
+        Concept(title=f'C{i}', short_description='s', content='c', category=Category(name=f'Cat{i}'))
+        for i in range(count)
+    ]
+    db.session.add_all(others)
+    db.session.commit()
+    return [concept] + others
+
+
+def _statements(fn):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db.event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        db.event.remove(db.engine, 'before_cursor_execute', record)
+    return result, statements
+
+
+class TestLearningStats:
+    """Test cases for the materialized learning stats snapshot."""
+
+    def test_transitions_update_snapshot(self, user, concept):
+        """Start, complete and skip keep the counts in step with progress rows."""
+        concepts = _concepts(concept, 2)
+        service = DailyDeliveryService()
+        service.mark_concept_started(user.id, concepts[0].id)
+        service.mark_concept_started(user.id, concepts[1].id)
+        service.mark_concept_completed(user.id, concepts[0].id, rating=4)
+        service.mark_concept_completed(user.id, concepts[0].id, rating=2)
+        service.skip_concept(user.id, concepts[2].id)
+
+        stats = service.get_user_statistics(user.id)
+
+        assert stats['completed_concepts'] == 1
+        assert stats['in_progress_concepts'] == 1
+        assert stats['average_rating'] == 2.0
+        assert stats['categories_learned'] == [{'category': 'Algorithms', 'count': 1}]
+        stats_store = LearningStats()
+        assert stats_store.stored(user.id) == stats_store.recompute(user.id)
+
+    def test_served_with_one_query(self, user, concept):
+        """Reading the stats is a single lookup."""
+        service = DailyDeliveryService()
+        service.mark_concept_completed(user.id, concept.id, rating=5)
+        user_id = user.id
+        db.session.expire_all()
+
+        stats, statements = _statements(lambda: service.get_user_statistics(user_id))
+
+        assert len(statements) == 1
+        assert stats['completed_concepts'] == 1
+        assert stats['learning_streak'] == 1
+
+    def test_consistency_checker_repairs_drift(self, user, concept):
+        """Progress written behind the writer's back is detected and rebuilt."""
+        concepts = _concepts(concept, 1)
+        service = DailyDeliveryService()
+        service.mark_concept_completed(user.id, concepts[0].id)
+        db.session.add(UserProgress(user_id=user.id, concept_id=concepts[1].id, status='completed', rating=3))
+        db.session.commit()
+
+        stats_store = LearningStats()
+        result = stats_store.check_consistency(sample_size=10, rng=random.Random(0))
+
+        assert result['mismatched'] == 1 and result['repaired'] == 1
+        assert db.session.get(UserStats, user.id).completed_count == 2
+        assert stats_store.check_consistency(sample_size=None)['mismatched'] == 0
+
+    def test_backfill_builds_missing_snapshots(self, user, concept):
+        """Users with progress from before the snapshot tables get their stats."""
+        concepts = _concepts(concept, 2)
+        db.session.add_all([
+            UserProgress(user_id=user.id, concept_id=concepts[0].id, status='completed', rating=4),
+            UserProgress(user_id=user.id, concept_id=concepts[1].id, status='completed'),
+            UserProgress(user_id=user.id, concept_id=concepts[2].id, status='in_progress', rating=2)
+        ])
+        db.session.commit()
+        assert db.session.get(UserStats, user.id) is None
+
+        stats_store = LearningStats()
+        assert stats_store.backfill(chunk_size=1) == {'users_processed': 1}
+
+        stats = DailyDeliveryService().get_user_statistics(user.id)
+        assert stats['completed_concepts'] == 2
+        assert stats['in_progress_concepts'] == 1
+        assert stats['average_rating'] == 3.0
+        assert stats_store.stored(user.id) == stats_store.recompute(user.id)
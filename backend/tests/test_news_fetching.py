@@ -0,0 +1,234 @@
+import time
+from datetime import datetime, timedelta
+from extensions import db
+from models import NewsArticle, NewsTopicWatermark
+from services.news_service import NewsAPIService
+from utils.http import ResponseCache
+from tests.newsapi_stub import NewsAPIStub
+
+TOPICS = ['ai', 'web', 'cloud', 'security', 'blockchain', 'data', 'DevOps', 'mobile']
+
+
+def _service(stub, **kwargs):
+    options = {'max_workers': 8, 'max_per_host': 8, 'retries': 3, 'cache_seconds': 0,
+               'daily_quota': 0, 'rate_per_second': 0}
+    options.update(kwargs)
+    return NewsAPIService(api_key='test', base_url=stub.base_url, **options)
+
+
+class TestConcurrentFetching:
+    """Test cases for pooled, concurrent NewsAPI fetching."""
+
+    def test_topics_fetched_concurrently(self):
+        """Eight slow topics take about one request's latency, not eight."""
+        with NewsAPIStub(latency=0.3) as stub:
+            service = _service(stub)
+            start = time.perf_counter()
+            results = service.fetch_topics(TOPICS)
+            elapsed = time.perf_counter() - start
+
+        assert list(results) == TOPICS
+        assert all(len(articles) == 5 for articles in results.values())
+        assert stub.peak_in_flight > 1
+        assert elapsed < 0.3 * len(TOPICS) / 2
+
+    def test_per_host_limit(self):
+        """No more than max_per_host requests are in flight at once."""
+        with NewsAPIStub(latency=0.05) as stub:
+            _service(stub, max_per_host=2).fetch_topics(TOPICS)
+
+        assert stub.peak_in_flight <= 2
+        assert stub.request_count == len(TOPICS)
+
+    def test_connections_are_reused(self):
+        """A second round reuses the pooled keep-alive connections."""
+        with NewsAPIStub() as stub:
+            service = _service(stub, max_workers=2, max_per_host=2)
+            service.fetch_topics(TOPICS)
+            service.fetch_topics(TOPICS)
+
+        assert stub.request_count == 2 * len(TOPICS)
+        assert len(stub.connections) <= 2
+
+    def test_retries_rate_limits_and_server_errors(self):
+        """429 and 5xx responses are retried until the topic succeeds."""
+        with NewsAPIStub(failures={'DevOps': [503, 429]}) as stub:
+            articles = _service(stub).fetch_tech_news(query='DevOps')
+
+        assert len(articles) == 5
+        assert stub.hits['DevOps'] == 3
+
+    def test_gives_up_after_retries(self):
+        """A topic that keeps failing yields no articles."""
+        with NewsAPIStub(failures={'ai': [500] * 5}) as stub:
+            assert _service(stub, retries=1).fetch_tech_news(query='ai') == []
+        assert stub.hits['ai'] == 2
+
+    def test_daily_processing_saves_all_topics(self, app):
+        """The daily job stores every topic's articles."""
+        with NewsAPIStub() as stub:
+            results = _service(stub).fetch_and_process_daily()
+
+        assert results['fetched'] == 40
+        assert results['saved'] == 40
+        assert NewsArticle.query.count() == 40
+
+
+class TestIncrementalFetching:
+    """Test cases for watermark-based incremental news ingestion."""
+
+    def test_first_run_stores_watermarks(self, app):
+        """After a run each topic's watermark is its newest article."""
+        with NewsAPIStub() as stub:
+            _service(stub).fetch_and_process_daily()
+
+        marks = {row.topic: row.latest_published_at for row in NewsTopicWatermark.query.all()}
+        assert len(marks) == 8
+        assert set(marks.values()) == {stub.published_base + timedelta(hours=4)}
+
+    def test_next_run_fetches_only_newer_articles(self, app):
+        """A later run asks from the watermark and keeps only newer articles."""
+        with NewsAPIStub() as stub:
+            service = _service(stub)
+            service.fetch_and_process_daily()
+            stub.articles_per_query = 7
+            stub.requests.clear()
+            results = service.fetch_and_process_daily()
+
+        assert results['fetched'] == 16
+        assert results['saved'] == 16
+        watermark = (stub.published_base + timedelta(hours=4)).strftime('%Y-%m-%dT%H:%M:%S')
+        assert {params['from'] for params in stub.requests} == {watermark}
+
+    def test_pages_until_watermark(self):
+        """Pagination continues until a page reaches the watermark."""
+        with NewsAPIStub(articles_per_query=25) as stub:
+            since = stub.published_base + timedelta(hours=2)
+            articles, complete = _service(stub).fetch_new_articles('ai', since=since, page_size=10)
+
+        assert complete
+        assert len(articles) == 22
+        assert stub.hits['ai'] == 3
+
+    def test_max_pages_caps_requests(self):
+        """No more than max_pages pages are requested per topic."""
+        with NewsAPIStub(articles_per_query=50) as stub:
+            articles, complete = _service(stub, max_pages=2).fetch_new_articles('ai', page_size=10)
+
+        assert complete
+        assert len(articles) == 20
+        assert stub.hits['ai'] == 2
+
+    def test_failed_topic_keeps_its_watermark(self, app):
+        """A topic whose fetch failed is retried from its old watermark."""
+        old = datetime(2024, 1, 1)
+        with NewsAPIStub(failures={'DevOps': [500] * 5}) as stub:
+            service = _service(stub, retries=0)
+            service.advance_watermarks({'DevOps': [{'publishedAt': '2024-01-01T00:00:00Z'}]})
+            service.fetch_and_process_daily()
+
+        marks = {row.topic: row.latest_published_at for row in NewsTopicWatermark.query.all()}
+        assert marks['DevOps'] == old
+        assert marks['cloud computing'] == stub.published_base + timedelta(hours=4)
+
+    def test_watermarks_never_move_backwards(self, app):
+        """Advancing with older articles leaves the watermark alone."""
+        service = NewsAPIService(api_key='test')
+        service.advance_watermarks({'ai': [{'publishedAt': '2024-03-01T00:00:00Z'}]})
+        service.advance_watermarks({'ai': [{'publishedAt': '2024-02-01T00:00:00Z'}]})
+
+        assert db.session.get(NewsTopicWatermark, 'ai').latest_published_at == datetime(2024, 3, 1)
+
+
+class TestResponseCache:
+    """Test cases for the NewsAPI response cache."""
+
+    def test_repeat_request_is_served_from_cache(self):
+        """The same parameters within the cache window hit the API once."""
+        with NewsAPIStub() as stub:
+            service = _service(stub, cache_seconds=60)
+            first = service.fetch_tech_news(query='ai')
+            second = service.fetch_tech_news(query='ai')
+            service.fetch_tech_news(query='web')
+
+        assert first == second
+        assert stub.hits == {'ai': 1, 'web': 1}
+
+    def test_expired_entries_are_refetched(self):
+        """Entries older than the cache window are requested again."""
+        with NewsAPIStub() as stub:
+            service = _service(stub, cache_seconds=0.05)
+            service.fetch_tech_news(query='ai')
+            time.sleep(0.1)
+            service.fetch_tech_news(query='ai')
+
+        assert stub.hits['ai'] == 2
+
+    def test_disk_cache_is_shared_between_services(self, tmp_path):
+        """A cache directory serves responses to a second process."""
+        with NewsAPIStub() as stub:
+            _service(stub, cache_seconds=60, cache_dir=str(tmp_path)).fetch_tech_news(query='ai')
+            articles = _service(stub, cache_seconds=60, cache_dir=str(tmp_path)).fetch_tech_news(query='ai')
+
+        assert len(articles) == 5
+        assert stub.hits['ai'] == 1
+
+    def test_expired_and_excess_entries_are_evicted(self, tmp_path):
+        """The cache drops expired entries and files and never exceeds max_entries."""
+        cache = ResponseCache(ttl=0.5, directory=str(tmp_path), max_entries=2)
+        cache.set('https://api/x', {'q': 'old'}, {'n': 0})
+        time.sleep(0.6)
+        for n in range(3):
+            cache.set('https://api/x', {'q': n}, {'n': n})
+
+        assert len(cache) == 2
+        assert cache.get('https://api/x', {'q': 2}) == {'n': 2}
+        assert cache.get('https://api/x', {'q': 'old'}) is None
+        assert not (tmp_path / f"{cache.key('https://api/x', {'q': 'old'})}.json").exists()
+
+    def test_errors_are_not_cached(self):
+        """A failed request is retried on the next call."""
+        with NewsAPIStub(failures={'ai': [500, 500]}) as stub:
+            service = _service(stub, retries=1, cache_seconds=60)
+            assert service.fetch_tech_news(query='ai') == []
+            assert len(service.fetch_tech_news(query='ai')) == 5
+
+
+class TestSaveArticles:
+    """Test cases for bulk article inserts."""
+
+    def _articles(self, *urls):
+        return [
+            {'url': url, 'title': f'Title {i}', 'source': {'name': 'Wire'},
+             'author': 'A' * 300, 'publishedAt': '2024-01-02T10:00:00Z'}
+            for i, url in enumerate(urls)
+        ]
+
+    def test_duplicates_in_batch_and_table_are_skipped(self, app):
+        """Repeated URLs are stored once and counted accurately."""
+        service = NewsAPIService(api_key='test')
+        assert service.save_articles(self._articles('https://a', 'https://b', 'https://a')) == 2
+        assert service.save_articles(self._articles('https://b', 'https://c', None)) == 1
+        assert NewsArticle.query.count() == 3
+        assert len(NewsArticle.query.filter_by(url='https://a').one().author) == 100
+
+    def test_single_insert_per_chunk(self, app):
+        """No per-article lookups: one INSERT per chunk, then one duplicate lookup and band insert."""
+        from extensions import db
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        service = NewsAPIService(api_key='test')
+        articles = self._articles(*[f'https://news/{i}' for i in range(5)])
+        db.event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            ids = service.insert_articles(articles, chunk_size=2)
+        finally:
+            db.event.remove(db.engine, 'before_cursor_execute', record)
+
+        article_inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT INTO NEWS_ARTICLES ')]
+        assert len(ids) == 5
+        assert len(article_inserts) == 3
+        assert len(statements) == 5
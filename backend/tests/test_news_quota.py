@@ -0,0 +1,253 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from extensions import db
+from models import ApiQuotaUsage, NewsFetchJob, User
+from services.api_quota import QuotaTracker
+from services.news_jobs import NewsJobQueue
+from services.news_service import NewsAPIService
+from tests.newsapi_stub import NewsAPIStub
+from utils.http import RequestCoalescer, TokenBucket
+
+
+def _service(stub, **kwargs):
+    options = {'max_workers': 4, 'max_per_host': 4, 'retries': 0, 'cache_seconds': 0,
+               'daily_quota': 0, 'rate_per_second': 0}
+    options.update(kwargs)
+    return NewsAPIService(api_key='test', base_url=stub.base_url, **options)
+
+
+class TestTokenBucket:
+    """Test cases for the token-bucket rate limiter."""
+
+    def test_burst_then_rate(self):
+        """A full bucket allows a burst, then tokens arrive at the rate."""
+        bucket = TokenBucket(rate=20, capacity=3)
+        start = time.perf_counter()
+        for _ in range(5):
+            assert bucket.acquire()
+        elapsed = time.perf_counter() - start
+
+        assert 0.08 <= elapsed < 0.5
+
+    def test_timeout(self):
+        """Acquire gives up once the timeout passes."""
+        bucket = TokenBucket(rate=1, capacity=1)
+        assert bucket.acquire(timeout=0)
+        assert not bucket.acquire(timeout=0.05)
+
+    def test_zero_rate_is_unlimited(self):
+        """A rate of 0 never blocks."""
+        bucket = TokenBucket(rate=0)
+        assert all(bucket.acquire(timeout=0) for _ in range(1000))
+
+
+class TestRequestCoalescing:
+    """Test cases for sharing identical in-flight requests."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Callers with the same key wait for the leader's result."""
+        coalescer = RequestCoalescer()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'result'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(coalescer.run('k', slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['result'] * 5
+        assert len(calls) == 1
+
+    def test_identical_fetches_hit_upstream_once(self):
+        """Concurrent identical NewsAPI fetches make one upstream request."""
+        with NewsAPIStub(latency=0.3) as stub:
+            service = _service(stub)
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(service.fetch_tech_news(query='ai')))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert [len(r) for r in results] == [5] * 4
+        assert stub.hits['ai'] == 1
+
+
+class TestQuotaTracker:
+    """Test cases for the persisted daily quota."""
+
+    def test_fetches_stop_at_the_daily_quota(self, app):
+        """Requests beyond the quota are not sent upstream."""
+        with NewsAPIStub() as stub:
+            service = _service(stub, daily_quota=3)
+            results = [service.fetch_tech_news(query=f'topic {i}') for i in range(5)]
+
+        assert [len(r) for r in results] == [5, 5, 5, 0, 0]
+        assert stub.request_count == 3
+        assert service.quota.used_today() == 3
+
+    def test_retries_are_charged_to_quota_and_limiter(self, app):
+        """Each retry after a 429 or 5xx spends its own quota unit and rate token."""
+        with NewsAPIStub(failures={'ai': [429, 503]}) as stub:
+            service = _service(stub, retries=3, daily_quota=10, rate_per_second=0.01, rate_burst=10)
+            articles = service.fetch_tech_news(query='ai')
+
+        assert len(articles) == 5
+        assert stub.request_count == 3
+        assert service.quota.used_today() == 3
+        assert 6.9 < service.rate_limiter._tokens < 7.1
+
+    def test_unused_lease_is_returned(self, app):
+        """Leasing reserves requests and releasing returns what was not spent."""
+        tracker = QuotaTracker('newsapi', daily_limit=10)
+        allowance = tracker.lease(8)
+        assert allowance.granted == 8
+        assert tracker.lease(5).granted == 2
+
+        assert allowance.take() and allowance.take()
+        tracker.release(allowance)
+        assert tracker.used_today() == 4
+
+    def test_cached_responses_are_free(self, app):
+        """Answers from the response cache do not count against the quota."""
+        with NewsAPIStub() as stub:
+            service = _service(stub, daily_quota=5, cache_seconds=60)
+            for _ in range(3):
+                service.fetch_tech_news(query='ai')
+
+        assert db.session.query(ApiQuotaUsage.used).scalar() == 1
+
+    def test_concurrent_topics_share_a_lease(self, app):
+        """fetch_topics leases for all topics and spends from worker threads."""
+        with NewsAPIStub() as stub:
+            service = _service(stub, daily_quota=3)
+            results = service.fetch_topics(['a', 'b', 'c', 'd'])
+
+        assert sorted(len(r) for r in results.values()) == [0, 5, 5, 5]
+        assert service.quota.used_today() == 3
+
+
+class TestNewsJobs:
+    """Test cases for queued news jobs and endpoints."""
+
+    def test_fetch_endpoint_returns_job(self, client, auth_headers):
+        """POST /news/fetch answers 202 with a job that can be polled."""
+        with NewsAPIStub() as stub:
+            from services.news_jobs import news_jobs
+            news_jobs.service = _service(stub)
+            try:
+                response = client.post('/api/concepts/news/fetch', json={'query': 'ai'}, headers=auth_headers)
+            finally:
+                news_jobs.service = None
+
+        assert response.status_code == 202
+        job_id = response.json['job']['id']
+        status = client.get(f'/api/concepts/news/jobs/{job_id}', headers=auth_headers)
+        assert status.json['job']['status'] == 'completed'
+        assert status.json['job']['result'] == {'fetched': 5, 'saved': 5}
+
+    def test_identical_pending_jobs_are_coalesced(self, app):
+        """Submitting the same work while it is queued returns the same job."""
+        jobs = NewsJobQueue(max_queued=2)
+        jobs.background = True  # queue without a worker thread
+
+        first = jobs.submit('fetch', {'query': 'ai'})
+        assert jobs.submit('fetch', {'query': 'ai'}).id == first.id
+        assert jobs.submit('fetch', {'query': 'web'}).id != first.id
+        assert jobs.pending_count() == 2
+
+    def test_full_queue_rejects_jobs(self, app):
+        """Once max_queued jobs wait, new work is refused."""
+        jobs = NewsJobQueue(max_queued=1)
+        jobs.background = True
+
+        assert jobs.submit('daily') is not None
+        assert jobs.submit('fetch', {'query': 'ai'}) is None
+        assert NewsFetchJob.query.count() == 1
+
+    def test_jobs_queued_by_another_process_are_claimed(self, app):
+        """Queued rows live in the table, so any worker runs them."""
+        with NewsAPIStub() as stub:
+            submitter = NewsJobQueue()
+            submitter.background = True  # its process dies before running the job
+            job = submitter.submit('fetch', {'query': 'ai'})
+
+            worker = NewsJobQueue(service=_service(stub))
+            assert worker.claim_next() == job.id
+            assert worker.claim_next() is None
+
+        db.session.expire_all()
+        assert db.session.get(NewsFetchJob, job.id).status == 'completed'
+
+    def test_stale_running_jobs_fail_and_stop_coalescing(self, app):
+        """A job left running by a dead worker is failed and no longer absorbs new requests."""
+        jobs = NewsJobQueue(stale_seconds=60)
+        jobs.background = True
+        stale = jobs.submit('fetch', {'query': 'ai'})
+        stale.status = 'running'
+        stale.started_at = datetime.utcnow() - timedelta(minutes=5)
+        db.session.commit()
+
+        fresh = jobs.submit('fetch', {'query': 'ai'})
+        assert fresh.id != stale.id
+        assert jobs.fail_stale() == 1
+        db.session.expire_all()
+        assert db.session.get(NewsFetchJob, stale.id).status == 'failed'
+
+    def test_jobs_are_private_to_their_requester(self, client, auth_headers):
+        """Another user's job is reported as not found."""
+        jobs = NewsJobQueue()
+        jobs.background = True
+        other = User(username='other', email='other@example.com', password='TestPass123')
+        db.session.add(other)
+        db.session.commit()
+        job = jobs.submit('daily', user_id=other.id)
+
+        response = client.get(f'/api/concepts/news/jobs/{job.id}', headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_users_submitting_the_same_job_can_each_poll_it(self, client, auth_headers):
+        """Identical requests from two users are not coalesced across them."""
+        jobs = NewsJobQueue()
+        jobs.background = True
+        other = User(username='other', email='other@example.com', password='TestPass123')
+        db.session.add(other)
+        db.session.commit()
+        me = User.query.filter_by(username='testuser').one()
+
+        theirs = jobs.submit('fetch', {'query': 'ai'}, user_id=other.id)
+        mine = jobs.submit('fetch', {'query': 'ai'}, user_id=me.id)
+
+        assert mine.id != theirs.id
+        assert jobs.submit('fetch', {'query': 'ai'}, user_id=me.id).id == mine.id
+        response = client.get(f'/api/concepts/news/jobs/{mine.id}', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json['job']['status'] == 'queued'
+
+    def test_worker_runs_queued_jobs(self, app):
+        """The background worker completes queued jobs in its own app context."""
+        with NewsAPIStub() as stub:
+            jobs = NewsJobQueue(service=_service(stub))
+            jobs.init_app(app)
+            jobs.background = True
+            job = jobs.submit('fetch', {'query': 'ai'})
+            jobs.start()
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                db.session.expire_all()
+                if db.session.get(NewsFetchJob, job.id).status == 'completed':
+                    break
+                time.sleep(0.05)
+            jobs.stop()
+
+        assert db.session.get(NewsFetchJob, job.id).result == {'fetched': 5, 'saved': 5}
@@ -0,0 +1,82 @@
+from extensions import db
+from models import ChallengeSubmission, UserProgress, UserChallengeProgress
+from services.progress_writer import ProgressWriter
+
+
+def _submission(user, challenge, status, points=0):
+    submission = ChallengeSubmission(
+        user_id=user.id,
+        challenge_id=challenge.id,
+        code='print(input())',
+        status=status,
+        points_earned=points
+    )
+    db.session.add(submission)
+    db.session.commit()
+    return submission
+
+
+class TestProgressWriter:
+    """Test cases for upsert-based progress transitions."""
+
+    def test_start_then_complete_concept(self, user, concept):
+        """Starting then completing updates one row."""
+        writer = ProgressWriter()
+        started = writer.start_concept(user.id, concept.id)
+        db.session.commit()
+        assert started.status == 'in_progress'
+        started_at = started.started_at
+
+        completed = writer.complete_concept(user.id, concept.id, rating=4, notes='Nice')
+        db.session.commit()
+
+        assert completed.status == 'completed'
+        assert completed.started_at == started_at
+        assert completed.rating == 4
+        assert UserProgress.query.count() == 1
+
+    def test_start_does_not_reopen_completed(self, user, concept):
+        """Starting a completed concept leaves it completed."""
+        writer = ProgressWriter()
+        writer.complete_concept(user.id, concept.id, rating=5)
+        progress = writer.start_concept(user.id, concept.id)
+        db.session.commit()
+
+        assert progress.status == 'completed'
+        assert progress.rating == 5
+
+    def test_complete_keeps_previous_rating(self, user, concept):
+        """Completing again without a rating keeps the old one."""
+        writer = ProgressWriter()
+        writer.complete_concept(user.id, concept.id, rating=3, notes='First pass')
+        progress = writer.complete_concept(user.id, concept.id)
+        db.session.commit()
+
+        assert progress.rating == 3
+        assert progress.notes == 'First pass'
+
+    def test_challenge_attempts(self, user, challenge):
+        """Failed then passed attempts are counted and solve once."""
+        writer = ProgressWriter()
+        failed = _submission(user, challenge, 'failed')
+        writer.record_challenge_attempt(user.id, challenge.id, failed)
+        db.session.commit()
+
+        passed = _submission(user, challenge, 'passed', points=15)
+        progress = writer.record_challenge_attempt(user.id, challenge.id, passed)
+        db.session.commit()
+        first_solved_at = progress.first_solved_at
+
+        assert progress.status == 'solved'
+        assert progress.attempts == 2
+        assert progress.best_submission_id == passed.id
+
+        retry = _submission(user, challenge, 'failed')
+        progress = writer.record_challenge_attempt(user.id, challenge.id, retry)
+        db.session.commit()
+
+        assert progress.status == 'solved'
+        assert progress.attempts == 3
+        assert progress.first_solved_at == first_solved_at
+        assert progress.best_submission_id == passed.id
+        assert UserChallengeProgress.query.count() == 1
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from extensions import db
+from models import ReviewState, UserProgress
+from services.daily_delivery_service import DailyDeliveryService
+from services.review_scheduler import ReviewScheduler, sm2_step
+
+
+class TestSm2:
+    """Test cases for the SM-2 step function."""
+
+    def test_successful_reviews_grow_interval(self):
+        """Good recalls go 1, 6, then interval times ease days."""
+        state = (2.5, 0, 0)
+        intervals = []
+        for _ in range(3):
+            ease, interval, reps, lapsed = sm2_step(*state, quality=4)
+            assert not lapsed
+            state = (ease, interval, reps)
+            intervals.append(interval)
+        assert intervals == [1, 6, 15]
+
+    def test_failed_recall_resets(self):
+        """A grade below 3 restarts the repetitions and lowers the ease."""
+        ease, interval, reps, lapsed = sm2_step(2.5, 15, 3, quality=1)
+        assert (interval, reps, lapsed) == (1, 0, True)
+        assert ease < 2.5
+
+    def test_ease_has_a_floor(self):
+        """Ease never drops below 1.3."""
+        assert sm2_step(1.3, 1, 0, quality=0)[0] == 1.3
+
+
+class TestReviewScheduler:
+    """Test cases for review state storage and the due queue."""
+
+    def test_completion_enrolls_and_surfaces_tomorrow(self, user, concept):
+        """A completed concept becomes a due review the next day."""
+        service = DailyDeliveryService()
+        service.mark_concept_completed(user.id, concept.id)
+        today = service.user_today(user.id)
+
+        assert service.get_due_reviews(user.id, today) == []
+        reviews = service.get_due_reviews(user.id, today + timedelta(days=1))
+        assert [r['concept_id'] for r in reviews] == [concept.id]
+        assert reviews[0]['concept']['title'] == 'Binary Search'
+
+    def test_record_review_moves_due_time(self, user, concept):
+        """Grading a review pushes the next one out by the new interval."""
+        db.session.add(UserProgress(user_id=user.id, concept_id=concept.id, status='completed'))
+        scheduler = ReviewScheduler()
+        now = datetime(2024, 1, 1, 12, 0)
+        scheduler.enroll(user.id, concept.id, now)
+        scheduler.record_review(user.id, concept.id, 5, now)
+        state = scheduler.record_review(user.id, concept.id, 5, now + timedelta(days=1))
+        db.session.commit()
+
+        assert state.repetitions == 2
+        assert state.due_at == now + timedelta(days=7)
+        assert scheduler.due_reviews(user.id, now + timedelta(days=6)) == []
+        assert len(scheduler.due_reviews(user.id, now + timedelta(days=8))) == 1
+
+    def test_due_queue_is_ordered_and_limited(self, user, concept):
+        """The most overdue reviews come first, up to the limit."""
+        from models import Concept
+        others = [
+            Concept(title=f'C{i}', short_description='s', content='c', category_id=concept.category_id)
+            for i in range(3)
+        ]
+        db.session.add_all(others)
+        db.session.commit()
+        scheduler = ReviewScheduler()
+        base = datetime(2024, 1, 1)
+        for offset, c in enumerate([concept] + others):
+            scheduler.enroll(user.id, c.id, base - timedelta(days=offset))
+        db.session.commit()
+
+        due = scheduler.due_reviews(user.id, base + timedelta(days=2), limit=2)
+        assert [s.concept_id for s in due] == [others[2].id, others[1].id]
+
+    def test_backfill_enrolls_like_completion(self, user, concept):
+        """Earlier completions are enrolled, due one interval after the backfill."""
+        db.session.add(UserProgress(user_id=user.id, concept_id=concept.id, status='completed'))
+        db.session.commit()
+
+        scheduler = ReviewScheduler()
+        now = datetime(2024, 1, 1, 12, 0)
+        assert scheduler.backfill(now) == {'enrolled': 1}
+        assert scheduler.backfill(now) == {'enrolled': 0}
+        assert ReviewState.query.one().due_at == now + timedelta(days=scheduler.first_interval_days)
+
+    def test_only_completed_concepts_are_reviewed(self, user, concept):
+        """Reviews of concepts the user has not completed are refused."""
+        scheduler = ReviewScheduler()
+
+        assert scheduler.record_review(user.id, concept.id, 4) is None
+        assert scheduler.record_review(user.id, 999, 4) is None
+        assert ReviewState.query.count() == 0
+
+
+class TestReviewEndpoint:
+    """Test cases for POST /review/<concept_id>."""
+
+    def test_uncompleted_concept_is_not_found(self, client, auth_headers, concept):
+        """Unknown or uncompleted concepts answer 404 instead of failing."""
+        for concept_id in (concept.id, 999):
+            response = client.post(f'/api/concepts/review/{concept_id}', json={'quality': 4}, headers=auth_headers)
+            assert response.status_code == 404
+
+    def test_boolean_quality_is_rejected(self, client, auth_headers, concept):
+        """true/false are not accepted as grades."""
+        response = client.post(f'/api/concepts/review/{concept.id}', json={'quality': True}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_completed_concept_is_graded(self, client, auth_headers, concept):
+        """A completed concept's review is recorded."""
+        client.post(f'/api/concepts/progress/complete/{concept.id}', json={}, headers=auth_headers)
+        response = client.post(f'/api/concepts/review/{concept.id}', json={'quality': 5}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json['repetitions'] == 1
@@ -0,0 +1,121 @@
+from datetime import date, datetime, time, timedelta, timezone
+import pytest
+from extensions import db
+from models import Category, Concept, DailyContent, User
+from services.rolling_scheduler import RollingScheduler
+from utils.time_utils import local_today, next_occurrence_utc
+
+
+@pytest.fixture
+def users(app):
+    """Users in two timezones with different reminder times."""
+    category = Category(name='Web')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        Concept(title=f'Concept {i}', short_description='Short', content='Body', category_id=category.id)
+        for i in range(30)
+    ])
+
+    def make(name, tz_name, reminder):
+        user = User(username=name, email=f'{name}@example.com', password='TestPass123')
+        user.timezone = tz_name
+        user.preferences = {'daily_reminder_time': reminder}
+        return user
+
+    users = [
+        make('tokyo', 'Asia/Tokyo', '08:00'),
+        make('tokyo2', 'Asia/Tokyo', '08:00'),
+        make('newyork', 'America/New_York', '09:00')
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+class TestTimeUtils:
+    """Test cases for timezone helpers."""
+
+    def test_local_today_crosses_midnight(self):
+        """Local dates follow the user's timezone."""
+        now = datetime(2024, 3, 1, 20, 0, tzinfo=timezone.utc)
+        assert local_today('Asia/Tokyo', now) == date(2024, 3, 2)
+        assert local_today('America/New_York', now) == date(2024, 3, 1)
+        assert local_today('Not/AZone', now) == date(2024, 3, 1)
+
+    def test_next_occurrence(self):
+        """The next occurrence of a local time is returned in UTC."""
+        after = datetime(2024, 3, 1, 0, 0, tzinfo=timezone.utc)
+        assert next_occurrence_utc('Asia/Tokyo', time(8, 0), after) == \
+            datetime(2024, 3, 1, 23, 0, tzinfo=timezone.utc)
+
+
+class TestRollingScheduler:
+    """Test cases for timezone-bucketed scheduling."""
+
+    def test_buckets_by_timezone_and_time(self, users):
+        """Users sharing a timezone and reminder time share a bucket."""
+        scheduler = RollingScheduler()
+        scheduler.rebuild(datetime(2024, 3, 1, 0, 0, tzinfo=timezone.utc))
+
+        assert scheduler.buckets[('Asia/Tokyo', '08:00')] == [users[0].id, users[1].id]
+        assert scheduler.buckets[('America/New_York', '09:00')] == [users[2].id]
+        # New York 09:00 is 14:00 UTC, minus the 30 minute lead
+        assert scheduler.next_run_at() == datetime(2024, 3, 1, 13, 30, tzinfo=timezone.utc)
+
+    def test_only_due_buckets_are_processed(self, users):
+        """Buckets are processed in due order, each for its local date."""
+        start = datetime(2024, 3, 1, 0, 0, tzinfo=timezone.utc)
+        scheduler = RollingScheduler()
+        scheduler.rebuild(start)
+
+        processed = scheduler.run_pending(start + timedelta(hours=13, minutes=45))
+        assert [p['bucket'] for p in processed] == [('America/New_York', '09:00')]
+        assert processed[0]['start_date'] == '2024-03-01'
+        assert DailyContent.query.filter_by(user_id=users[0].id).count() == 0
+
+        # Tokyo 08:00 on Mar 2 is 23:00 UTC on Mar 1
+        processed = scheduler.run_pending(start + timedelta(hours=23))
+        assert [p['bucket'] for p in processed] == [('Asia/Tokyo', '08:00')]
+        assert processed[0]['start_date'] == '2024-03-02'
+        assert DailyContent.query.filter_by(
+            user_id=users[0].id, scheduled_date=date(2024, 3, 2)
+        ).count() == 3
+
+        # Buckets are not processed again until their next due time
+        assert scheduler.run_pending(start + timedelta(hours=23, minutes=5)) == []
+
+    def test_bucket_waits_for_nightly_lock(self, users, tmp_path):
+        """While the nightly job holds the shared lock a due bucket is deferred."""
+        from utils.locks import JobLock
+
+        start = datetime(2024, 3, 1, 0, 0, tzinfo=timezone.utc)
+        scheduler = RollingScheduler(
+            poll_interval=60,
+            lock_factory=lambda: JobLock('schedule_daily_concepts', lock_dir=str(tmp_path))
+        )
+        scheduler.rebuild(start)
+        due_at = start + timedelta(hours=13, minutes=45)
+
+        with JobLock('schedule_daily_concepts', lock_dir=str(tmp_path)) as acquired:
+            assert acquired
+            processed = scheduler.run_pending(due_at)
+        assert processed[0]['deferred'] is True
+        assert DailyContent.query.filter_by(user_id=users[2].id).count() == 0
+
+        processed = scheduler.run_pending(due_at + timedelta(minutes=1))
+        assert processed[0]['bucket'] == ('America/New_York', '09:00')
+        assert processed[0]['start_date'] == '2024-03-01'
+        assert DailyContent.query.filter_by(user_id=users[2].id).count() == 21
+
+    def test_nightly_run_uses_local_dates(self, users):
+        """Without a start date each user's window starts at their local date."""
+        from services.bulk_scheduler import BulkScheduler
+
+        BulkScheduler().schedule()
+
+        for user in users:
+            today = local_today(user.timezone)
+            first = db.session.query(db.func.min(DailyContent.scheduled_date)).filter_by(user_id=user.id).scalar()
+            assert first == today
+            assert db.session.get(User, user.id).scheduled_through == today + timedelta(days=6)
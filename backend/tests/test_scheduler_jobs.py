@@ -0,0 +1,111 @@
+from datetime import date
+import pytest
+from extensions import db
+from models import Category, Concept, DailyContent, JobCheckpoint, JobRun, User
+from services.scheduler_jobs import ScheduleJob
+from services.sharded_scheduler import ShardedScheduler
+from utils.locks import JobLock
+
+
+@pytest.fixture
+def users(app):
+    """Create four users and a catalog large enough for a week."""
+    category = Category(name='Web')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        Concept(title=f'Concept {i}', short_description='Short', content='Body', category_id=category.id)
+        for i in range(30)
+    ])
+    users = [
+        User(username=f'user{i}', email=f'user{i}@example.com', password='TestPass123')
+        for i in range(4)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+def _job(tmp_path, shard_count=2):
+    scheduler = ShardedScheduler(workers=1, shard_count=shard_count)
+    return ScheduleJob(scheduler, JobLock('test_schedule', lock_dir=str(tmp_path)))
+
+
+class TestScheduleJob:
+    """Test cases for checkpointed scheduler runs."""
+
+    def test_run_is_recorded_once_per_day(self, users, tmp_path):
+        """A completed run is not repeated the same day."""
+        summary = _job(tmp_path).run()
+        assert summary['users_processed'] == 4
+        assert JobRun.query.one().status == 'completed'
+        assert JobCheckpoint.query.filter_by(status='completed').count() == 2
+
+        again = _job(tmp_path).run()
+        assert again == {'skipped': True, 'reason': 'completed', 'run_id': summary['run_id']}
+
+    def test_resume_skips_checkpointed_users(self, users, tmp_path):
+        """An interrupted run resumes after each shard's cursor."""
+        job_run = JobRun(
+            job_name=ScheduleJob.job_name,
+            run_date=date.today(),
+            status='running',
+            params={'shard_count': 1, 'strategy': 'range'}
+        )
+        db.session.add(job_run)
+        db.session.flush()
+        db.session.add(JobCheckpoint(
+            run_id=job_run.id, shard_index=0, status='running', last_user_id=users[1].id
+        ))
+        db.session.commit()
+
+        summary = _job(tmp_path, shard_count=4).run()
+
+        assert summary['resumed'] is True
+        assert summary['users_processed'] == 2
+        assert DailyContent.query.filter_by(user_id=users[0].id).count() == 0
+        assert DailyContent.query.filter_by(user_id=users[3].id).count() == 21
+
+    def test_range_shards_survive_user_changes(self, users, tmp_path):
+        """A resumed range run keeps its recorded bounds when users come and go."""
+        scheduler = ShardedScheduler(workers=1, shard_count=2, strategy='range')
+        job = ScheduleJob(scheduler, JobLock('test_schedule', lock_dir=str(tmp_path)))
+        job_run = job._start_or_resume(None, date.today())
+        assert job._partition(job_run) == {0: [users[0].id, users[1].id], 1: [users[2].id, users[3].id]}
+
+        # Shard 0 finished; then user 0 leaves and a new user joins
+        db.session.add(JobCheckpoint(run_id=job_run.id, shard_index=0, status='completed', last_user_id=users[1].id))
+        users[0].is_active = False
+        newcomer = User(username='late', email='late@example.com', password='TestPass123')
+        db.session.add(newcomer)
+        db.session.commit()
+
+        pending = job._pending_shards(job_run)
+        # Re-partitioning would have moved users[2] into the completed shard 0
+        assert pending == {1: [users[2].id, users[3].id], 2: [newcomer.id]}
+
+    def test_forced_rerun_is_not_reported_as_resumed(self, users, tmp_path):
+        """--force starts over instead of counting as a resumed attempt."""
+        _job(tmp_path).run()
+        summary = _job(tmp_path).run(force=True)
+
+        assert summary['resumed'] is False
+        assert summary['users_processed'] == 4
+        assert JobRun.query.one().attempts == 1
+
+    def test_locked_run_is_skipped(self, users, tmp_path):
+        """A second concurrent run backs off while the lock is held."""
+        with JobLock('test_schedule', lock_dir=str(tmp_path)) as acquired:
+            assert acquired
+            assert _job(tmp_path).run() == {'skipped': True, 'reason': 'locked'}
+        assert JobRun.query.count() == 0
+
+    def test_replayed_inserts_are_ignored(self, users):
+        """Duplicate (user, concept, date) rows are rejected by the constraint."""
+        concept = Concept.query.first()
+        db.session.add(DailyContent(user_id=users[0].id, concept_id=concept.id, scheduled_date=date.today()))
+        db.session.commit()
+        db.session.add(DailyContent(user_id=users[0].id, concept_id=concept.id, scheduled_date=date.today()))
+        with pytest.raises(Exception):
+            db.session.commit()
+        db.session.rollback()
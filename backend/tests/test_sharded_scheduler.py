@@ -0,0 +1,63 @@
+from unittest.mock import patch
+from extensions import db
+from models import Category, Concept, DailyContent, User
+from services.sharded_scheduler import ShardedScheduler, partition_users
+import services.sharded_scheduler as sharded_scheduler
+
+
+def _seed(user_count=4, concept_count=30):
+    category = Category(name='Web')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        Concept(title=f'Concept {i}', short_description='Short', content='Body', category_id=category.id)
+        for i in range(concept_count)
+    ])
+    db.session.add_all([
+        User(username=f'user{i}', email=f'user{i}@example.com', password='TestPass123')
+        for i in range(user_count)
+    ])
+    db.session.commit()
+
+
+class TestShardedScheduler:
+    """Test cases for sharded nightly scheduling."""
+
+    def test_partition_by_hash(self):
+        """Hash shards cover every user exactly once."""
+        shards = partition_users(list(range(1, 11)), 3)
+        assert sorted(uid for shard in shards for uid in shard) == list(range(1, 11))
+        assert all(uid % 3 == index for index, shard in enumerate(shards) for uid in shard)
+
+    def test_partition_by_range(self):
+        """Range shards are contiguous and balanced."""
+        assert partition_users([5, 1, 3, 2, 4], 2, 'range') == [[1, 2, 3], [4, 5]]
+
+    def test_inline_run_aggregates_shards(self, app):
+        """Shard results are summed into one summary."""
+        _seed()
+        summary = ShardedScheduler(workers=1, shard_count=2).run()
+
+        assert summary['shards'] == 2
+        assert summary['shards_succeeded'] == 2
+        assert summary['users_processed'] == 4
+        assert summary['concepts_scheduled'] == DailyContent.query.count() == 84
+
+    def test_failed_shard_is_retried(self, app):
+        """A shard failing once succeeds on retry."""
+        _seed(user_count=2)
+        real = sharded_scheduler.schedule_shard
+        calls = []
+
+        def flaky(index, user_ids, options=None, run_id=None):
+            calls.append(index)
+            if calls.count(index) == 1 and index == 0:
+                raise RuntimeError('connection reset')
+            return real(index, user_ids, options, run_id)
+
+        with patch.object(sharded_scheduler, 'schedule_shard', side_effect=flaky):
+            summary = ShardedScheduler(workers=1, shard_count=2, max_retries=1).run()
+
+        assert summary['retries'] == 1
+        assert summary['shards_failed'] == 0
+        assert summary['users_processed'] == 2
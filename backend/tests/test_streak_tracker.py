@@ -0,0 +1,71 @@
+from datetime import date, datetime, timedelta
+from extensions import db
+from models import Concept, User, UserProgress
+from services.daily_delivery_service import DailyDeliveryService
+from services.streak_tracker import StreakTracker
+
+
+def _counters(user_id):
+    db.session.expire_all()
+    user = db.session.get(User, user_id)
+    return user.current_streak, user.longest_streak, user.last_activity_date
+
+
+class TestStreakTracker:
+    """Test cases for incremental streak counters."""
+
+    def test_consecutive_days_extend_streak(self, user):
+        """Activity on consecutive days grows the streak once per day."""
+        tracker = StreakTracker()
+        day = date(2024, 3, 1)
+        for offset in (0, 0, 1, 2):
+            tracker.record_activity(user.id, day + timedelta(days=offset))
+        db.session.commit()
+
+        assert _counters(user.id) == (3, 3, day + timedelta(days=2))
+
+    def test_gap_resets_but_keeps_longest(self, user):
+        """A missed day restarts the current streak only."""
+        tracker = StreakTracker()
+        day = date(2024, 3, 1)
+        for offset in (0, 1, 2, 5):
+            tracker.record_activity(user.id, day + timedelta(days=offset))
+        # An older, late event does not rewind the counters
+        tracker.record_activity(user.id, day + timedelta(days=3))
+        db.session.commit()
+
+        assert _counters(user.id) == (1, 3, day + timedelta(days=5))
+
+    def test_completion_updates_counters_in_local_time(self, user, concept):
+        """Completing a concept counts on the user's local day."""
+        user.timezone = 'Pacific/Kiritimati'
+        db.session.commit()
+        service = DailyDeliveryService()
+
+        service.mark_concept_completed(user.id, concept.id)
+
+        today = service.user_today(user.id)
+        assert _counters(user.id) == (1, 1, today)
+        assert service.get_user_statistics(user.id)['learning_streak'] == 1
+
+    def test_backfill_from_history(self, user, concept):
+        """Backfill derives the counters from completion timestamps."""
+        user.timezone = 'America/New_York'
+        others = [
+            Concept(title=f'C{i}', short_description='s', content='c', category_id=concept.category_id)
+            for i in range(3)
+        ]
+        db.session.add_all(others)
+        db.session.flush()
+        # 03:00 UTC is the previous evening in New York
+        stamps = [
+            datetime(2024, 3, 1, 15), datetime(2024, 3, 3, 3),
+            datetime(2024, 3, 3, 15), datetime(2024, 3, 10, 15)
+        ]
+        for c, stamp in zip([concept] + others, stamps):
+            db.session.add(UserProgress(user_id=user.id, concept_id=c.id,
+                                        status='completed', completed_at=stamp))
+        db.session.commit()
+
+        assert StreakTracker().backfill() == {'users_processed': 1}
+        assert _counters(user.id) == (1, 3, date(2024, 3, 10))
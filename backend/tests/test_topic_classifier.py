@@ -0,0 +1,81 @@
+from extensions import db
+from models import Category, Concept, NewsArticle, Tag
+from seed_data import SEED_CATEGORIES, SEED_TAGS
+from services.article_converter import ArticleConverter, ArticleQualityFilter
+from services.topic_classifier import TopicClassifier, normalize
+
+
+def _seeded_classifier(**kwargs):
+    return TopicClassifier.from_names(
+        [(category['name'], category['description']) for category in SEED_CATEGORIES], SEED_TAGS, **kwargs
+    )
+
+
+class TestTopicClassifier:
+    """Test cases for keyword topic classification."""
+
+    def test_assigns_seeded_categories(self):
+        """Articles land in the seeded category their keywords point at."""
+        results = _seeded_classifier().classify_batch([
+            ('OpenAI unveils a new large language model', 'Better reasoning for developers.'),
+            ('Critical zero-day exploited by hackers', 'A patch for the vulnerability ships today.'),
+            ('AWS launches serverless Postgres', 'Amazon Web Services expands its cloud database line-up.'),
+            ('Apple opens iOS to alternative app stores', 'Swift developers can ship iPhone apps directly.'),
+        ])
+
+        assert [r.category for r in results] == [
+            'Machine Learning', 'Cybersecurity', 'Cloud Computing', 'Mobile Development'
+        ]
+
+    def test_tags_use_aliases(self):
+        """Tags are matched through their alternative spellings."""
+        result = _seeded_classifier().classify('K8s and CI/CD for Node.js services', 'Deploy with Postgres and C#.')
+
+        assert result.category == 'DevOps'
+        assert set(result.tags) == {'kubernetes', 'ci/cd', 'nodejs', 'postgresql', 'csharp'}
+
+    def test_unrelated_text_gets_no_category(self):
+        """Text without topic keywords stays unclassified."""
+        result = _seeded_classifier().classify('Local bakery wins award', 'The bread was delicious.')
+        assert result.category is None
+        assert result.tags == []
+
+    def test_title_outweighs_body(self):
+        """A keyword in the title counts more than the same keyword in the body."""
+        classifier = _seeded_classifier()
+        assert classifier.classify('Kafka pipelines', 'Runs on Kubernetes').category == 'Data Engineering'
+        assert classifier.classify('Kubernetes operators', 'For Kafka pipelines').category == 'DevOps'
+
+    def test_max_tags(self):
+        """Only the most frequent tags are kept."""
+        result = _seeded_classifier(max_tags=2).classify('Python python rust', 'java golang swift')
+        assert result.tags == ['python', 'rust']
+
+    def test_normalize_keeps_symbol_names(self):
+        """Names with symbols survive tokenization."""
+        assert normalize('C# and C++ on .NET with Node.js') == ['csharp', 'and', 'cplusplus', 'on', 'dotnet', 'with', 'nodejs']
+
+
+class TestClassifiedConversion:
+    """Test cases for classifying articles during conversion."""
+
+    def test_converted_concepts_get_category_and_tags(self, app):
+        """Conversion uses the stored vocabulary for categories and tags."""
+        db.session.add_all([Category(name=c['name'], description=c['description']) for c in SEED_CATEGORIES])
+        db.session.add_all([Tag(name=name) for name in SEED_TAGS])
+        articles = [
+            NewsArticle(url='https://a', title='Docker and Kubernetes in production', content='x' * 600),
+            NewsArticle(url='https://b', title='Local bakery wins award', content='x' * 600),
+        ]
+        db.session.add_all(articles)
+        db.session.commit()
+
+        converter = ArticleConverter(ArticleQualityFilter(), classify=True)
+        linked = converter.convert([article.id for article in articles])
+
+        devops = db.session.get(Concept, linked[articles[0].id])
+        other = db.session.get(Concept, linked[articles[1].id])
+        assert devops.category.name == 'DevOps'
+        assert sorted(tag.name for tag in devops.tags) == ['docker', 'kubernetes']
+        assert other.category.name == 'General'
+        assert other.tags == []
@@ -0,0 +1,98 @@
+import time
+from extensions import db
+from models import Category, Tag
+from services.vocabulary_cache import VocabularyCache, vocabulary_cache
+
+
+def _seed():
+    db.session.add_all([Category(name='Web', description='Web things'), Category(name='Data')])
+    db.session.add_all([Tag(name='python'), Tag(name='react')])
+    db.session.commit()
+
+
+class TestVocabularyCache:
+    """Test cases for the cached category and tag listings."""
+
+    def test_repeat_lookup_is_cached(self, app):
+        """Unchanged tables are served from the serialized copy."""
+        _seed()
+        cache = VocabularyCache()
+        first = cache.get('categories')
+        second = cache.get('categories')
+
+        assert first is second
+        assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+    def test_new_rows_invalidate(self, app):
+        """Rows added outside the ORM change the version and the ETag."""
+        _seed()
+        cache = VocabularyCache()
+        before = cache.get('tags')
+        db.session.execute(Tag.__table__.insert().values(name='rust'))
+        db.session.commit()
+        after = cache.get('tags')
+
+        assert after.etag != before.etag
+        assert b'rust' in after.body
+
+    def test_orm_edit_invalidates(self, app):
+        """Editing an existing row through the ORM bumps the generation."""
+        _seed()
+        before = vocabulary_cache.get('categories')
+        category = Category.query.filter_by(name='Web').first()
+        category.icon = 'globe'
+        db.session.commit()
+
+        assert vocabulary_cache.get('categories').etag != before.etag
+
+    def test_entries_expire_after_max_lifetime(self, app, monkeypatch):
+        """Edits outside the ORM that keep the row count are served once the entry ages out."""
+        _seed()
+        cache = VocabularyCache(max_lifetime=60)
+        before = cache.get('categories')
+        db.session.execute(Category.__table__.update().where(Category.name == 'Data').values(description='Numbers'))
+        db.session.commit()
+
+        assert cache.get('categories') is before
+
+        started = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: started + 61)
+        after = cache.get('categories')
+        assert after.etag != before.etag
+        assert b'Numbers' in after.body
+
+
+class TestVocabularyEndpoints:
+    """Test cases for ETag handling on /categories and /tags."""
+
+    def test_listing_has_validators(self, client):
+        """Listings carry a strong ETag and Cache-Control."""
+        _seed()
+        response = client.get('/api/concepts/categories')
+
+        assert response.status_code == 200
+        assert [c['name'] for c in response.json] == ['Web', 'Data']
+        assert response.headers['ETag'].startswith('"')
+        assert 'public' in response.headers['Cache-Control']
+        assert 'max-age=' in response.headers['Cache-Control']
+
+    def test_matching_etag_returns_304(self, client):
+        """A client with the current ETag gets an empty 304."""
+        _seed()
+        etag = client.get('/api/concepts/tags').headers['ETag']
+        response = client.get('/api/concepts/tags', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    def test_stale_etag_returns_listing(self, client):
+        """After a tag is added the old ETag no longer matches."""
+        _seed()
+        etag = client.get('/api/concepts/tags').headers['ETag']
+        db.session.add(Tag(name='rust'))
+        db.session.commit()
+        response = client.get('/api/concepts/tags', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert [t['name'] for t in response.json] == ['python', 'react', 'rust']
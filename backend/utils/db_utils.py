@@ -0,0 +1,39 @@
+from sqlalchemy import Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from extensions import db
+
+
+class greatest(FunctionElement):
+    """GREATEST(a, b, ...) that also compiles on SQLite (as scalar max)"""
+    type = Integer()
+    name = 'greatest'
+    inherit_cache = True
+
+
+@compiles(greatest)
+def _compile_greatest(element, compiler, **kw):
+    return 'GREATEST(%s)' % compiler.process(element.clauses, **kw)
+
+
+@compiles(greatest, 'sqlite')
+def _compile_greatest_sqlite(element, compiler, **kw):
+    return 'max(%s)' % compiler.process(element.clauses, **kw)
+
+
+def dialect_name() -> str:
+    return db.session.get_bind().dialect.name
+
+
+def upsert_insert(table):
+    """
+    Return an INSERT construct supporting ON CONFLICT for the bound database
+    """
+    name = dialect_name()
+    if name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {name}")
+    return insert(table)
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(pool_size: int = 10,
+                  retries: int = 3,
+                  backoff_factor: float = 0.5,
+                  backoff_jitter: float = 0.5,
+                  statuses: Iterable[int] = RETRY_STATUSES) -> requests.Session:
+    """
+    A keep-alive session with a connection pool sized for `pool_size`
+    concurrent requests per host, retrying idempotent requests on the given
+    statuses with exponential, jittered backoff (honouring Retry-After)
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        status_forcelist=tuple(statuses),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def retry_delay(attempt: int,
+                response: Optional[requests.Response] = None,
+                backoff_factor: float = 0.5,
+                backoff_jitter: float = 0.5) -> float:
+    """
+    Seconds to wait before retry number `attempt` (1-based), with the same
+    schedule as build_session: a Retry-After header wins, the first retry is
+    immediate and later ones back off exponentially with jitter
+    """
+    if response is not None:
+        try:
+            return max(0.0, float(response.headers.get('Retry-After', '')))
+        except ValueError:
+            pass
+    if attempt <= 1:
+        return 0.0
+    return backoff_factor * (2 ** (attempt - 1)) + random.uniform(0, backoff_jitter)
+
+
+class HostLimiter:
+    """
+    Caps the number of in-flight requests per host across threads
+    """
+
+    def __init__(self, max_per_host: int = 4):
+        self.max_per_host = max_per_host
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._slots.get(host)
+            if semaphore is None:
+                semaphore = self._slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        with semaphore:
+            yield
+
+
+class ResponseCache:
+    """
+    TTL cache for decoded JSON responses keyed by URL and request parameters.
+
+    Entries live in memory and, when `directory` is set, also as one JSON
+    file per key so separate processes (cron runs, web workers) share them.
+    Parameters listed in `ignore` (credentials) are left out of the key.
+    Expired entries are dropped as they are found, at most `max_entries`
+    are kept in memory (oldest evicted first), and expired files are
+    swept from the directory at most once per `ttl`.
+    """
+
+    def __init__(self,
+                 ttl: float = 900,
+                 directory: Optional[str] = None,
+                 ignore: Iterable[str] = ('apiKey',),
+                 max_entries: int = 256):
+        self.ttl = ttl
+        self.directory = directory or None
+        self.ignore = frozenset(ignore)
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, url: str, params: Dict) -> str:
+        items = sorted((k, str(v)) for k, v in params.items() if k not in self.ignore)
+        return hashlib.sha256(json.dumps([url, items]).encode()).hexdigest()
+
+    def get(self, url: str, params: Dict) -> Optional[Any]:
+        if self.ttl <= 0:
+            return None
+        key = self.key(url, params)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.directory:
+            entry = self._read(key)
+        if entry is None:
+            return None
+        if now - entry[0] >= self.ttl:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            return None
+        return entry[1]
+
+    def set(self, url: str, params: Dict, value: Any):
+        if self.ttl <= 0:
+            return
+        key = self.key(url, params)
+        entry = (time.time(), value)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict(entry[0])
+        if self.directory:
+            path = os.path.join(self.directory, f'{key}.json')
+            tmp = f'{path}.{os.getpid()}.{threading.get_ident()}'
+            with open(tmp, 'w') as handle:
+                json.dump({'stored_at': entry[0], 'value': value}, handle)
+            os.replace(tmp, path)
+            self._sweep(entry[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict(self, now: float):
+        # Oldest insertions go first: expired ones, then any over the cap
+        while self._entries:
+            key, (stored_at, _) = next(iter(self._entries.items()))
+            if now - stored_at < self.ttl and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+
+    def _sweep(self, now: float):
+        """
+        Remove cache files older than the TTL, whichever process wrote them
+        """
+        with self._lock:
+            if now - self._swept_at < self.ttl:
+                return
+            self._swept_at = now
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) >= self.ttl:
+                    os.remove(path)
+            except OSError:
+                # Another process removed or replaced it first
+                pass
+
+    def _read(self, key: str) -> Optional[tuple]:
+        try:
+            with open(os.path.join(self.directory, f'{key}.json')) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        entry = (data['stored_at'], data['value'])
+        with self._lock:
+            self._entries[key] = entry
+            self._evict(time.time())
+        return entry
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second up to `capacity`.
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting up to `timeout` seconds (forever when None)
+        """
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class RequestCoalescer:
+    """
+    Runs one call per key at a time; concurrent callers with the same key
+    wait for and share the in-flight call's result (or exception)
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import zlib
+from sqlalchemy import text
+from extensions import db
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class JobLock:
+    """
+    Cross-host single-run lock for background jobs.
+
+    Uses a PostgreSQL session-level advisory lock held on a dedicated
+    connection for the lifetime of the lock. On other databases, or if the
+    advisory lock cannot be attempted, falls back to an exclusive flock on a
+    local lock file (which only guards a single host).
+
+    Usage:
+        with JobLock('schedule_daily_concepts') as acquired:
+            if not acquired:
+                return
+    """
+
+    def __init__(self, name: str, lock_dir: str = None):
+        self.name = name
+        # Advisory lock keys are signed 64-bit integers
+        self.key = zlib.crc32(name.encode('utf-8'))
+        self.lock_dir = lock_dir or tempfile.gettempdir()
+        self.backend = None
+        self._connection = None
+        self._file = None
+
+    def acquire(self) -> bool:
+        if db.engine.dialect.name == 'postgresql':
+            try:
+                return self._acquire_advisory()
+            except Exception as e:
+                logger.warning(f"Advisory lock unavailable, using file lock: {str(e)}")
+                self._close_connection()
+        return self._acquire_file()
+
+    def release(self):
+        if self.backend == 'advisory' and self._connection is not None:
+            try:
+                self._connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': self.key})
+                self._connection.commit()
+            finally:
+                self._close_connection()
+        elif self.backend == 'file' and self._file is not None:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self.backend = None
+
+    def _acquire_advisory(self) -> bool:
+        self._connection = db.engine.connect()
+        acquired = self._connection.execute(
+            text('SELECT pg_try_advisory_lock(:key)'), {'key': self.key}
+        ).scalar()
+        self._connection.commit()
+        if not acquired:
+            self._close_connection()
+            return False
+        self.backend = 'advisory'
+        return True
+
+    def _acquire_file(self) -> bool:
+        path = os.path.join(self.lock_dir, f"devdose-{self.name}.lock")
+        self._file = open(path, 'a+')
+        if fcntl is None:
+            logger.warning("File locking is not supported on this platform")
+            self.backend = 'file'
+            return True
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+        self.backend = 'file'
+        return True
+
+    def _close_connection(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
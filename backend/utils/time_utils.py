@@ -0,0 +1,70 @@
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+DEFAULT_REMINDER_TIME = time(9, 0)
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: Optional[str]) -> tzinfo:
+    """Resolve an IANA timezone name, falling back to UTC"""
+    if not name or ZoneInfo is None:
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def local_now(tz_name: Optional[str], now: Optional[datetime] = None) -> datetime:
+    return (now or utc_now()).astimezone(get_zone(tz_name))
+
+
+def local_today(tz_name: Optional[str], now: Optional[datetime] = None) -> date:
+    """The user's calendar date right now"""
+    return local_now(tz_name, now).date()
+
+
+def local_date_of(moment: datetime, tz_name: Optional[str]) -> date:
+    """Local calendar date of a naive-UTC or aware timestamp"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(get_zone(tz_name)).date()
+
+
+def parse_clock(value: Optional[str], default: time = DEFAULT_REMINDER_TIME) -> time:
+    """Parse an 'HH:MM' preference, falling back to the default"""
+    try:
+        hours, minutes = str(value).split(':')[:2]
+        return time(int(hours), int(minutes))
+    except (TypeError, ValueError):
+        return default
+
+
+def next_occurrence_utc(tz_name: Optional[str], clock: time, after: datetime) -> datetime:
+    """
+    Next instant (aware UTC) strictly after `after` at which the local
+    wall-clock time in `tz_name` is `clock`
+    """
+    zone = get_zone(tz_name)
+    local = after.astimezone(zone)
+    candidate = datetime.combine(local.date(), clock, tzinfo=zone)
+    if candidate <= local:
+        candidate = datetime.combine(local.date() + timedelta(days=1), clock, tzinfo=zone)
+    return candidate.astimezone(timezone.utc)
+
+
+def local_day_end_utc(tz_name: Optional[str], day: date) -> datetime:
+    """Naive-UTC instant at which `day` ends in `tz_name`"""
+    end = datetime.combine(day + timedelta(days=1), time(0, 0), tzinfo=get_zone(tz_name))
+    return end.astimezone(timezone.utc).replace(tzinfo=None)